@@ -0,0 +1,42 @@
+"""Added SecurityToken indexes on gcp_user_uid and created, for expiry purges
+
+Revision ID: 5e0f7c2a9b14
+Revises: 92a3d4441ca8
+Create Date: 2026-10-19 10:12:37.514209
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "5e0f7c2a9b14"
+down_revision = "92a3d4441ca8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built concurrently (outside of the migration transaction), so token writes aren't blocked.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_security_token_gcp_user_uid_created",
+            "security_token",
+            ["gcp_user_uid", "created"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_security_token_created",
+            "security_token",
+            ["created"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_security_token_created", "security_token", postgresql_concurrently=True)
+        op.drop_index(
+            "ix_security_token_gcp_user_uid_created",
+            "security_token",
+            postgresql_concurrently=True,
+        )
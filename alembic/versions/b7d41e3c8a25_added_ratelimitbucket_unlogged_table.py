@@ -0,0 +1,33 @@
+"""Added RateLimitBucket unlogged table
+
+Revision ID: b7d41e3c8a25
+Revises: 5e0f7c2a9b14
+Create Date: 2026-10-19 13:41:05.208816
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b7d41e3c8a25"
+down_revision = "5e0f7c2a9b14"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "rate_limit_bucket",
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column(
+            "updated", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("key"),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def downgrade():
+    op.drop_table("rate_limit_bucket")
@@ -0,0 +1,31 @@
+"""Added ClientUser index on gcp_user_uid, for cascaded user deletions
+
+Revision ID: e4a9c1d27b63
+Revises: b7d41e3c8a25
+Create Date: 2026-10-19 16:05:48.731902
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "e4a9c1d27b63"
+down_revision = "b7d41e3c8a25"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built concurrently (outside of the migration transaction), so role writes aren't blocked.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_client_user_gcp_user_uid",
+            "client_user",
+            ["gcp_user_uid"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_client_user_gcp_user_uid", "client_user", postgresql_concurrently=True)
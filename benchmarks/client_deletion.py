@@ -0,0 +1,137 @@
+"""
+Deletion of a client with many members: the single statement `ClientRepository.delete_client`
+runs, against the previous approach (a grouped `SELECT` of the client-only members, their
+deletion and a commit, then the ORM deletion of the client, cascaded to its remaining roles, and
+another commit). Both run against the same dataset, seeded with `COPY` statements in the
+`<DATABASE_URL database>_benchmark` database (which is recreated).
+
+Usage:
+
+    python -m benchmarks.client_deletion --members 50000 --shared-ratio 0.1
+"""
+import argparse
+import uuid
+from time import perf_counter
+from typing import Callable, Dict, List
+
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from benchmarks.load.seed import create_database, get_database_url
+from user_management.cli import copy_rows
+from user_management.models import Client, ClientUser, GCPUser, Role
+from user_management.repositories import ClientRepository
+
+
+def seed_client(engine: Engine, members: int, shared_ratio: float) -> uuid.UUID:
+    """Seeds a client with `members` users, `shared_ratio` of them members of another client too."""
+    client_uid, other_client_uid = uuid.uuid4(), uuid.uuid4()
+    users = [uuid.uuid4() for _ in range(members)]
+    shared = users[: int(members * shared_ratio)]
+
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            copy_rows(
+                cursor,
+                "client",
+                ["uid", "name"],
+                [(client_uid, f"Deleted {client_uid}"), (other_client_uid, f"Kept {client_uid}")],
+            )
+            copy_rows(
+                cursor,
+                "gcp_user",
+                ["uid", "name", "email", "staff"],
+                ((uid, "Member", f"member-{uid}@hummingbirdtech.com", False) for uid in users),
+            )
+            copy_rows(
+                cursor,
+                "client_user",
+                ["client_uid", "gcp_user_uid", "role"],
+                [
+                    *((client_uid, uid, Role.NORMAL_USER.value) for uid in users),
+                    *((other_client_uid, uid, Role.PILOT.value) for uid in shared),
+                ],
+            )
+        connection.commit()
+    finally:
+        connection.close()
+
+    return client_uid
+
+
+def delete_in_one_statement(session: Session, client_uid: uuid.UUID) -> List[uuid.UUID]:
+    return ClientRepository(session).delete_client(uid=client_uid)
+
+
+def delete_in_steps(session: Session, client_uid: uuid.UUID) -> List[uuid.UUID]:
+    """Client deletion as done before `ClientRepository.delete_client`."""
+    client_only_users = (
+        session.execute(
+            select(GCPUser.uid)
+            .join(ClientUser)
+            .where(
+                GCPUser.uid.in_(select(ClientUser.gcp_user_uid).filter_by(client_uid=client_uid)),
+                GCPUser.staff == False,
+            )
+            .group_by(GCPUser.uid)
+            .having(func.count() < 2)
+        )
+        .scalars()
+        .all()
+    )
+    session.execute(delete(GCPUser).where(GCPUser.uid.in_(client_only_users)))
+    session.commit()
+
+    session.delete(session.get(Client, client_uid))
+    session.commit()
+    return client_only_users
+
+
+def run(
+    engine: Engine,
+    deletion: Callable[[Session, uuid.UUID], List[uuid.UUID]],
+    members: int,
+    shared_ratio: float,
+) -> Dict[str, float]:
+    client_uid = seed_client(engine, members, shared_ratio)
+    statements = 0
+
+    def count_statement(*args):  # pylint: disable=unused-argument
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    with Session(engine) as session:
+        start = perf_counter()
+        deleted_users = deletion(session, client_uid)
+        elapsed = perf_counter() - start
+    event.remove(engine, "before_cursor_execute", count_statement)
+
+    return {"seconds": elapsed, "statements": statements, "users deleted": len(deleted_users)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--members", type=int, default=50000, help="Members of the client.")
+    parser.add_argument(
+        "--shared-ratio", type=float, default=0.1, help="Members of another client too."
+    )
+    args = parser.parse_args()
+
+    engine = create_database(get_database_url())
+    results = {
+        "single statement": run(engine, delete_in_one_statement, args.members, args.shared_ratio),
+        "previous (steps)": run(engine, delete_in_steps, args.members, args.shared_ratio),
+    }
+    engine.dispose()
+
+    columns = list(next(iter(results.values())))
+    print(f"{'deletion':>18} " + " ".join(f"{column:>14}" for column in columns))
+    for name, result in results.items():
+        print(f"{name:>18} " + " ".join(f"{result[column]:>14,.2f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
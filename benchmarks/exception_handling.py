@@ -0,0 +1,140 @@
+"""
+Measures the throughput of requests answered with application exceptions (404
+`ResourceNotFoundError` and 401 `AuthenticationError` responses), under concurrent load, for every
+`EXCEPTION_CONTEXT` level and for the former `inspect.stack()` based caller lookup.
+
+Requests are sent straight to the ASGI application, so no server or network overhead is measured.
+
+Usage:
+
+    python -m benchmarks.exception_handling --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import inspect
+import logging
+from time import perf_counter
+from typing import Callable, Dict
+from unittest import mock
+
+from fastapi import FastAPI
+
+from user_management.core import exceptions
+from user_management.core.config.settings import get_settings
+from user_management.core.exceptions import (
+    app_exception_handler,
+    AppExceptionCase,
+    AuthenticationError,
+    ResourceNotFoundError,
+)
+
+
+def stack_caller_info(exc: BaseException) -> str:  # pylint: disable=unused-argument
+    """Former caller lookup, walking the whole stack and reading the source files."""
+    info = inspect.getframeinfo(inspect.stack()[2][0])
+    return f"{info.filename}:{info.function}:{info.lineno}"
+
+
+def raise_nested(exception: AppExceptionCase, depth: int):
+    """Raises the exception a few frames deep, as services and repositories do."""
+    if depth:
+        raise_nested(exception, depth - 1)
+    raise exception
+
+
+def create_benchmark_app(depth: int) -> FastAPI:
+    app = FastAPI()
+    app.add_exception_handler(AppExceptionCase, app_exception_handler)
+
+    @app.get("/users/{uid}")
+    async def get_user(uid: str):
+        raise_nested(ResourceNotFoundError({"message": f"No gcpuser found with ID {uid}"}), depth)
+
+    @app.post("/login")
+    async def login():
+        raise_nested(AuthenticationError({"message": "Wrong user name or password."}), depth)
+
+    return app
+
+
+async def request(app: FastAPI, method: str, path: str) -> int:
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "scheme": "http",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 10000),
+        "server": ("testserver", 80),
+    }
+    status_code = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+
+async def load(app: FastAPI, method: str, path: str, requests: int, concurrency: int) -> float:
+    """Sends the requests with the given concurrency, and returns the requests per second rate."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            assert await request(app, method, path) in (401, 404)
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=5, help="Frames deep exceptions are raised.")
+    args = parser.parse_args()
+
+    # Measure the caller lookups, not the log output.
+    logging.getLogger(exceptions.__name__).addHandler(logging.NullHandler())
+    logging.getLogger(exceptions.__name__).propagate = False
+
+    app = create_benchmark_app(depth=args.depth)
+    settings = get_settings()
+    paths = {
+        "404": ("GET", "/users/d7a9aa45-1737-419a-bf5c-c2a4ac5b60cc"),
+        "401": ("POST", "/login"),
+    }
+    lookups: Dict[str, Callable[[BaseException], str]] = {
+        "inspect.stack": stack_caller_info,
+        "none": exceptions.caller_info,
+        "origin": exceptions.caller_info,
+        "full": exceptions.caller_info,
+    }
+
+    print(f"{'caller lookup':>14} " + " ".join(f"{f'{name} (req/s)':>14}" for name in paths))
+    for name, lookup in lookups.items():
+        settings.exception_context = "origin" if name == "inspect.stack" else name
+        with mock.patch.object(exceptions, "caller_info", lookup):
+            rates = [
+                asyncio.run(load(app, method, path, args.requests, args.concurrency))
+                for method, path in paths.values()
+            ]
+        print(f"{name:>14} " + " ".join(f"{rate:>14,.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
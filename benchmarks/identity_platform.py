@@ -0,0 +1,383 @@
+"""
+Local stand-in for GCP Identity Platform, so the service can be tested and benchmarked without
+calling Google: the Identity Toolkit REST API endpoints users log in with (`signInWithPassword`
+and `token`), and the Admin API endpoints the Firebase Admin SDK calls, as served by the Firebase
+Auth emulator (creating, looking up, updating and deleting accounts, and generating password reset
+links). Accounts are kept in memory.
+
+Responses can be delayed (`--latency-ms`, give or take `--latency-jitter-ms`), a ratio of them
+replaced by errors (`--error-rate`, with the `--error-status` HTTP status), and requests beyond a
+quota (`--rate-limit` requests per second, in bursts of `--rate-limit-burst`) rejected with `429`
+responses, as Google does. Accounts unknown to the stand-in (e.g. only seeded in the database) are
+not found, unless `--auto-create-users` is set: they are then created when first used (taking the
+first password they're logged in with).
+
+Usage:
+
+    python -m benchmarks.identity_platform --port 8790 --latency-ms 50 --error-rate 0.01
+
+And the service pointed at it with:
+
+    GCP_IDENTITY_TOOLKIT_URL=http://127.0.0.1:8790 GCP_AUTH_EMULATOR_HOST=127.0.0.1:8790
+"""
+import argparse
+import asyncio
+import random
+import threading
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+from time import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from aiohttp import web
+
+from user_management.core.rate_limiting import TokenBuckets
+
+
+# Admin API endpoints path, as served by the Firebase Auth emulator.
+ADMIN_API_PATH = "/identitytoolkit.googleapis.com/v1/projects/{project}"
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+@dataclass
+class Faults:
+    """Faults injected into the responses."""
+
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    rate_limit: float = 0.0
+    rate_limit_burst: int = 1
+    seed: Optional[int] = None
+
+
+class IdentityPlatformError(Exception):
+    """Error response, in the Identity Toolkit API format (e.g. `EMAIL_NOT_FOUND`)."""
+
+    def __init__(self, message: str, code: int = 400, status: Optional[str] = None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.status = status
+
+    def response(self) -> web.Response:
+        error: Dict[str, Any] = {"code": self.code, "message": self.message}
+        if self.status:
+            error["status"] = self.status
+        return web.json_response({"error": error}, status=self.code)
+
+
+class IdentityPlatform:
+    """
+    In-memory GCP Identity Platform accounts, by user ID (and email), and the refresh tokens issued
+    to them. Requests served are counted by endpoint in `calls`.
+    """
+
+    def __init__(self, faults: Optional[Faults] = None, auto_create_users: bool = False):
+        self.faults = faults or Faults()
+        self.auto_create_users = auto_create_users
+        self.accounts: Dict[str, Dict[str, Any]] = {}
+        self.emails: Dict[str, str] = {}
+        self.refresh_tokens: Dict[str, str] = {}
+        self.calls: Counter = Counter()
+        self._random = random.Random(self.faults.seed)
+        self._quota = (
+            TokenBuckets(rate=self.faults.rate_limit, burst=self.faults.rate_limit_burst)
+            if self.faults.rate_limit
+            else None
+        )
+
+    def add_account(self, **fields) -> Dict[str, Any]:
+        """Creates an account (`localId`, `email`, `password`...), checking they're unique."""
+        uid = fields.pop("localId", None) or uuid.uuid4().hex
+        if uid in self.accounts:
+            raise IdentityPlatformError("DUPLICATE_LOCAL_ID")
+
+        now = str(int(time() * 1000))
+        account = {
+            "localId": uid,
+            "emailVerified": False,
+            "disabled": False,
+            "createdAt": now,
+            "lastLoginAt": now,
+        }
+        self.update_account(account, **fields)
+        self.accounts[uid] = account
+        return account
+
+    def update_account(self, account: Dict[str, Any], **fields) -> None:
+        if email := fields.pop("email", None):
+            email = email.lower()
+            if self.emails.setdefault(email, account["localId"]) != account["localId"]:
+                raise IdentityPlatformError("EMAIL_EXISTS")
+            if account.get("email") not in (None, email):
+                del self.emails[account["email"]]
+            account["email"] = email
+        account.update(fields)
+
+    def remove_account(self, uid: str) -> Optional[Dict[str, Any]]:
+        if (account := self.accounts.pop(uid, None)) is not None and account.get("email"):
+            del self.emails[account["email"]]
+        return account
+
+    def find_account(self, email: str) -> Optional[Dict[str, Any]]:
+        uid = self.emails.get(email.lower())
+        return self.accounts[uid] if uid is not None else None
+
+    def get_account(self, uid: str) -> Dict[str, Any]:
+        if (account := self.accounts.get(uid)) is None:
+            if not self.auto_create_users:
+                raise IdentityPlatformError("USER_NOT_FOUND")
+            account = self.add_account(localId=uid)
+        return account
+
+    def issue_tokens(self, account: Dict[str, Any]) -> Dict[str, str]:
+        refresh_token = uuid.uuid4().hex
+        self.refresh_tokens[refresh_token] = account["localId"]
+        return {"idToken": uuid.uuid4().hex, "refreshToken": refresh_token, "expiresIn": "3600"}
+
+    async def inject_faults(self) -> None:
+        """Delays the response, and fails it when the quota is exceeded or an error is drawn."""
+        if self._quota is not None and self._quota.take("project"):
+            raise IdentityPlatformError("QUOTA_EXCEEDED", code=429, status="RESOURCE_EXHAUSTED")
+
+        latency = self.faults.latency_ms + self._random.uniform(
+            -self.faults.latency_jitter_ms, self.faults.latency_jitter_ms
+        )
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+        if self.faults.error_rate and self._random.random() < self.faults.error_rate:
+            raise IdentityPlatformError(
+                "Injected error.",
+                code=self.faults.error_status,
+                status="UNAVAILABLE" if self.faults.error_status == 503 else "INTERNAL",
+            )
+
+
+def faults_middleware(platform: IdentityPlatform):
+    """Middleware counting requests by endpoint (e.g. `accounts:lookup`), and injecting faults."""
+
+    @web.middleware
+    async def middleware(request: web.Request, handler: Handler) -> web.StreamResponse:
+        platform.calls[request.path.rsplit("/", 1)[-1]] += 1
+        try:
+            await platform.inject_faults()
+            return await handler(request)
+        except IdentityPlatformError as error:
+            return error.response()
+
+    return middleware
+
+
+async def sign_in_with_password(platform: IdentityPlatform, request: web.Request) -> web.Response:
+    data = await request.post()
+    email, password = str(data.get("email", "")), data.get("password")
+
+    if (account := platform.find_account(email)) is None:
+        if not platform.auto_create_users:
+            raise IdentityPlatformError("EMAIL_NOT_FOUND")
+        account = platform.add_account(email=email, password=password)
+    if platform.auto_create_users:
+        account.setdefault("password", password)
+    if account.get("password") != password:
+        raise IdentityPlatformError("INVALID_PASSWORD")
+    if account["disabled"]:
+        raise IdentityPlatformError("USER_DISABLED")
+
+    return web.json_response(
+        {
+            "kind": "identitytoolkit#VerifyPasswordResponse",
+            "localId": account["localId"],
+            "email": account["email"],
+            "displayName": account.get("displayName", ""),
+            "registered": True,
+            **platform.issue_tokens(account),
+        }
+    )
+
+
+async def refresh_token(platform: IdentityPlatform, request: web.Request) -> web.Response:
+    data = await request.post()
+    token = str(data.get("refresh_token", ""))
+
+    if (uid := platform.refresh_tokens.get(token)) is None:
+        if not platform.auto_create_users:
+            raise IdentityPlatformError("INVALID_REFRESH_TOKEN", status="INVALID_ARGUMENT")
+        uid = platform.refresh_tokens[token] = platform.add_account()["localId"]
+    if (account := platform.accounts.get(uid)) is None:
+        raise IdentityPlatformError("USER_NOT_FOUND", status="INVALID_ARGUMENT")
+    if account["disabled"]:
+        raise IdentityPlatformError("USER_DISABLED", status="INVALID_ARGUMENT")
+
+    id_token = uuid.uuid4().hex
+    return web.json_response(
+        {
+            "access_token": id_token,
+            "expires_in": "3600",
+            "token_type": "Bearer",
+            "refresh_token": token,
+            "id_token": id_token,
+            "user_id": uid,
+            "project_id": "identity-platform-stand-in",
+        }
+    )
+
+
+async def create_account(platform: IdentityPlatform, request: web.Request) -> web.Response:
+    data = await request.json()
+    account = platform.add_account(**data)
+    return web.json_response(
+        {"kind": "identitytoolkit#SignupNewUserResponse", "localId": account["localId"]}
+    )
+
+
+async def lookup_accounts(platform: IdentityPlatform, request: web.Request) -> web.Response:
+    data = await request.json()
+    accounts: List[Optional[Dict[str, Any]]] = [
+        *(platform.accounts.get(uid) for uid in data.get("localId", [])),
+        *(platform.find_account(email) for email in data.get("email", [])),
+    ]
+    users = [
+        {field: value for field, value in account.items() if field != "password"}
+        for account in accounts
+        if account is not None
+    ]
+
+    response: Dict[str, Any] = {"kind": "identitytoolkit#GetAccountInfoResponse"}
+    if users:
+        response["users"] = users
+    return web.json_response(response)
+
+
+async def update_account(platform: IdentityPlatform, request: web.Request) -> web.Response:
+    data = await request.json()
+    account = platform.get_account(data.pop("localId"))
+
+    if "disableUser" in data:
+        data["disabled"] = data.pop("disableUser")
+    for field in data.pop("deleteAttribute", []):
+        account.pop({"DISPLAY_NAME": "displayName", "PHOTO_URL": "photoUrl"}[field], None)
+    data.pop("deleteProvider", None)
+    platform.update_account(account, **data)
+
+    return web.json_response(
+        {"kind": "identitytoolkit#SetAccountInfoResponse", "localId": account["localId"]}
+    )
+
+
+async def delete_account(platform: IdentityPlatform, request: web.Request) -> web.Response:
+    data = await request.json()
+    if platform.remove_account(data["localId"]) is None and not platform.auto_create_users:
+        raise IdentityPlatformError("USER_NOT_FOUND")
+
+    return web.json_response({"kind": "identitytoolkit#DeleteAccountResponse"})
+
+
+async def batch_delete_accounts(platform: IdentityPlatform, request: web.Request) -> web.Response:
+    data = await request.json()
+    # Unknown accounts are ignored, as by GCP Identity Platform.
+    for uid in data.get("localIds", []):
+        platform.remove_account(uid)
+
+    return web.json_response({})
+
+
+async def send_oob_code(platform: IdentityPlatform, request: web.Request) -> web.Response:
+    data = await request.json()
+    email = data.get("email", "")
+
+    if platform.find_account(email) is None:
+        if not platform.auto_create_users:
+            raise IdentityPlatformError("EMAIL_NOT_FOUND")
+        platform.add_account(email=email)
+
+    link = f"{request.url.origin()}/action?mode=resetPassword&oobCode={uuid.uuid4().hex}"
+    return web.json_response(
+        {"kind": "identitytoolkit#GetOobConfirmationCodeResponse", "email": email, "oobLink": link}
+    )
+
+
+def create_app(platform: Optional[IdentityPlatform] = None) -> web.Application:
+    platform = platform or IdentityPlatform()
+    app = web.Application(middlewares=[faults_middleware(platform)])
+
+    # Identity Toolkit REST API.
+    app.router.add_post("/v1/accounts:signInWithPassword", partial(sign_in_with_password, platform))
+    app.router.add_post("/v1/token", partial(refresh_token, platform))
+
+    # Admin API (Firebase Admin SDK calls).
+    for path, handler in {
+        "/accounts": create_account,
+        "/accounts:lookup": lookup_accounts,
+        "/accounts:update": update_account,
+        "/accounts:delete": delete_account,
+        "/accounts:batchDelete": batch_delete_accounts,
+        "/accounts:sendOobCode": send_oob_code,
+    }.items():
+        app.router.add_post(f"{ADMIN_API_PATH}{path}", partial(handler, platform))
+
+    return app
+
+
+@contextmanager
+def serve(platform: IdentityPlatform, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+    """
+    Serves the stand-in from a background thread (on a free port, by default) while in the context,
+    giving its `host:port` address.
+    """
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(create_app(platform), access_log=None)
+
+    async def start() -> str:
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        address = runner.addresses[0]
+        return f"{address[0]}:{address[1]}"
+
+    address = loop.run_until_complete(start())
+    thread = threading.Thread(target=loop.run_forever, name="identity-platform", daemon=True)
+    thread.start()
+    try:
+        yield address
+    finally:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0, help="Ratio of failed responses.")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--rate-limit", type=float, default=0, help="Requests per second.")
+    parser.add_argument("--rate-limit-burst", type=int, default=1)
+    parser.add_argument("--seed", type=int, help="Random seed of the injected errors.")
+    parser.add_argument("--auto-create-users", action="store_true")
+    args = parser.parse_args()
+
+    faults = Faults(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        rate_limit=args.rate_limit,
+        rate_limit_burst=args.rate_limit_burst,
+        seed=args.seed,
+    )
+    platform = IdentityPlatform(faults=faults, auto_create_users=args.auto_create_users)
+    web.run_app(create_app(platform), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+HTTP load test of every API endpoint, served by Uvicorn with a local PostgreSQL database seeded at
+the given scales (number of users), and with local stand-ins for GCP Identity Platform (see
+`benchmarks.identity_platform`, which can inject errors and rate limits too) and Pub/Sub.
+Latency percentiles and throughput of every endpoint, at every concurrency level, are written as
+JSON, so results can be compared between releases.
+
+Usage:
+
+    python -m benchmarks.load --scales 1000 100000 1000000 --concurrency 1 10 50 \\
+        --output benchmark-results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, IO, List
+
+from aiohttp import ClientError, ClientSession
+
+from benchmarks.load.driver import run_scenario
+from benchmarks.load.scenarios import SCENARIOS
+from benchmarks.load.seed import get_database_url, seed
+from benchmarks.load.stand_ins import REMOTE_LATENCY_ENV
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+async def wait_until_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with ClientSession() as session:
+        while True:
+            try:
+                async with session.get(url) as response:
+                    if response.status < 500:
+                        return
+            except ClientError:
+                if time.monotonic() > deadline:
+                    raise
+            await asyncio.sleep(0.1)
+
+
+def start_server(args: argparse.Namespace, database_url: str, log: IO) -> List[subprocess.Popen]:
+    """Starts the GCP Identity Platform stand-in and the application, with the stand-ins of the
+    remote services in place, served by Uvicorn. Their output is written to `log`.
+    """
+    identity_platform_address = f"127.0.0.1:{args.port + 1}"
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "DEBUG": "false",
+        # Load is generated from a single IP address, for a few users.
+        "RATE_LIMIT_ENABLED": "false",
+        REMOTE_LATENCY_ENV: str(args.remote_latency_ms),
+        "GCP_IDENTITY_TOOLKIT_URL": f"http://{identity_platform_address}",
+        "GCP_AUTH_EMULATOR_HOST": identity_platform_address,
+    }
+    processes = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.identity_platform",
+                "--port",
+                str(args.port + 1),
+                "--latency-ms",
+                str(args.remote_latency_ms),
+                "--error-rate",
+                str(args.remote_error_rate),
+                "--rate-limit",
+                str(args.remote_rate_limit),
+                "--rate-limit-burst",
+                str(args.remote_rate_limit_burst),
+                # Users are only seeded in the database.
+                "--auto-create-users",
+            ],
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        ),
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "--factory",
+                "benchmarks.load.stand_ins:create_app",
+                "--port",
+                str(args.port),
+                "--workers",
+                str(args.workers),
+                "--no-access-log",
+                "--log-level",
+                "warning",
+            ],
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        ),
+    ]
+    try:
+        asyncio.run(wait_until_ready(f"http://{identity_platform_address}/"))
+        asyncio.run(wait_until_ready(f"http://127.0.0.1:{args.port}/metrics"))
+    except ClientError:
+        stop_server(processes)
+        raise
+
+    return processes
+
+
+def stop_server(processes: List[subprocess.Popen]) -> None:
+    for process in processes:
+        process.terminate()
+        process.wait()
+
+
+def print_result(scale: int, result: Dict[str, Any]) -> None:
+    latency = result["latency_ms"]
+    print(
+        f"{scale:>9,} {result['endpoint']:>26} {result['concurrency']:>5} "
+        f"{result['requests_per_second']:>9,.0f} {latency['p50']:>9.1f} {latency['p95']:>9.1f} "
+        f"{latency['p99']:>9.1f} {result['errors']:>7}",
+        file=sys.stderr,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000], help="Users seeded.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=500, help="Timed requests per run.")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests per run.")
+    parser.add_argument("--workers", type=int, default=1, help="Uvicorn worker processes.")
+    parser.add_argument("--remote-latency-ms", type=float, default=0)
+    parser.add_argument("--remote-error-rate", type=float, default=0)
+    parser.add_argument("--remote-rate-limit", type=float, default=0, help="Requests per second.")
+    parser.add_argument("--remote-rate-limit-burst", type=int, default=1)
+    parser.add_argument("--endpoints", nargs="+", help="Endpoints to run (all by default).")
+    parser.add_argument("--port", type=int, default=8789)
+    parser.add_argument("--output", help="JSON results file (standard output by default).")
+    parser.add_argument("--server-log", default=os.devnull, help="Application output file.")
+    args = parser.parse_args()
+
+    scenarios = [s for s in SCENARIOS if not args.endpoints or s.name in args.endpoints]
+    database_url = get_database_url()
+    # Every run gets a range of indexes (i.e. disposable rows) of its own.
+    run_size = args.warmup + args.requests
+    report: Dict[str, Any] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "parameters": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "workers": args.workers,
+            "remote_latency_ms": args.remote_latency_ms,
+            "remote_error_rate": args.remote_error_rate,
+            "remote_rate_limit": args.remote_rate_limit,
+        },
+        "datasets": [],
+    }
+
+    print(
+        f"{'users':>9} {'endpoint':>26} {'conc.':>5} {'req/s':>9} {'p50 (ms)':>9} "
+        f"{'p95 (ms)':>9} {'p99 (ms)':>9} {'errors':>7}",
+        file=sys.stderr,
+    )
+    for scale in args.scales:
+        dataset = seed(database_url, users=scale, disposable=len(args.concurrency) * run_size)
+        results = []
+        with open(args.server_log, "a", encoding="utf-8") as log:
+            processes = start_server(args, database_url, log)
+        try:
+            for scenario in scenarios:
+                for run, concurrency in enumerate(args.concurrency):
+                    result = asyncio.run(
+                        run_scenario(
+                            f"http://127.0.0.1:{args.port}",
+                            scenario,
+                            dataset,
+                            concurrency=concurrency,
+                            requests=args.requests,
+                            warmup=args.warmup,
+                            offset=run * run_size,
+                        )
+                    )
+                    print_result(scale, result)
+                    results.append(result)
+        finally:
+            stop_server(processes)
+
+        report["datasets"].append(
+            {"users": scale, "seed_seconds": dataset.seed_seconds, "results": results}
+        )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Load driver: sends the requests of a scenario from `concurrency` concurrent clients, each sending a
+request as soon as the previous one is answered (closed-loop load), and reports the latency
+percentiles and throughput.
+"""
+import asyncio
+import statistics
+from collections import Counter
+from itertools import count
+from time import perf_counter
+from typing import Any, Dict, Iterator, List
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from benchmarks.load.scenarios import Scenario
+from benchmarks.load.seed import Dataset
+
+
+async def send(session: ClientSession, base_url: str, scenario: Scenario, dataset: Dataset, i: int):
+    request = scenario.build(dataset, i)
+    start = perf_counter()
+    async with session.request(
+        request.method, f"{base_url}{request.path}", headers=request.headers, json=request.json
+    ) as response:
+        await response.read()
+
+    return response.status, (perf_counter() - start) * 1000
+
+
+async def run_scenario(
+    base_url: str,
+    scenario: Scenario,
+    dataset: Dataset,
+    concurrency: int,
+    requests: int,
+    warmup: int,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    """Runs `warmup` untimed requests and then `requests` timed ones, built with the indexes from
+    `offset` on, so every run can be given indexes (i.e. disposable rows) of its own.
+    """
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+
+    async with ClientSession(
+        connector=TCPConnector(limit=concurrency), timeout=ClientTimeout(total=60)
+    ) as session:
+
+        async def worker(indexes: Iterator[int], record: bool) -> None:
+            for i in indexes:
+                status_code, latency = await send(session, base_url, scenario, dataset, i)
+                if record:
+                    statuses[status_code] += 1
+                    latencies.append(latency)
+
+        async def run(start: int, total: int, record: bool) -> None:
+            # Workers share the indexes iterator, taking the next index when they are ready to send.
+            indexes = (i for i, _ in zip(count(start), range(total)))
+            await asyncio.gather(*(worker(indexes, record) for _ in range(concurrency)))
+
+        await run(offset, warmup, record=False)
+        start = perf_counter()
+        await run(offset + warmup, requests, record=True)
+        elapsed = perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "endpoint": scenario.name,
+        "method": scenario.method,
+        "route": scenario.route,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(n for code, n in statuses.items() if code not in scenario.expected),
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+        "requests_per_second": round(requests / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentiles[49], 2),
+            "p95": round(percentiles[94], 2),
+            "p99": round(percentiles[98], 2),
+            "mean": round(statistics.fmean(latencies), 2),
+            "max": round(max(latencies), 2),
+        },
+    }
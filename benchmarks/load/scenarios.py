@@ -0,0 +1,278 @@
+"""
+Benchmark scenarios: one per API endpoint, building the `i`-th request sent to the endpoint.
+
+Scenarios are run in the order they are listed. Requests creating rows use unique values for every
+index, and the ones updating or deleting rows use a disposable row per index, so scenarios listed
+last (deleting rows used by the former ones) don't change what the former ones measure.
+"""
+import base64
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import status
+
+from benchmarks.load.seed import Dataset
+
+
+PASSWORD = "Benchmark-password-1"
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    json: Optional[Any] = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    route: str
+    build: Callable[[Dataset, int], Request]
+    expected: Tuple[int, ...] = (status.HTTP_200_OK,)
+
+
+def user_info(uid, staff: bool = False, roles: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """GCP API Gateway user information header, as sent once the request user JWT is checked."""
+    payload = {"user_id": str(uid), "staff": staff, "roles": roles or {}}
+    return {"X-Apigateway-Api-Userinfo": base64.b64encode(json.dumps(payload).encode()).decode()}
+
+
+def staff(dataset: Dataset) -> Dict[str, str]:
+    return user_info(dataset.staff_uid, staff=True)
+
+
+def member(dataset: Dataset) -> Dict[str, str]:
+    return user_info(dataset.member_uid, roles=dataset.member_roles)
+
+
+def pick(values: list, i: int):
+    return values[i % len(values)]
+
+
+SCENARIOS = [
+    # Read-only scenarios.
+    Scenario(
+        "list_capabilities",
+        "GET",
+        "/api/v1/capabilities",
+        lambda d, i: Request("GET", "/api/v1/capabilities", member(d)),
+    ),
+    Scenario(
+        "get_capability",
+        "GET",
+        "/api/v1/capabilities/{capability_id}",
+        lambda d, i: Request("GET", f"/api/v1/capabilities/{pick(d.capability_ids, i)}", member(d)),
+    ),
+    Scenario(
+        "list_clients",
+        "GET",
+        "/api/v1/clients",
+        lambda d, i: Request("GET", "/api/v1/clients", member(d)),
+    ),
+    Scenario(
+        "get_client",
+        "GET",
+        "/api/v1/clients/{uid}",
+        lambda d, i: Request("GET", f"/api/v1/clients/{pick(d.client_uids, i)}", staff(d)),
+    ),
+    Scenario(
+        "get_client_capabilities",
+        "GET",
+        "/api/v1/clients/{uid}/capabilities",
+        lambda d, i: Request(
+            "GET", f"/api/v1/clients/{pick(d.client_uids, i)}/capabilities", staff(d)
+        ),
+    ),
+    Scenario(
+        "check_client_capability",
+        "GET",
+        "/api/v1/clients/{uid}/capabilities/{capability_id}",
+        lambda d, i: Request(
+            "GET",
+            f"/api/v1/clients/{pick(d.client_uids, i)}/capabilities/{pick(d.capability_ids, i)}",
+            staff(d),
+        ),
+    ),
+    Scenario(
+        "get_clients_capabilities",
+        "POST",
+        "/api/v1/clients/capabilities",
+        lambda d, i: Request(
+            "POST",
+            "/api/v1/clients/capabilities",
+            member(d),
+            {"client_uids": list(d.member_roles)},
+        ),
+    ),
+    Scenario(
+        "verify_api_token",
+        "POST",
+        "/api/v1/clients/api-token/verify",
+        lambda d, i: Request(
+            "POST", "/api/v1/clients/api-token/verify", json={"token": d.api_token}
+        ),
+    ),
+    Scenario(
+        "list_users",
+        "GET",
+        "/api/v1/users",
+        lambda d, i: Request("GET", "/api/v1/users", member(d)),
+    ),
+    Scenario(
+        "get_user",
+        "GET",
+        "/api/v1/users/{uid}",
+        lambda d, i: Request("GET", f"/api/v1/users/{pick(d.user_uids, i)}", staff(d)),
+    ),
+    Scenario(
+        "login",
+        "POST",
+        "/api/v1/login",
+        lambda d, i: Request(
+            "POST", "/api/v1/login", json={"email": pick(d.user_emails, i), "password": PASSWORD}
+        ),
+    ),
+    Scenario(
+        "refresh_token",
+        "POST",
+        "/api/v1/login/refresh-token",
+        lambda d, i: Request(
+            "POST", "/api/v1/login/refresh-token", json={"refresh_token": f"refresh-token-{i}"}
+        ),
+    ),
+    Scenario(
+        "reset_user_password",
+        "GET",
+        "/api/v1/users/{email}/reset-password",
+        lambda d, i: Request("GET", f"/api/v1/users/{pick(d.user_emails, i)}/reset-password"),
+        (status.HTTP_204_NO_CONTENT,),
+    ),
+    # Scenarios creating rows.
+    Scenario(
+        "create_capability",
+        "POST",
+        "/api/v1/capabilities",
+        lambda d, i: Request("POST", "/api/v1/capabilities", staff(d), {"name": f"Bench-{i}"}),
+        (status.HTTP_201_CREATED,),
+    ),
+    Scenario(
+        "create_client",
+        "POST",
+        "/api/v1/clients",
+        lambda d, i: Request("POST", "/api/v1/clients", staff(d), {"name": f"Bench-{i}"}),
+        (status.HTTP_201_CREATED,),
+    ),
+    Scenario(
+        "create_user",
+        "POST",
+        "/api/v1/users",
+        lambda d, i: Request(
+            "POST",
+            "/api/v1/users",
+            staff(d),
+            {
+                "name": f"Bench user {i}",
+                "email": f"bench-user-{i}@hummingbirdtech.com",
+                "role": {"client_uid": str(pick(d.client_uids, i)), "role": "NORMAL_USER"},
+            },
+        ),
+        (status.HTTP_201_CREATED,),
+    ),
+    # Scenarios updating disposable rows.
+    Scenario(
+        "enable_capability",
+        "POST",
+        "/api/v1/capabilities/enable",
+        lambda d, i: Request(
+            "POST",
+            "/api/v1/capabilities/enable",
+            staff(d),
+            {"client_uid": str(d.disposable_client_uids[i]), "capability_id": d.free_capability_id},
+        ),
+        (status.HTTP_204_NO_CONTENT,),
+    ),
+    Scenario(
+        "disable_capability",
+        "POST",
+        "/api/v1/capabilities/disable",
+        lambda d, i: Request(
+            "POST",
+            "/api/v1/capabilities/disable",
+            staff(d),
+            {"client_uid": str(d.disposable_client_uids[i]), "capability_id": d.free_capability_id},
+        ),
+        (status.HTTP_204_NO_CONTENT,),
+    ),
+    Scenario(
+        "update_client",
+        "PATCH",
+        "/api/v1/clients/{uid}",
+        lambda d, i: Request(
+            "PATCH",
+            f"/api/v1/clients/{d.disposable_client_uids[i]}",
+            staff(d),
+            {"name": f"Bench-updated-{i}"},
+        ),
+    ),
+    Scenario(
+        "generate_api_token",
+        "GET",
+        "/api/v1/clients/{uid}/api-token",
+        lambda d, i: Request(
+            "GET", f"/api/v1/clients/{d.disposable_client_uids[i]}/api-token", staff(d)
+        ),
+    ),
+    Scenario(
+        "update_user",
+        "PATCH",
+        "/api/v1/users/{uid}",
+        lambda d, i: Request(
+            "PATCH",
+            f"/api/v1/users/{d.disposable_users[i].uid}",
+            staff(d),
+            {"name": f"Bench updated user {i}"},
+        ),
+    ),
+    Scenario(
+        "create_user_password",
+        "POST",
+        "/api/v1/users/{gcp_user_uid}/create-password/{security_token}",
+        lambda d, i: Request(
+            "POST",
+            f"/api/v1/users/{d.disposable_users[i].uid}/create-password/"
+            f"{d.disposable_users[i].security_token}",
+            json={"password": PASSWORD, "verified_password": PASSWORD},
+        ),
+        (status.HTTP_204_NO_CONTENT,),
+    ),
+    # Scenarios deleting disposable rows.
+    Scenario(
+        "delete_user_role",
+        "DELETE",
+        "/api/v1/users/{uid}/roles/{client_uid}",
+        lambda d, i: Request(
+            "DELETE",
+            f"/api/v1/users/{d.disposable_users[i].uid}/roles/{d.client_uids[0]}",
+            staff(d),
+        ),
+        (status.HTTP_204_NO_CONTENT,),
+    ),
+    Scenario(
+        "delete_user",
+        "DELETE",
+        "/api/v1/users/{uid}",
+        lambda d, i: Request("DELETE", f"/api/v1/users/{d.disposable_users[i].uid}", staff(d)),
+        (status.HTTP_204_NO_CONTENT,),
+    ),
+    Scenario(
+        "delete_client",
+        "DELETE",
+        "/api/v1/clients/{uid}",
+        lambda d, i: Request("DELETE", f"/api/v1/clients/{d.disposable_client_uids[i]}", staff(d)),
+        (status.HTTP_204_NO_CONTENT,),
+    ),
+]
@@ -0,0 +1,266 @@
+"""
+Benchmark datasets, seeded in a dedicated `<DATABASE_URL database>_benchmark` database with the
+rows built by the test suite model factories. Rows are bulk inserted in batches, so seeding scales
+to millions of users (1M users take a few minutes).
+"""
+import uuid
+from dataclasses import dataclass, field
+from itertools import islice
+from time import perf_counter
+from typing import Any, Dict, Iterable, Iterator, List
+
+from pydantic import PostgresDsn
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import Connection, Engine
+
+from tests.factories import (
+    CapabilityFactory,
+    ClientAPITokenFactory,
+    ClientCapabilityFactory,
+    ClientFactory,
+    ClientUserFactory,
+    GCPUserFactory,
+    SecurityTokenFactory,
+)
+from user_management.core.config.settings import get_settings
+from user_management.core.database import Base
+from user_management.models import (
+    Capability,
+    Client,
+    ClientAPIToken,
+    ClientCapability,
+    ClientUser,
+    GCPUser,
+    Role,
+    SecurityToken,
+)
+
+
+BATCH_SIZE = 10000
+USERS_PER_CLIENT = 10
+CAPABILITIES = 50
+CAPABILITIES_PER_CLIENT = 5
+# Sample of seeded rows kept for scenarios to pick from, rather than every row of large datasets.
+SAMPLE_SIZE = 10000
+
+
+@dataclass
+class DisposableUser:
+    uid: uuid.UUID
+    security_token: uuid.UUID
+
+
+@dataclass
+class Dataset:
+    """Seeded rows the benchmark scenarios run requests against.
+
+    Scenarios only write to disposable rows and to rows they create, so every scenario sees the
+    same dataset whatever the scenarios ran before it.
+    """
+
+    users: int
+    staff_uid: uuid.UUID
+    # Member of every client in `client_uids` (`SUPERUSER` of the first one).
+    member_uid: uuid.UUID
+    member_roles: Dict[str, str]
+    user_uids: List[uuid.UUID]
+    user_emails: List[str]
+    client_uids: List[uuid.UUID]
+    capability_ids: List[int]
+    # Not enabled for any client.
+    free_capability_id: int
+    # Valid API token of the first client.
+    api_token: str
+    disposable_users: List[DisposableUser] = field(default_factory=list)
+    disposable_client_uids: List[uuid.UUID] = field(default_factory=list)
+    seed_seconds: float = 0
+
+
+def get_database_url() -> str:
+    settings = get_settings()
+    return PostgresDsn.build(
+        scheme="postgresql",
+        user=settings.database_url.user,
+        password=settings.database_url.password,
+        host=settings.database_url.host,
+        port=settings.database_url.port,
+        path=f"/{settings.database_url.path.lstrip('/')}_benchmark",
+    )
+
+
+def create_database(database_url: str) -> Engine:
+    """(Re)creates the benchmark database, returning an engine bound to it."""
+    db_name = database_url.rsplit("/", 1)[1]
+    manager = create_engine(database_url.rsplit("/", 1)[0], isolation_level="AUTOCOMMIT")
+    with manager.connect() as connection:
+        connection.execute(text(f'DROP DATABASE IF EXISTS "{db_name}" WITH (FORCE)'))
+        connection.execute(text(f'CREATE DATABASE "{db_name}"'))
+    manager.dispose()
+
+    engine = create_engine(database_url, executemany_mode="values_plus_batch")
+    with engine.begin() as connection:
+        connection.execute(text('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"'))
+        Base.metadata.create_all(bind=connection)  # type: ignore
+
+    return engine
+
+
+def row(instance: Any) -> Dict[str, Any]:
+    """Column values of a model instance built by a factory, leaving server defaults out."""
+    return {
+        column.key: value
+        for column in instance.__table__.columns
+        if (value := getattr(instance, column.key)) is not None
+    }
+
+
+def bulk_insert(connection: Connection, model: Any, instances: Iterable[Any]) -> None:
+    rows = (row(instance) for instance in instances)
+    while batch := list(islice(rows, BATCH_SIZE)):
+        connection.execute(insert(model), batch)
+
+
+def seed(database_url: str, users: int, disposable: int) -> Dataset:
+    """
+    Seeds a dataset of `users` client users, one client every `USERS_PER_CLIENT` users, and
+    `CAPABILITIES` capabilities, `CAPABILITIES_PER_CLIENT` of them enabled per client. `disposable`
+    users (with a security token and a role in the first client) and clients are seeded too, for
+    scenarios that update or delete rows to use once each.
+    """
+    start = perf_counter()
+    engine = create_database(database_url)
+    clients = max(users // USERS_PER_CLIENT, 1)
+
+    with engine.begin() as connection:
+        capabilities = CapabilityFactory.build_batch(CAPABILITIES + 1)
+        bulk_insert(connection, Capability, capabilities)
+        capability_ids = [
+            id_ for (id_,) in connection.execute(text("SELECT id FROM capability ORDER BY id"))
+        ]
+        free_capability_id = capability_ids.pop()
+
+        client_uids = [uuid.uuid4() for _ in range(clients)]
+        bulk_insert(connection, Client, (ClientFactory.build(uid=uid) for uid in client_uids))
+        bulk_insert(
+            connection,
+            ClientCapability,
+            (
+                ClientCapabilityFactory.build(
+                    client=None,
+                    capability=None,
+                    client_uid=client_uid,
+                    capability_id=capability_ids[(index + offset) % CAPABILITIES],
+                )
+                for index, client_uid in enumerate(client_uids)
+                for offset in range(CAPABILITIES_PER_CLIENT)
+            ),
+        )
+
+        api_token = uuid.uuid4().hex
+        bulk_insert(
+            connection,
+            ClientAPIToken,
+            [ClientAPITokenFactory.build(client=None, client_uid=client_uids[0], token=api_token)],
+        )
+
+        staff = GCPUserFactory.build(uid=uuid.uuid4(), staff=True)
+        bulk_insert(connection, GCPUser, [staff])
+
+        user_uids = [uuid.uuid4() for _ in range(users)]
+        user_emails: List[str] = []
+
+        def build_users() -> Iterator[GCPUser]:
+            for uid in user_uids:
+                user = GCPUserFactory.build(uid=uid)
+                if len(user_emails) < SAMPLE_SIZE:
+                    user_emails.append(user.email)
+                yield user
+
+        bulk_insert(connection, GCPUser, build_users())
+
+        member_uid = user_uids[0]
+        member_clients = client_uids[: min(clients, 3)]
+        member_roles = {str(uid): Role.NORMAL_USER.value for uid in member_clients}
+        member_roles[str(client_uids[0])] = Role.SUPERUSER.value
+        bulk_insert(
+            connection,
+            ClientUser,
+            (
+                ClientUserFactory.build(
+                    user=None,
+                    client=None,
+                    gcp_user_uid=uid,
+                    client_uid=client_uids[index // USERS_PER_CLIENT],
+                    role=Role.SUPERUSER if index == 0 else Role.NORMAL_USER,
+                )
+                for index, uid in enumerate(user_uids)
+            ),
+        )
+        bulk_insert(
+            connection,
+            ClientUser,
+            [
+                ClientUserFactory.build(
+                    user=None,
+                    client=None,
+                    gcp_user_uid=member_uid,
+                    client_uid=uid,
+                    role=Role.NORMAL_USER,
+                )
+                for uid in member_clients[1:]
+            ],
+        )
+
+        disposable_users = [DisposableUser(uuid.uuid4(), uuid.uuid4()) for _ in range(disposable)]
+        bulk_insert(
+            connection, GCPUser, (GCPUserFactory.build(uid=user.uid) for user in disposable_users)
+        )
+        bulk_insert(
+            connection,
+            SecurityToken,
+            (
+                SecurityTokenFactory.build(
+                    user=None, uid=user.security_token, gcp_user_uid=user.uid
+                )
+                for user in disposable_users
+            ),
+        )
+        bulk_insert(
+            connection,
+            ClientUser,
+            (
+                ClientUserFactory.build(
+                    user=None,
+                    client=None,
+                    gcp_user_uid=user.uid,
+                    client_uid=client_uids[0],
+                    role=Role.NORMAL_USER,
+                )
+                for user in disposable_users
+            ),
+        )
+
+        disposable_client_uids = [uuid.uuid4() for _ in range(disposable)]
+        bulk_insert(
+            connection, Client, (ClientFactory.build(uid=uid) for uid in disposable_client_uids)
+        )
+
+    with engine.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+    engine.dispose()
+
+    return Dataset(
+        users=users,
+        staff_uid=staff.uid,
+        member_uid=member_uid,
+        member_roles=member_roles,
+        user_uids=user_uids[:SAMPLE_SIZE],
+        user_emails=user_emails,
+        client_uids=client_uids[:SAMPLE_SIZE],
+        capability_ids=capability_ids,
+        free_capability_id=free_capability_id,
+        api_token=api_token,
+        disposable_users=disposable_users,
+        disposable_client_uids=disposable_client_uids,
+        seed_seconds=round(perf_counter() - start, 2),
+    )
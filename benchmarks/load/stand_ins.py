@@ -0,0 +1,61 @@
+"""
+Local stand-ins for the remote services the application calls, so load tests measure this service
+alone. Pub/Sub publishes are replaced in-process, taking `BENCHMARK_REMOTE_LATENCY_MS` each, while
+GCP Identity Platform calls go to the `benchmarks.identity_platform` stand-in server, through the
+`GCP_IDENTITY_TOOLKIT_URL` and `GCP_AUTH_EMULATOR_HOST` settings.
+
+The application with the stand-ins in place is served with:
+
+    GCP_IDENTITY_TOOLKIT_URL=http://127.0.0.1:8790 GCP_AUTH_EMULATOR_HOST=127.0.0.1:8790 \\
+        uvicorn --factory benchmarks.load.stand_ins:create_app
+
+And the GCP Identity Platform stand-in with:
+
+    python -m benchmarks.identity_platform --port 8790 --auto-create-users
+"""
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import Future
+from unittest import mock
+
+from fastapi import FastAPI
+
+
+REMOTE_LATENCY_ENV = "BENCHMARK_REMOTE_LATENCY_MS"
+
+
+def remote_latency() -> float:
+    return float(os.environ.get(REMOTE_LATENCY_ENV, 0)) / 1000
+
+
+class PublisherClient:
+    """Pub/Sub `PublisherClient` stand-in, publishing messages nowhere."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    @staticmethod
+    def topic_path(project: str, topic: str) -> str:
+        return f"projects/{project}/topics/{topic}"
+
+    def publish(self, topic: str, data: bytes, **attributes) -> Future:
+        # pylint: disable=unused-argument
+        time.sleep(remote_latency())
+        future: Future = Future()
+        future.set_result(uuid.uuid4().hex)
+        return future
+
+
+def create_app() -> FastAPI:
+    """`uvicorn --factory` entry point: the application, with remote services stand-ins."""
+    mock.patch("user_management.services.mailer.get_publisher_client", PublisherClient).start()
+
+    from user_management.main import create_app as create_application  # pylint: disable=C0415
+
+    app = create_application()
+    # The application logging configuration re-enables Uvicorn access logs, which would measure
+    # the log output too.
+    logging.getLogger("uvicorn.access").disabled = True
+    return app
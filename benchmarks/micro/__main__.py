@@ -0,0 +1,53 @@
+"""
+Micro-benchmarks of the request hot paths, compared to stored baselines, failing when any of them
+regresses beyond the threshold.
+
+Baselines are stored in `benchmarks/micro/baselines`, per machine (OS, Python implementation and
+version), as timings are only comparable when measured in the same environment.
+
+Usage:
+
+    python -m benchmarks.micro save                    # Stores a new baseline.
+    python -m benchmarks.micro compare --threshold 25  # Compares with the latest baseline.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import pytest
+
+
+SUITE = Path(__file__).resolve().parent
+BASELINES = SUITE / "baselines"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["save", "compare"])
+    parser.add_argument("--name", default="baseline", help="Name of the baseline saved.")
+    parser.add_argument("--baseline", help="Baseline number to compare with (latest by default).")
+    parser.add_argument(
+        "--threshold", type=int, default=25, help="Median time regression allowed (%%)."
+    )
+    args = parser.parse_args()
+
+    options = [
+        str(SUITE),
+        "--benchmark-only",
+        f"--benchmark-storage={BASELINES}",
+        "--benchmark-columns=min,median,mean,stddev,rounds",
+        "--benchmark-sort=name",
+    ]
+    if args.command == "save":
+        options.append(f"--benchmark-save={args.name}")
+    else:
+        options += [
+            f"--benchmark-compare={args.baseline}" if args.baseline else "--benchmark-compare",
+            f"--benchmark-compare-fail=median:{args.threshold}%",
+        ]
+
+    sys.exit(pytest.main(options))
+
+
+if __name__ == "__main__":
+    main()
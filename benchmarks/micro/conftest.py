@@ -0,0 +1,8 @@
+"""Test suite fixtures, made available to the micro-benchmarks needing a database."""
+# pylint: disable=unused-import
+from tests.conftest import (
+    auto_disposable_database,
+    reset_capability_index,
+    sql_factory_init,
+    testing_db_session,
+)
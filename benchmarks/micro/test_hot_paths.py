@@ -0,0 +1,89 @@
+"""
+Micro-benchmarks of the code run on every request: request user checks, repositories set up and
+responses, API tokens checks and schema validators.
+"""
+import base64
+import json
+import uuid
+
+import pytest
+from sqlalchemy.orm import Session
+
+from tests.factories import GCPUserFactory
+from user_management.core.dependencies import RequestUserCheck
+from user_management.models import ClientUser, Role
+from user_management.repositories import ClientRepository, GCPUserRepository
+from user_management.schemas import check_empty_string, check_phone_number, GCPUserSchema
+
+
+@pytest.fixture(name="gcp_user")
+def built_gcp_user():
+    """`GCPUser` with a few client roles, as loaded from the database (but never stored)."""
+    gcp_user = GCPUserFactory.build(uid=uuid.uuid4(), staff=False)
+    gcp_user.clients = [
+        ClientUser(client_uid=uuid.uuid4(), gcp_user_uid=gcp_user.uid, role=role) for role in Role
+    ]
+    return gcp_user
+
+
+@pytest.mark.benchmark(group="dependencies")
+def test_get_user(benchmark, gcp_user):
+    payload = base64.b64encode(
+        json.dumps(
+            {
+                "name": gcp_user.name,
+                "staff": False,
+                "roles": {str(role.client_uid): role.role.value for role in gcp_user.clients},
+                "user_id": str(gcp_user.uid),
+                "email": gcp_user.email,
+            }
+        ).encode()
+    ).decode()
+
+    user = benchmark(RequestUserCheck.get_user, x_apigateway_api_userinfo=payload)
+
+    assert user.uid == gcp_user.uid
+
+
+@pytest.mark.benchmark(group="repositories")
+def test_repository_init(benchmark):
+    repository = benchmark(GCPUserRepository, Session())
+
+    assert repository.properties
+
+
+@pytest.mark.benchmark(group="repositories")
+def test_repository_response(benchmark, gcp_user):
+    repository = GCPUserRepository(Session())
+
+    response = benchmark(repository._response, gcp_user)  # pylint: disable=protected-access
+
+    assert len(response.clients) == len(Role)
+
+
+@pytest.mark.benchmark(group="repositories")
+def test_check_api_token(benchmark, test_db_session, sql_factory):
+    sql_factory.client_api_token.create(token="benchmark-api-token")
+    repository = ClientRepository(test_db_session)
+
+    verified = benchmark(repository.check_api_token, token="benchmark-api-token")
+
+    assert verified.client_uid
+
+
+@pytest.mark.benchmark(group="schemas")
+@pytest.mark.parametrize("phone_number", ["+44 7700 900123", None])
+def test_check_phone_number(benchmark, phone_number):
+    benchmark(check_phone_number, phone_number)
+
+
+@pytest.mark.benchmark(group="schemas")
+def test_check_empty_string(benchmark):
+    assert benchmark(check_empty_string, "John Doe") == "John Doe"
+
+
+@pytest.mark.benchmark(group="schemas")
+def test_gcp_user_schema(benchmark, gcp_user):
+    schema = benchmark(GCPUserSchema.from_orm, gcp_user)
+
+    assert schema.uid == gcp_user.uid
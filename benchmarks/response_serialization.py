@@ -0,0 +1,84 @@
+"""
+Compares the throughput of serializing `GCPUserSchema` lists, as returned by `GET /users`, with
+FastAPI default response path (validation against the `response_model`, `jsonable_encoder` and
+`json`) and with the `FastJSONRoute` path.
+
+Usage:
+
+    python -m benchmarks.response_serialization --sizes 100 1000 10000
+"""
+import argparse
+import asyncio
+import uuid
+from time import perf_counter
+from typing import Any, Callable, Coroutine, List
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from starlette.responses import JSONResponse
+
+from user_management.core.responses import FastJSONResponse
+from user_management.models import Role
+from user_management.schemas import ClientUserSchema, GCPUserSchema
+
+
+def build_gcp_users(size: int) -> List[GCPUserSchema]:
+    return [
+        GCPUserSchema(
+            uid=uuid.uuid4(),
+            name=f"GCPUser-{n}",
+            phone_number="+442081232389",
+            email=f"gcp-user-{n}@hummingbirdtech.com",
+            staff=False,
+            clients=[ClientUserSchema(client_uid=uuid.uuid4(), role=Role.NORMAL_USER)],
+        )
+        for n in range(size)
+    ]
+
+
+async def default_response(gcp_users: List[GCPUserSchema]) -> bytes:
+    field = create_response_field(name="Response_List_Users", type_=List[GCPUserSchema])
+    content = await serialize_response(field=field, response_content=gcp_users, is_coroutine=True)
+    return JSONResponse(content=content).body
+
+
+async def fast_json_response(gcp_users: List[GCPUserSchema]) -> bytes:
+    return FastJSONResponse(content=gcp_users).body
+
+
+def measure(
+    render: Callable[[List[GCPUserSchema]], Coroutine[Any, Any, bytes]],
+    gcp_users: List[GCPUserSchema],
+    rounds: int,
+) -> float:
+    """Returns the best items per second rate out of the given number of rounds."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = perf_counter()
+        asyncio.run(render(gcp_users))
+        best = min(best, perf_counter() - start)
+
+    return len(gcp_users) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'default (items/s)':>20} {'fast JSON (items/s)':>20} {'speedup':>8}")
+    for size in args.sizes:
+        gcp_users = build_gcp_users(size)
+        assert asyncio.run(default_response(gcp_users)) == asyncio.run(
+            fast_json_response(gcp_users)
+        )
+        default_rate = measure(default_response, gcp_users, rounds=args.rounds)
+        fast_rate = measure(fast_json_response, gcp_users, rounds=args.rounds)
+        print(
+            f"{size:>8} {default_rate:>20,.0f} {fast_rate:>20,.0f} {fast_rate / default_rate:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Measures the workers startup: the time to import the application (with `python -X importtime`)
+and the time a new Python process takes to have the application ready to serve requests, failing
+when the median readiness time exceeds the budget.
+
+Every measure runs in a new Python process, as modules are only imported once in a process. The
+slowest imports are listed, along with the heavy SDKs that were imported before the application
+was ready (these should only be imported when first used).
+
+Usage:
+
+    python -m benchmarks.startup --runs 5 --budget-ms 1200
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+
+# Worker readiness budget: from the process start to the application ready to serve requests.
+BUDGET_MS = 1200
+
+# SDKs that take long to import, and are only needed when their remote service is first called.
+HEAVY_MODULES = (
+    "aiohttp",
+    "firebase_admin",
+    "google.cloud.pubsub_v1",
+    "passlib",
+    "sentry_sdk",
+)
+
+READY = """
+import sys
+import user_management.main
+user_management.main.create_app()
+print(",".join(module for module in {modules!r} if module in sys.modules))
+"""
+
+
+def import_times() -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Application import time (in milliseconds), and the cumulative import time of every module
+    imported along, as reported by `python -X importtime`.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import user_management.main"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    modules: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            modules[module.strip()] = int(cumulative) / 1000
+
+    return modules["user_management.main"], sorted(modules.items(), key=lambda item: -item[1])
+
+
+def readiness_time() -> Tuple[float, List[str]]:
+    """
+    Time (in milliseconds) for a new Python process to import and create the application, and the
+    heavy SDKs imported by then.
+    """
+    start = perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", READY.format(modules=HEAVY_MODULES)],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    elapsed = (perf_counter() - start) * 1000
+    return elapsed, [module for module in result.stdout.strip().split(",") if module]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports listed.")
+    parser.add_argument(
+        "--budget-ms", type=float, default=BUDGET_MS, help="Median readiness time allowed."
+    )
+    args = parser.parse_args()
+
+    imports = [import_times() for _ in range(args.runs)]
+    print(f"Application import: {statistics.median(total for total, _ in imports):,.0f} ms")
+    print(f"\n{'cumulative (ms)':>16}  module")
+    for module, cumulative in imports[-1][1][: args.top]:
+        print(f"{cumulative:>16,.1f}  {module}")
+
+    readiness = [readiness_time() for _ in range(args.runs)]
+    median = statistics.median(elapsed for elapsed, _ in readiness)
+    print(f"\nWorker readiness: {median:,.0f} ms (budget: {args.budget_ms:,.0f} ms)")
+    if heavy_modules := readiness[-1][1]:
+        print(f"Heavy SDKs imported at startup: {', '.join(heavy_modules)}")
+
+    sys.exit(1 if median > args.budget_ms else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ from user_management.models import GCPUser, Role
 
 
 @patch("user_management.services.gcp_user.GCPIdentityPlatformService")
-@patch("user_management.services.mailer.PublisherClient")
+@patch("user_management.services.mailer.get_publisher_client")
 def test_create_gcp_user_success(mock_pubsub, mock_gcp_ip, test_client, user_info, test_db_session):
     """Users with a `SUPERUSER` role in a Client can create new users within that client."""
     mock_gcp_ip().sync_gcp_user.side_effect = None  # Mock out GCP-IP access.
@@ -35,7 +35,7 @@ def test_create_gcp_user_success(mock_pubsub, mock_gcp_ip, test_client, user_inf
 
 
 @patch("user_management.services.gcp_user.GCPIdentityPlatformService")
-@patch("user_management.services.mailer.PublisherClient")
+@patch("user_management.services.mailer.get_publisher_client")
 def test_create_gcp_user_staff(
     mock_pubsub, mock_gcp_ip, test_client, staff_user_info, test_db_session, sql_factory
 ):
@@ -64,7 +64,7 @@ def test_create_gcp_user_staff(
 
 
 @patch("user_management.services.gcp_user.GCPIdentityPlatformService")
-@patch("user_management.services.mailer.PublisherClient")
+@patch("user_management.services.mailer.get_publisher_client")
 def test_create_gcp_user_staff_no_client(
     mock_pubsub, mock_gcp_ip, test_client, staff_user_info, test_db_session
 ):
@@ -66,7 +66,7 @@ from tests.auth.mocks import (
         ),
     ],
 )
-@patch("user_management.services.gcp_identity.ClientSession.post")
+@patch("aiohttp.ClientSession.post")
 def test_login(
     mock_aiohttp,
     test_client,
@@ -172,7 +172,7 @@ def test_login(
         ),
     ],
 )
-@patch("user_management.services.gcp_identity.ClientSession.post")
+@patch("aiohttp.ClientSession.post")
 def test_refresh_token(
     mock_aiohttp,
     test_client,
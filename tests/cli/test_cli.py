@@ -0,0 +1,140 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy import func, select
+from typer.testing import CliRunner
+
+from user_management.cli import app
+from user_management.core.config.settings import get_settings
+from user_management.models import Capability, Client, ClientCapability, ClientUser, GCPUser
+from user_management.models import SecurityToken
+
+
+runner = CliRunner()
+
+
+@pytest.fixture(autouse=True)
+def test_database(disposable_database, test_db_session, monkeypatch):
+    """Runs the commands against the testing database."""
+    monkeypatch.setattr("user_management.cli.get_engine", lambda: disposable_database.engine)
+    monkeypatch.setattr("user_management.cli.db_session_factory", lambda: lambda: test_db_session)
+
+
+def count(session, model) -> int:
+    return session.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_seed(test_db_session):
+    result = runner.invoke(
+        app,
+        [
+            "seed",
+            "--users=25",
+            "--users-per-client=5",
+            "--capabilities=4",
+            "--capabilities-per-client=2",
+            "--batch-size=10",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "gcp_user: 25 rows in" in result.output
+    assert "rows/s" in result.output
+    assert count(test_db_session, GCPUser) == 25
+    assert count(test_db_session, ClientUser) == 25
+    assert count(test_db_session, Client) == 5
+    assert count(test_db_session, Capability) == 4
+    assert count(test_db_session, ClientCapability) == 10
+
+
+def test_seed_partial_client(test_db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "slow_query_threshold_ms", 0)
+
+    result = runner.invoke(app, ["seed", "--users=15", "--capabilities=2", "--batch-size=4"])
+
+    # The users left over are given a role in a client of their own.
+    assert result.exit_code == 0, result.output
+    assert count(test_db_session, GCPUser) == 15
+    assert count(test_db_session, ClientUser) == 15
+    assert count(test_db_session, Client) == 2
+
+
+def test_export_import(test_db_session, sql_factory, tmp_path):
+    client_user = sql_factory.client_user.create()
+    sql_factory.client_capability.create(client=client_user.client)
+    sql_factory.security_token.create(user=client_user.user)
+
+    result = runner.invoke(app, ["export", str(tmp_path)])
+
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "gcp_user.csv").read_text().startswith("uid,name,email,phone_number,staff")
+
+    # Rows already existing are skipped.
+    test_db_session.execute(GCPUser.__table__.delete())
+    test_db_session.commit()
+    result = runner.invoke(app, ["import", str(tmp_path)])
+
+    assert result.exit_code == 0, result.output
+    assert "client: 1 existing rows skipped" in result.output
+    assert "gcp_user: 1 rows in" in result.output
+    assert count(test_db_session, GCPUser) == 1
+    assert count(test_db_session, ClientUser) == 1
+    assert count(test_db_session, SecurityToken) == 1
+
+    # Sequences are kept ahead of the imported IDs.
+    assert sql_factory.capability.create().id > client_user.client.capabilities[0].capability_id
+
+
+def test_purge_security_tokens(test_db_session, sql_factory):
+    stale_token = sql_factory.security_token.create(
+        created=datetime.now(timezone.utc) - timedelta(hours=73)
+    )
+    token = sql_factory.security_token.create()
+
+    result = runner.invoke(app, ["purge-security-tokens", "--older-than=72", "--batch-size=1"])
+
+    assert result.exit_code == 0, result.output
+    assert "security_token: 1 rows in" in result.output
+    assert test_db_session.execute(select(SecurityToken.uid)).scalars().all() == [token.uid]
+    assert stale_token.uid != token.uid
+
+
+@patch("firebase_admin.auth.delete_users")
+@patch("firebase_admin.auth.set_custom_user_claims")
+@patch("firebase_admin.auth.create_user")
+@patch("user_management.services.gcp_identity.init_identity_platform_app")
+@patch("user_management.cli.list_users")
+@patch("user_management.cli.init_identity_platform_app")
+def test_reconcile_gcp(
+    mock_init_gcp_ip_app,  # Mock initializing GCP-IP/Firebase app. pylint: disable=unused-argument
+    mock_list_users,
+    mock_service_init_gcp_ip_app,  # pylint: disable=unused-argument
+    mock_create_user,
+    mock_set_custom_user_claims,  # pylint: disable=unused-argument
+    mock_delete_users,
+    sql_factory,
+):
+    synced_user, missing_user = sql_factory.gcp_user.create_batch(2)
+    orphan_uid = str(uuid.uuid4())
+    mock_list_users().iterate_all.return_value = [
+        Mock(uid=str(synced_user.uid)),
+        Mock(uid=orphan_uid),
+    ]
+
+    result = runner.invoke(app, ["reconcile-gcp"])
+
+    assert result.exit_code == 0, result.output
+    assert f"missing {missing_user.uid}" in result.output
+    assert f"orphan {orphan_uid}" in result.output
+    mock_create_user.assert_not_called()
+    mock_delete_users.assert_not_called()
+
+    result = runner.invoke(app, ["reconcile-gcp", "--apply"])
+
+    assert result.exit_code == 0, result.output
+    mock_create_user.assert_called_once_with(
+        uid=str(missing_user.uid), display_name=missing_user.name, email=missing_user.email
+    )
+    mock_delete_users.assert_called_once_with(uids=[orphan_uid])
@@ -3,19 +3,25 @@ import functools
 import json
 import os
 from collections import namedtuple
+from contextlib import contextmanager
 from time import time
-from typing import Generator
+from types import ModuleType
+from typing import Callable, ContextManager, Generator, List
 
 import pytest
 from fastapi.testclient import TestClient
 from pydantic import PostgresDsn
-from sqlalchemy import create_engine, MetaData, text
-from sqlalchemy.engine import Connection
+from sqlalchemy import create_engine, event, MetaData, text
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import scoped_session, Session, sessionmaker
 
+from user_management.core.capability_index import get_capability_index
 from user_management.core.database import Base
 from user_management.core.dependencies import get_database
 from user_management.core.config.settings import get_settings
+from user_management.core.query_stats import instrument_queries
+from user_management.core.rate_limiting import get_rate_limiters
+from user_management.core.resilience import get_circuit_breaker, get_concurrency_limit
 from user_management.main import create_app
 from user_management.models import Role
 from tests.factories import SQLModelFactory
@@ -48,6 +54,7 @@ def create_test_db_session(db_name: str, manager: bool = False) -> scoped_sessio
     )
 
     engine = create_engine(database_url, pool_pre_ping=True)
+    instrument_queries(engine)
     session_factory = sessionmaker(autoflush=True, bind=engine)
     return scoped_session(session_factory)
 
@@ -164,6 +171,80 @@ def testing_db_session(disposable_database: Connection) -> Generator[Session, No
         session.close()
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limiters() -> Generator[None, None, None]:
+    """Makes sure every test starts with full rate limits, as if it were the only one run."""
+    get_rate_limiters.cache_clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_remote_call_protections() -> Generator[None, None, None]:
+    """Makes sure remote calls failed by previous tests never open circuit breakers, or lower the
+    concurrency limits, of the next ones.
+    """
+    get_circuit_breaker.cache_clear()
+    get_concurrency_limit.cache_clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_capability_index() -> Generator[None, None, None]:
+    """Makes sure the in-memory client capabilities index never carries data between tests, as the
+    testing database is cleaned up after every test.
+    """
+    get_capability_index().invalidate()
+    yield
+
+
+@pytest.fixture
+def fake_clock(monkeypatch) -> Callable[[ModuleType], List[float]]:
+    """Replaces the monotonic clock of the given module (e.g. `core.rate_limiting`) with one only
+    moving when told to: `clock = fake_clock(module)`, then `clock[0] += seconds`.
+    """
+
+    def patch_clock(module: ModuleType) -> List[float]:
+        clock = [1000.0]
+        monkeypatch.setattr(module, "monotonic", lambda: clock[0])
+        return clock
+
+    return patch_clock
+
+
+@pytest.fixture
+def query_budget() -> Callable[[int], ContextManager[List[str]]]:
+    """Asserts the maximum number of queries run within a block, to catch N+1 queries and other
+    regressions in the number of database round trips made by an endpoint.
+
+    Usage:
+
+        def test_list_users(test_client, user_info, query_budget):
+            with query_budget(3):
+                test_client.get(...)
+
+    Every statement run by any engine within the block counts, so fixtures and factories should be
+    used outside of it.
+    """
+
+    @contextmanager
+    def budget(max_queries: int) -> Generator[List[str], None, None]:
+        statements: List[str] = []
+
+        def record(conn, cursor, statement, *args):  # pylint: disable=unused-argument
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+
+        queries = "\n".join(statements)
+        assert len(statements) <= max_queries, f"{len(statements)} queries run:\n{queries}"
+
+    return budget
+
+
 @pytest.fixture(name="sql_factory")
 def sql_factory_init(test_db_session) -> Generator[SQLModelFactory, None, None]:
     """Makes SQL models factories available in tests."""
@@ -0,0 +1,56 @@
+import logging
+
+import pytest
+from fastapi import status
+
+from user_management.core.config.settings import get_settings
+from user_management.core.exceptions import caller_info, ResourceNotFoundError
+
+
+def get_resource():
+    raise ResourceNotFoundError({"message": "No resource found."})
+
+
+def get_resource_error() -> ResourceNotFoundError:
+    try:
+        get_resource()
+    except ResourceNotFoundError as error:
+        return error
+
+    raise AssertionError("ResourceNotFoundError not raised.")
+
+
+@pytest.mark.parametrize(
+    ["exception_context", "expected_caller"],
+    [
+        pytest.param("none", "", id="No caller info"),
+        pytest.param("origin", f"{__file__}:get_resource:11", id="Exception origin"),
+        pytest.param(
+            "full",
+            f"{__file__}:get_resource_error:16 > {__file__}:get_resource:11",
+            id="Full exception traceback",
+        ),
+    ],
+)
+def test_caller_info(exception_context, expected_caller, monkeypatch):
+    monkeypatch.setattr(get_settings(), "exception_context", exception_context)
+
+    assert caller_info(get_resource_error()) == expected_caller
+
+
+def test_caller_info_not_raised():
+    assert caller_info(ResourceNotFoundError()) == ""
+
+
+def test_app_exception_handler_caller(test_client, staff_user_info, caplog, monkeypatch):
+    monkeypatch.setattr(get_settings(), "exception_context", "origin")
+
+    with caplog.at_level(logging.ERROR, logger="user_management.core.exceptions"):
+        response = test_client.get(
+            "/api/v1/users/d7a9aa45-1737-419a-bf5c-c2a4ac5b60cc",
+            headers={"X-Apigateway-Api-Userinfo": staff_user_info.header_payload},
+        )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert "<AppException ResourceNotFoundError - status_code=404" in caplog.text
+    assert "user_management/repositories/base.py:_select_from_db:" in caplog.text
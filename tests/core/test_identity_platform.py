@@ -0,0 +1,158 @@
+import json
+from contextlib import ExitStack
+from time import perf_counter
+from unittest.mock import patch
+
+import pytest
+from fastapi import status
+from sqlalchemy import select
+
+from benchmarks.identity_platform import Faults, IdentityPlatform, serve
+from user_management.core.config.settings import get_settings
+from user_management.core.exceptions import ResourceConflictError, ResourceNotFoundError
+from user_management.core.firebase import EMULATOR_HOST_ENV, reset_identity_platform_app
+from user_management.models import Role, SecurityToken
+from user_management.schemas import GCPUserSchema
+from user_management.services import GCPIdentityPlatformService
+
+
+@pytest.fixture(name="identity_platform")
+def identity_platform_stand_in(monkeypatch):
+    """Serves the given GCP Identity Platform stand-in, and points the service at it."""
+
+    with ExitStack() as stack:
+
+        def serve_stand_in(platform: IdentityPlatform) -> IdentityPlatform:
+            address = stack.enter_context(serve(platform))
+            monkeypatch.setattr(get_settings(), "gcp_identity_toolkit_url", f"http://{address}")
+            monkeypatch.setattr(get_settings(), "gcp_auth_emulator_host", address)
+            monkeypatch.setenv(EMULATOR_HOST_ENV, address)
+            reset_identity_platform_app()
+            return platform
+
+        yield serve_stand_in
+        reset_identity_platform_app()
+
+
+def login(test_client, email: str, password: str):
+    return test_client.post("/api/v1/login", json={"email": email, "password": password})
+
+
+@patch("user_management.services.mailer.get_publisher_client")
+def test_user_lifecycle(
+    mock_pubsub, identity_platform, test_client, user_info, test_db_session, sql_factory
+):
+    # pylint: disable=unused-argument
+    platform = identity_platform(IdentityPlatform())
+    headers = {"X-Apigateway-Api-Userinfo": user_info.header_payload}
+    client = sql_factory.client.create()
+    sql_factory.client_user.create(user=user_info.user, client=client, role=Role.SUPERUSER)
+
+    # New users are created in GCP Identity Platform, along with their roles.
+    response = test_client.post(
+        "/api/v1/users",
+        headers=headers,
+        json={
+            "name": "John Doe",
+            "email": "john.doe@hummingbirdtech.com",
+            "role": {"client_uid": str(client.uid), "role": Role.PILOT.value},
+        },
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.json()
+    uid = response.json()["uid"]
+    account = platform.accounts[uid]
+    assert account["email"] == "john.doe@hummingbirdtech.com"
+    assert json.loads(account["customAttributes"]) == {
+        "staff": False,
+        "roles": {str(client.uid): Role.PILOT.value},
+    }
+
+    # They set up their password, and log in with it.
+    token = test_db_session.scalar(select(SecurityToken.uid).filter_by(gcp_user_uid=uid))
+    response = test_client.post(
+        f"/api/v1/users/{uid}/create-password/{token}",
+        json={"password": "secret-1", "verified_password": "secret-1"},
+    )
+    assert response.status_code == status.HTTP_204_NO_CONTENT, response.json()
+
+    assert login(test_client, "john.doe@hummingbirdtech.com", "wrong").status_code == 401
+    response = login(test_client, "john.doe@hummingbirdtech.com", "secret-1")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["localId"] == uid
+
+    response = test_client.post(
+        "/api/v1/login/refresh-token", json={"refresh_token": response.json()["refreshToken"]}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["user_id"] == uid
+
+    # Password reset links are generated by GCP Identity Platform.
+    response = test_client.get("/api/v1/users/john.doe@hummingbirdtech.com/reset-password")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert platform.calls["accounts:sendOobCode"] == 1
+
+    response = test_client.delete(f"/api/v1/users/{uid}", headers=headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert uid not in platform.accounts
+    assert login(test_client, "john.doe@hummingbirdtech.com", "secret-1").status_code == 401
+
+
+def test_sync_errors(identity_platform, sql_factory):
+    identity_platform(IdentityPlatform())
+    service = GCPIdentityPlatformService()
+    gcp_user = GCPUserSchema.from_orm(sql_factory.gcp_user.create())
+
+    with pytest.raises(ResourceNotFoundError):
+        service.sync_gcp_user(gcp_user, update=True)
+
+    service.sync_gcp_user(gcp_user)
+    with pytest.raises(ResourceConflictError) as error:
+        service.sync_gcp_user(gcp_user)
+    assert error.value.context["message"] == "Duplicated UID."
+
+
+def test_remove_bulk_users(identity_platform):
+    platform = identity_platform(IdentityPlatform())
+    uids = [platform.add_account()["localId"] for _ in range(1500)]
+
+    GCPIdentityPlatformService.remove_bulk_gcp_users([*uids, "unknown"])
+
+    assert not platform.accounts
+    assert platform.calls["accounts:batchDelete"] == 2
+
+
+def test_auto_created_users(identity_platform, test_client):
+    platform = identity_platform(IdentityPlatform(auto_create_users=True))
+
+    assert login(test_client, "jane.doe@hummingbirdtech.com", "secret").status_code == 200
+    assert login(test_client, "jane.doe@hummingbirdtech.com", "wrong").status_code == 401
+    assert platform.find_account("jane.doe@hummingbirdtech.com") is not None
+
+
+def test_injected_latency(identity_platform, test_client):
+    identity_platform(IdentityPlatform(Faults(latency_ms=100), auto_create_users=True))
+
+    start = perf_counter()
+    response = login(test_client, "jane.doe@hummingbirdtech.com", "secret")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert perf_counter() - start >= 0.1
+
+
+@pytest.mark.parametrize(
+    "faults",
+    [
+        pytest.param(Faults(error_rate=1, error_status=500), id="Injected errors"),
+        pytest.param(Faults(rate_limit=0.001, rate_limit_burst=1), id="Quota exceeded"),
+    ],
+)
+def test_injected_errors(identity_platform, test_client, faults):
+    platform = identity_platform(IdentityPlatform(faults, auto_create_users=True))
+    responses = [login(test_client, "jane.doe@hummingbirdtech.com", "secret") for _ in range(2)]
+
+    assert responses[-1].status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert responses[-1].json() == {
+        "app_exception": "RemoteServiceError",
+        "context": {"message": "Service unavailable."},
+    }
+    assert platform.calls["accounts:signInWithPassword"] == 2
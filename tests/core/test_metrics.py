@@ -0,0 +1,51 @@
+from unittest.mock import AsyncMock, patch
+
+from fastapi import status
+from prometheus_client import REGISTRY
+
+from tests.auth.mocks import successful_login, wrong_api_key
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint(test_client, user_info):
+    labels = {"method": "GET", "route": "/api/v1/capabilities/{capability_id}", "status": "404"}
+    requests_count = sample("http_request_duration_seconds_count", **labels)
+
+    response = test_client.get(
+        "/api/v1/capabilities/9999999999",
+        headers={"X-Apigateway-Api-Userinfo": user_info.header_payload},
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = test_client.get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "http_requests_in_progress" in response.text
+    assert "db_pool_checkout_wait_seconds" in response.text
+    assert sample("http_request_duration_seconds_count", **labels) == requests_count + 1
+
+
+@patch("aiohttp.ClientSession.post")
+def test_remote_call_metrics(mock_aiohttp, test_client):
+    """Remote calls are measured, but only remote service failures are counted as errors."""
+    operation = "identitytoolkit.sign_in_with_password"
+    calls_count = sample("remote_call_duration_seconds_count", operation=operation)
+    errors_count = sample("remote_call_errors_total", operation=operation)
+    mock_gcp_response = AsyncMock()
+    mock_aiohttp.return_value.__aenter__.return_value = mock_gcp_response
+    payload = {"email": "john.doe@hummingbirdtech.com", "password": "secret"}
+
+    mock_gcp_response.status = status.HTTP_200_OK
+    mock_gcp_response.json.return_value = successful_login()
+    assert test_client.post("/api/v1/login", json=payload).status_code == status.HTTP_200_OK
+
+    mock_gcp_response.status = status.HTTP_400_BAD_REQUEST
+    mock_gcp_response.json.return_value = wrong_api_key()
+    response = test_client.post("/api/v1/login", json=payload)
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    assert sample("remote_call_duration_seconds_count", operation=operation) == calls_count + 2
+    assert sample("remote_call_errors_total", operation=operation) == errors_count + 1
@@ -0,0 +1,52 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool, QueuePool
+
+from user_management.core import database
+from user_management.core.config.settings import get_settings
+from user_management.core.config.sizing import get_sizing_plan
+from user_management.core.metrics import instrument_pool
+
+
+@pytest.fixture(name="pgbouncer_settings")
+def pgbouncer_mode_settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "database_pgbouncer", True)
+    monkeypatch.setattr(settings, "database_pgbouncer_pool_size", 0)
+    get_sizing_plan.cache_clear()
+
+    yield settings
+
+    get_sizing_plan.cache_clear()
+
+
+def connections_opened() -> float:
+    return REGISTRY.get_sample_value("db_connections_opened_total") or 0.0
+
+
+def test_pgbouncer_mode_connection_per_transaction(pgbouncer_settings, disposable_database):
+    # pylint: disable=protected-access
+    engine = database._create_engine(disposable_database.engine.url)
+    instrument_pool(engine)
+    opened = connections_opened()
+
+    for _ in range(3):
+        with engine.begin() as connection:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+
+    assert isinstance(engine.pool, NullPool)
+    assert not engine.pool._pre_ping
+    assert connections_opened() == opened + 3
+    engine.dispose()
+
+
+def test_pgbouncer_mode_small_pool(pgbouncer_settings, disposable_database, monkeypatch):
+    # pylint: disable=protected-access
+    monkeypatch.setattr(pgbouncer_settings, "database_pgbouncer_pool_size", 2)
+    engine = database._create_engine(disposable_database.engine.url)
+
+    assert isinstance(engine.pool, QueuePool)
+    assert (engine.pool.size(), engine.pool._max_overflow) == (2, 0)
+    assert not engine.pool._pre_ping
+    engine.dispose()
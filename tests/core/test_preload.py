@@ -0,0 +1,56 @@
+import os
+from unittest.mock import patch
+
+import firebase_admin
+from sqlalchemy import text
+
+from user_management.core.database import get_engine
+from user_management.core.firebase import init_identity_platform_app
+from user_management.services.mailer import get_publisher_client
+
+
+def run_forked(check) -> int:
+    """Runs the check in a forked process (as preloaded Gunicorn workers are), returning its exit
+    status: 0 when the check passes.
+    """
+    if (pid := os.fork()) == 0:
+        try:
+            os._exit(0 if check() else 1)  # pylint: disable=protected-access
+        except BaseException:  # pylint: disable=broad-except
+            os._exit(2)  # pylint: disable=protected-access
+
+    return os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1])
+
+
+def test_database_connections_not_shared_after_fork():
+    engine = get_engine()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    assert engine.pool.checkedin() == 1
+
+    assert run_forked(lambda: get_engine() is engine and engine.pool.checkedin() == 0) == 0
+    assert engine.pool.checkedin() == 1
+
+
+def test_identity_platform_app_not_shared_after_fork():
+    app = init_identity_platform_app()
+    assert app
+
+    def check() -> bool:
+        return not firebase_admin._apps and init_identity_platform_app() not in (None, app)
+
+    assert run_forked(check) == 0
+    assert init_identity_platform_app() is app
+
+
+@patch("google.cloud.pubsub_v1.PublisherClient")
+def test_publisher_client_not_shared_after_fork(mock_publisher_client):
+    mock_publisher_client.side_effect = lambda **kwargs: object()
+    get_publisher_client.cache_clear()
+    client = get_publisher_client()
+
+    try:
+        assert run_forked(lambda: get_publisher_client() is not client) == 0
+        assert get_publisher_client() is client
+    finally:
+        get_publisher_client.cache_clear()
@@ -0,0 +1,123 @@
+import logging
+
+import pytest
+
+from fastapi import status
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+from user_management.core.config.settings import get_settings
+from user_management.core.query_stats import (
+    QUERY_COUNT_HEADER,
+    QUERY_TIME_HEADER,
+    QueryStatsMiddleware,
+    request_query_stats,
+)
+from tests.conftest import create_test_db_session, get_database_name
+
+
+def test_query_stats_headers(test_client, user_info, monkeypatch):
+    monkeypatch.setattr(get_settings(), "debug", True)
+
+    response = test_client.get(
+        "/api/v1/users", headers={"X-Apigateway-Api-Userinfo": user_info.header_payload}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert int(response.headers[QUERY_COUNT_HEADER]) > 0
+    assert float(response.headers[QUERY_TIME_HEADER]) > 0
+
+
+def test_query_stats_headers_hidden(test_client, user_info, monkeypatch):
+    monkeypatch.setattr(get_settings(), "debug", False)
+
+    response = test_client.get(
+        "/api/v1/users", headers={"X-Apigateway-Api-Userinfo": user_info.header_payload}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert QUERY_COUNT_HEADER not in response.headers
+    assert QUERY_TIME_HEADER not in response.headers
+
+
+def test_list_gcp_users_query_budget(test_client, user_info, sql_factory, query_budget):
+    """Users clients are eager loaded, so listing users doesn't run a query for every user."""
+    sql_factory.client_user.create_batch(size=10, client=user_info.client_1)
+
+    with query_budget(2):
+        response = test_client.get(
+            "/api/v1/users", headers={"X-Apigateway-Api-Userinfo": user_info.header_payload}
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 11
+
+
+def test_n_plus_one_detection(caplog, monkeypatch):
+    monkeypatch.setattr(get_settings(), "n_plus_one_threshold", 3)
+
+    async def endpoint(request):  # pylint: disable=unused-argument
+        for _ in range(3):
+            request_query_stats.get().record("SELECT * FROM client_user WHERE uid = %s", 0.001)
+        request_query_stats.get().record("SELECT * FROM gcp_user", 0.001)
+        return PlainTextResponse("OK")
+
+    app = Starlette()
+    app.add_route("/users", endpoint)
+    app.add_middleware(QueryStatsMiddleware)
+
+    with caplog.at_level(logging.WARNING, logger="user_management.core.query_stats"):
+        TestClient(app).get("/users")
+
+    assert len(caplog.records) == 1
+    assert "Potential N+1 queries in GET /users, statement run 3 times" in caplog.text
+    assert "FROM client_user" in caplog.text
+
+
+def test_slow_query_log(caplog, monkeypatch):
+    monkeypatch.setattr(get_settings(), "slow_query_threshold_ms", 0)
+    session = create_test_db_session(get_database_name())()
+
+    with caplog.at_level(logging.WARNING, logger="user_management.core.query_stats"):
+        result = session.execute(text("SELECT uid FROM gcp_user WHERE name = :name"), {"name": "X"})
+
+    # The statement results are not affected by the query plan lookup.
+    assert result.all() == []
+    session.close()
+
+    assert "Slow query" in caplog.text
+    assert "Seq Scan on gcp_user" in caplog.text
+
+
+def test_slow_query_log_unexplainable(caplog, monkeypatch):
+    monkeypatch.setattr(get_settings(), "slow_query_threshold_ms", 0)
+    session = create_test_db_session(get_database_name())()
+    engine = session.get_bind()
+
+    with caplog.at_level(logging.WARNING, logger="user_management.core.query_stats"):
+        # Statements run outside a transaction, or that can't be explained, aren't.
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("ANALYZE gcp_user"))
+            connection.execute(text("SELECT 1"))
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE gcp_user"))
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+    session.close()
+
+    assert caplog.text.count("Unavailable: statement not explainable.") == 2
+    assert "Unavailable: not in a transaction." in caplog.text
+    assert "SAVEPOINT" not in caplog.text
+
+
+def test_failed_query_start_time_dropped():
+    session = create_test_db_session(get_database_name())()
+    connection = session.connection()
+
+    with pytest.raises(ProgrammingError):
+        connection.execute(text("SELECT * FROM missing_table"))
+
+    assert connection.info["query_start_time"] == []
+    session.close()
@@ -0,0 +1,174 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import status
+from prometheus_client import REGISTRY
+from sqlalchemy.exc import OperationalError
+
+from tests.auth.mocks import wrong_password
+from user_management.core import rate_limiting
+from user_management.core.config.settings import get_settings
+from user_management.core.exceptions import TooManyRequestsError
+from user_management.core.rate_limiting import get_rate_limiters, RateLimiter, TokenBuckets
+
+
+@pytest.fixture(name="clock")
+def rate_limiting_clock(fake_clock):
+    return fake_clock(rate_limiting)
+
+
+@pytest.fixture(name="limits")
+def low_limits(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "rate_limit_email_burst", 2)
+    monkeypatch.setattr(settings, "rate_limit_email_rate", 0.1)
+    get_rate_limiters.cache_clear()
+    return settings
+
+
+@pytest.fixture(name="shared_database")
+def shared_database_engine(disposable_database, test_db_session, monkeypatch):
+    # pylint: disable=unused-argument
+    monkeypatch.setattr(rate_limiting, "get_engine", lambda: disposable_database.engine)
+
+
+def rejected(limit: str) -> float:
+    return REGISTRY.get_sample_value("rate_limited_requests_total", {"limit": limit}) or 0.0
+
+
+def wrong_credentials() -> AsyncMock:
+    """GCP Identity Platform response to a login with wrong credentials."""
+    response = AsyncMock()
+    response.status = status.HTTP_400_BAD_REQUEST
+    response.json.return_value = wrong_password()
+    return response
+
+
+def test_token_buckets(clock):
+    buckets = TokenBuckets(rate=0.5, burst=2)
+
+    assert [buckets.take("a"), buckets.take("a")] == [0, 0]
+    assert buckets.take("a") == 2.0
+    # Other keys have their own bucket.
+    assert buckets.take("b") == 0
+
+    clock[0] += 1
+    assert buckets.take("a") == 1.0
+    clock[0] += 1
+    assert buckets.take("a") == 0
+    # Buckets are never refilled beyond their burst.
+    clock[0] += 60
+    assert [buckets.take("a") for _ in range(3)] == [0, 0, 2.0]
+
+
+def test_token_buckets_bounded(clock):  # pylint: disable=unused-argument
+    buckets = TokenBuckets(rate=1, burst=1, shards=2, max_keys=4)
+    for key in range(100):
+        buckets.take(str(key))
+
+    # pylint: disable=protected-access
+    assert sum(len(shard) for shard in buckets._shards) <= 4
+
+
+@patch("aiohttp.ClientSession.post")
+def test_login_rate_limited_by_email(mock_aiohttp, test_client, limits, clock):
+    # pylint: disable=unused-argument
+    mock_aiohttp.return_value.__aenter__.return_value = wrong_credentials()
+    payload = {"email": "john.doe@hummingbirdtech.com", "password": "WRONG"}
+    observed = rejected("email")
+
+    responses = [test_client.post("/api/v1/login", json=payload) for _ in range(3)]
+    # The limit is by email, whatever its case.
+    responses.append(
+        test_client.post("/api/v1/login", json={**payload, "email": "John.Doe@hummingbirdtech.com"})
+    )
+
+    assert [response.status_code for response in responses] == [401, 401, 429, 429]
+    assert responses[-1].headers["Retry-After"] == "10"
+    assert responses[-1].json() == {
+        "app_exception": "TooManyRequestsError",
+        "context": {"message": "Too many requests."},
+    }
+    # Rejected requests never reach GCP Identity Platform.
+    assert mock_aiohttp.call_count == 2
+    assert rejected("email") == observed + 2
+
+    clock[0] += 10
+    assert test_client.post("/api/v1/login", json=payload).status_code == 401
+
+
+@pytest.mark.parametrize(
+    ["ip_enabled", "expected_status"],
+    [
+        pytest.param(True, status.HTTP_429_TOO_MANY_REQUESTS, id="IP limit enabled"),
+        pytest.param(False, status.HTTP_401_UNAUTHORIZED, id="IP limit disabled (default)"),
+    ],
+)
+def test_login_rate_limited_by_ip(test_client, monkeypatch, ip_enabled, expected_status):
+    monkeypatch.setattr(get_settings(), "rate_limit_ip_enabled", ip_enabled)
+    monkeypatch.setattr(get_settings(), "rate_limit_ip_burst", 1)
+    get_rate_limiters.cache_clear()
+
+    with patch("aiohttp.ClientSession.post") as mock_aiohttp:
+        mock_aiohttp.return_value.__aenter__.return_value = wrong_credentials()
+        first = test_client.post("/api/v1/login", json={"email": "a@b.com", "password": "x"})
+        second = test_client.post("/api/v1/login", json={"email": "c@d.com", "password": "x"})
+
+    assert (first.status_code, second.status_code) == (401, expected_status)
+
+
+@patch("user_management.services.mailer.GCPIdentityPlatformService")
+@patch("user_management.services.mailer.get_publisher_client")
+def test_reset_password_rejected_without_database(
+    mock_pubsub, mock_identity_platform, test_client, sql_factory, query_budget, limits
+):
+    # pylint: disable=unused-argument
+    mock_identity_platform().get_password_reset_link.return_value = "http://reset-link"
+    sql_factory.gcp_user.create(email="john.doe@hummingbirdtech.com")
+    for _ in range(2):
+        test_client.get("/api/v1/users/john.doe@hummingbirdtech.com/reset-password")
+
+    with query_budget(0):
+        response = test_client.get("/api/v1/users/john.doe@hummingbirdtech.com/reset-password")
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def test_rate_limit_disabled(test_client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "rate_limit_enabled", False)
+    monkeypatch.setattr(get_settings(), "rate_limit_ip_enabled", True)
+    monkeypatch.setattr(get_settings(), "rate_limit_ip_burst", 0)
+    get_rate_limiters.cache_clear()
+
+    response = test_client.get("/api/v1/users/nobody@hummingbirdtech.com/reset-password")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_shared_buckets(shared_database, query_budget):  # pylint: disable=unused-argument
+    # Limiters of two worker processes, sharing their buckets.
+    workers = [RateLimiter(name="test", rate=0.01, burst=2, shared=True) for _ in range(2)]
+
+    asyncio.run(workers[0].check("key"))
+    asyncio.run(workers[1].check("key"))
+    with pytest.raises(TooManyRequestsError):
+        asyncio.run(workers[0].check("key"))
+
+    # The in-memory bucket is emptied once the shared one is, so the database isn't queried again.
+    with query_budget(0), pytest.raises(TooManyRequestsError):
+        asyncio.run(workers[0].check("key"))
+    # Other keys are still allowed.
+    asyncio.run(workers[1].check("other key"))
+
+
+def test_shared_buckets_unavailable(monkeypatch):
+    limiter = RateLimiter(name="test", rate=1, burst=1, shared=True)
+
+    def unavailable(key):
+        raise OperationalError("SELECT 1", {}, Exception("Connection refused."))
+
+    monkeypatch.setattr(limiter.shared, "take", unavailable)
+
+    # Requests are let through.
+    asyncio.run(limiter.check("key"))
@@ -0,0 +1,134 @@
+import math
+from contextlib import contextmanager
+from time import monotonic, sleep
+from typing import Generator, Iterator, List
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+from user_management.core import database
+from user_management.core.database import (
+    check_replica_lag,
+    pick_replica,
+    Replica,
+    ReplicaLagMonitor,
+    RoutingSession,
+)
+from user_management.repositories import ClientRepository
+from user_management.schemas import NewNamedEntitySchema
+
+
+@pytest.fixture(name="replica")
+def replica_database(disposable_database, monkeypatch) -> Generator[Replica, None, None]:
+    """The testing database, through an engine of its own, standing in for a read replica."""
+    replica = Replica(name="replica", engine=create_engine(disposable_database.engine.url))
+    monkeypatch.setattr(database, "get_replicas", lambda: [replica])
+    check_replica_lag(replica)
+
+    yield replica
+
+    replica.engine.dispose()
+
+
+@pytest.fixture(name="routing_session")
+def routing_db_session(
+    disposable_database, test_db_session
+) -> Generator[RoutingSession, None, None]:
+    """Session using the testing database as primary. Data is cleaned up by `test_db_session`."""
+    session = RoutingSession(bind=disposable_database.engine)
+
+    yield session
+
+    session.close()
+
+
+@contextmanager
+def statements(engine: Engine) -> Iterator[List[str]]:
+    """Statements run by the engine within the block."""
+    executed: List[str] = []
+
+    def record(conn, cursor, statement, *args):  # pylint: disable=unused-argument
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield executed
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def test_read_only_calls_read_from_replica(
+    routing_session, replica, sql_factory, disposable_database
+):
+    client = sql_factory.client.create()
+
+    with statements(disposable_database.engine) as primary, statements(replica.engine) as replicas:
+        clients = ClientRepository(routing_session).list()
+
+    assert [row.uid for row in clients] == [client.uid]
+    assert replicas and not primary
+
+
+def test_reads_own_writes(routing_session, replica, disposable_database):
+    repository = ClientRepository(routing_session)
+
+    with statements(disposable_database.engine) as primary, statements(replica.engine) as replicas:
+        client = repository.create(NewNamedEntitySchema(name="Read your writes"))
+        assert repository.get(pk=client.uid) == client
+
+    assert primary and not replicas
+    assert routing_session.wrote
+
+
+def test_lagging_replica_not_read_from(routing_session, replica, sql_factory, disposable_database):
+    sql_factory.client.create()
+    replica.lag, replica.checked = 60.0, monotonic()
+
+    with statements(disposable_database.engine) as primary, statements(replica.engine) as replicas:
+        assert len(ClientRepository(routing_session).list()) == 1
+
+    assert primary and not replicas
+
+
+def test_replica_lag_check(replica):
+    with statements(replica.engine) as checks:
+        assert check_replica_lag(replica) == 0
+
+    assert checks[0] == "SET LOCAL statement_timeout = 2000"
+    assert REGISTRY.get_sample_value("db_replica_lag_seconds", {"replica": "replica"}) == 0
+    assert pick_replica() is replica
+
+
+def test_unavailable_replica(replica):
+    replica.engine = create_engine(replica.engine.url.set(port=1))
+
+    assert check_replica_lag(replica) == math.inf
+    assert REGISTRY.get_sample_value("db_replica_lag_seconds", {"replica": "replica"}) == math.inf
+    assert pick_replica() is None
+
+
+def test_unchecked_replica_not_read_from(replica):
+    replica.lag, replica.checked = math.inf, -math.inf
+
+    # Replicas lag is never checked while picking them.
+    with statements(replica.engine) as replicas:
+        assert pick_replica() is None
+
+    assert not replicas
+
+
+def test_replica_lag_monitor(replica):
+    replica.lag, replica.checked = math.inf, -math.inf
+    monitor = ReplicaLagMonitor(interval=0.01)
+
+    monitor.start()
+    checked = monotonic()
+    while replica.checked < checked:
+        sleep(0.01)
+    monitor.stop()
+
+    assert replica.lag == 0
+    assert pick_replica() is replica
+    assert not monitor._thread  # pylint: disable=protected-access
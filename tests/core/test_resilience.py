@@ -0,0 +1,217 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import status
+from firebase_admin.exceptions import NotFoundError, UnavailableError
+from prometheus_client import REGISTRY
+
+from tests.auth.mocks import successful_login, wrong_api_key
+from user_management.core import resilience
+from user_management.core.config.settings import get_settings
+from user_management.core.exceptions import AuthenticationError, RemoteServiceError
+from user_management.core.resilience import (
+    AIMDLimit,
+    CircuitBreaker,
+    CircuitState,
+    is_remote_failure,
+)
+
+
+LOGIN_OPERATION = "identitytoolkit.sign_in_with_password"
+LOGIN_PAYLOAD = {"email": "john.doe@hummingbirdtech.com", "password": "secret"}
+
+
+@pytest.fixture(name="clock")
+def resilience_clock(fake_clock):
+    return fake_clock(resilience)
+
+
+@pytest.fixture(name="breaker_threshold")
+def low_breaker_threshold(monkeypatch):
+    monkeypatch.setattr(get_settings(), "gcp_breaker_failure_threshold", 2)
+
+
+def gcp_response(status_code: int, content: dict) -> AsyncMock:
+    response = AsyncMock()
+    response.status = status_code
+    response.json.return_value = content
+    return response
+
+
+def rejections(operation: str, reason: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "remote_call_rejections_total", {"operation": operation, "reason": reason}
+        )
+        or 0.0
+    )
+
+
+def test_circuit_breaker(clock):
+    breaker = CircuitBreaker(operation="test", failure_threshold=2, reset_timeout=10)
+
+    breaker.record(success=False)
+    breaker.record(success=True)
+    breaker.record(success=False)
+    assert breaker.allow() and breaker.state == CircuitState.CLOSED
+
+    breaker.record(success=False)
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow() and breaker.retry_after == 10
+
+    # A single trial call is let through once the reset timeout has passed.
+    clock[0] += 10
+    assert breaker.allow() and breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record(success=False)
+    assert breaker.state == CircuitState.OPEN and not breaker.allow()
+
+    clock[0] += 10
+    assert breaker.allow()
+    breaker.record(success=True)
+    assert breaker.state == CircuitState.CLOSED and breaker.allow()
+    assert REGISTRY.get_sample_value("circuit_breaker_state", {"operation": "test"}) == 0
+
+
+def test_aimd_limit():
+    limit = AIMDLimit(service="test", initial=2, minimum=1, maximum=3, latency_threshold=1.0)
+
+    assert limit.acquire() and limit.acquire()
+    assert not limit.acquire()
+
+    # Additive increase: +1/limit for every successful call.
+    limit.release(success=True, latency=0.1)
+    limit.release(success=True, latency=0.1)
+    assert limit.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+    for _ in range(10):
+        assert limit.acquire()
+        limit.release(success=True, latency=0.1)
+    assert limit.limit == 3
+
+    # Multiplicative decrease, on failed and slow calls.
+    limit.acquire()
+    limit.release(success=False, latency=0.1)
+    assert limit.limit == 1.5
+    limit.acquire()
+    limit.release(success=True, latency=2.0)
+    assert limit.limit == 1
+
+    # Calls not made don't change the limit.
+    limit.acquire()
+    limit.release()
+    assert (limit.limit, limit.in_flight) == (1, 0)
+    assert REGISTRY.get_sample_value("remote_call_concurrency_limit", {"service": "test"}) == 1
+
+
+@pytest.mark.parametrize(
+    ["error", "failure"],
+    [
+        pytest.param(TimeoutError(), True, id="Timeout"),
+        pytest.param(ConnectionError(), True, id="Connection error"),
+        pytest.param(RemoteServiceError(), True, id="Remote service error"),
+        pytest.param(AuthenticationError(), False, id="Invalid credentials"),
+        pytest.param(ValueError("Invalid email."), False, id="Invalid arguments"),
+        pytest.param(UnavailableError("Unavailable."), True, id="Firebase unavailable"),
+        pytest.param(
+            NotFoundError("Not found.", http_response=SimpleNamespace(status_code=404)),
+            False,
+            id="Firebase client error",
+        ),
+    ],
+)
+def test_is_remote_failure(error, failure):
+    assert is_remote_failure(error) is failure
+
+
+@patch("aiohttp.ClientSession.post")
+def test_login_circuit_breaker(mock_aiohttp, test_client, breaker_threshold, clock):
+    # pylint: disable=unused-argument
+    mock_aiohttp.return_value.__aenter__.return_value = gcp_response(
+        status.HTTP_400_BAD_REQUEST, wrong_api_key()
+    )
+    rejected = rejections(LOGIN_OPERATION, "circuit_open")
+
+    responses = [test_client.post("/api/v1/login", json=LOGIN_PAYLOAD) for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [500, 500, 503]
+    assert responses[-1].headers["Retry-After"] == "30"
+    assert mock_aiohttp.call_count == 2
+    assert rejections(LOGIN_OPERATION, "circuit_open") == rejected + 1
+    assert REGISTRY.get_sample_value("circuit_breaker_state", {"operation": LOGIN_OPERATION}) == 1
+
+    # GCP Identity Platform is tried again after the reset timeout.
+    clock[0] += get_settings().gcp_breaker_reset_timeout
+    mock_aiohttp.return_value.__aenter__.return_value = gcp_response(
+        status.HTTP_200_OK, successful_login()
+    )
+    assert test_client.post("/api/v1/login", json=LOGIN_PAYLOAD).status_code == 200
+    assert REGISTRY.get_sample_value("circuit_breaker_state", {"operation": LOGIN_OPERATION}) == 0
+
+
+@patch("aiohttp.ClientSession.post")
+def test_login_deadline(mock_aiohttp, test_client):
+    mock_aiohttp.return_value.__aenter__.return_value = gcp_response(
+        status.HTTP_200_OK, successful_login()
+    )
+
+    response = test_client.post(
+        "/api/v1/login", json=LOGIN_PAYLOAD, headers={"X-Request-Timeout-Ms": "1500"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    # The remote call is given what's left of the request deadline, at most.
+    assert 0 < mock_aiohttp.call_args.kwargs["timeout"].total <= 1.5
+
+
+@patch("aiohttp.ClientSession.post")
+def test_login_deadline_exceeded(mock_aiohttp, test_client):
+    rejected = rejections(LOGIN_OPERATION, "deadline")
+
+    response = test_client.post(
+        "/api/v1/login", json=LOGIN_PAYLOAD, headers={"X-Request-Timeout-Ms": "0"}
+    )
+
+    assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+    mock_aiohttp.assert_not_called()
+    assert rejections(LOGIN_OPERATION, "deadline") == rejected + 1
+
+
+@patch("aiohttp.ClientSession.post")
+def test_login_remote_timeout(mock_aiohttp, test_client):
+    mock_aiohttp.return_value.__aenter__.side_effect = TimeoutError()
+
+    response = test_client.post("/api/v1/login", json=LOGIN_PAYLOAD)
+
+    assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+    assert resilience.get_concurrency_limit("identitytoolkit").limit == (
+        get_settings().gcp_concurrency_initial / 2
+    )
+
+
+@patch("aiohttp.ClientSession.post")
+def test_login_concurrency_limit(mock_aiohttp, test_client):
+    limit = resilience.get_concurrency_limit("identitytoolkit")
+    limit.in_flight = int(limit.limit)
+    rejected = rejections(LOGIN_OPERATION, "concurrency_limit")
+
+    response = test_client.post("/api/v1/login", json=LOGIN_PAYLOAD)
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    mock_aiohttp.assert_not_called()
+    assert rejections(LOGIN_OPERATION, "concurrency_limit") == rejected + 1
+
+
+@patch("firebase_admin.auth.update_user")
+def test_firebase_circuit_breaker(mock_update_user, test_client, sql_factory, breaker_threshold):
+    # pylint: disable=unused-argument
+    mock_update_user.side_effect = UnavailableError("Service unavailable.")
+    token = sql_factory.security_token.create()
+    url = f"/api/v1/users/{token.gcp_user_uid}/create-password/{token.uid}"
+    payload = {"password": "testing", "verified_password": "testing"}
+
+    responses = [test_client.post(url, json=payload) for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [500, 500, 503]
+    assert responses[-1].json()["app_exception"] == "ServiceUnavailableError"
+    assert mock_update_user.call_count == 2
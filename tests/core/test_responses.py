@@ -0,0 +1,64 @@
+from typing import List
+from unittest.mock import patch
+
+from fastapi import APIRouter, FastAPI, status
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from user_management.core.config.settings import get_settings
+from user_management.core.responses import FastJSONRoute
+from user_management.models import Role
+from user_management.schemas import GCPUserSchema
+
+
+GCP_USER = {
+    "uid": "4715c934-c2f1-4fd6-a1b7-1b5be21f7f55",
+    "name": "John Doe",
+    "phone_number": "+4402081232389",
+    "email": "john.doe@hummingbirdtech.com",
+    "staff": False,
+    "clients": [
+        {"client_uid": "6aa2701f-c2ce-4140-9d52-7a539e97790d", "role": Role.SUPERUSER.value}
+    ],
+}
+
+
+def create_testing_app(route_class: type) -> FastAPI:
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/users", status_code=status.HTTP_201_CREATED, response_model=List[GCPUserSchema])
+    async def list_users():
+        return [GCPUserSchema(**GCP_USER)]
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+def test_fast_json_route_response():
+    """Fast JSON routes return exactly the same responses FastAPI default routes do."""
+    fast_response = TestClient(create_testing_app(route_class=FastJSONRoute)).get("/users")
+    response = TestClient(create_testing_app(route_class=APIRoute)).get("/users")
+
+    assert fast_response.status_code == response.status_code == status.HTTP_201_CREATED
+    assert fast_response.json() == response.json() == [GCP_USER]
+
+
+def test_fast_json_route_openapi_schema():
+    """Fast JSON routes keep documenting the route response model."""
+    fast_schema = TestClient(create_testing_app(route_class=FastJSONRoute)).get("/openapi.json")
+    schema = TestClient(create_testing_app(route_class=APIRoute)).get("/openapi.json")
+
+    assert fast_schema.json() == schema.json()
+
+
+def test_fast_json_route_disabled(monkeypatch):
+    """The fast path is switched off by the setting as requests are served."""
+    client = TestClient(create_testing_app(route_class=FastJSONRoute))
+    monkeypatch.setattr(get_settings(), "fast_json_responses", False)
+
+    with patch("user_management.core.responses.FastJSONResponse") as mock_response:
+        response = client.get("/users")
+
+    assert response.json() == [GCP_USER]
+    mock_response.assert_not_called()
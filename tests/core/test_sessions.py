@@ -0,0 +1,93 @@
+from typing import List
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+
+from user_management.core import dependencies
+from user_management.core.database import RoutingSession
+from user_management.main import create_app
+
+
+@pytest.fixture(name="sessions")
+def request_sessions(disposable_database, monkeypatch) -> List[RoutingSession]:
+    """Sessions of the requests served by `get_database`, bound to the testing database."""
+    sessions: List[RoutingSession] = []
+
+    def session_factory():
+        session = RoutingSession(bind=disposable_database.engine)
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(dependencies, "db_session_factory", lambda: session_factory)
+    return sessions
+
+
+@pytest.fixture(name="app_client")
+def app_test_client(sessions) -> TestClient:  # pylint: disable=unused-argument
+    """Test client of an app using the actual `get_database` dependency."""
+    return TestClient(create_app())
+
+
+def checkouts_observed() -> float:
+    return REGISTRY.get_sample_value("db_pool_checkouts_per_request_sum") or 0.0
+
+
+def requests_observed() -> float:
+    return REGISTRY.get_sample_value("db_pool_checkouts_per_request_count") or 0.0
+
+
+def test_connection_checked_out_on_first_use(sessions):
+    dependency = dependencies.get_database()
+    session = next(dependency)
+    pool = session.get_bind().pool
+    checked_out = pool.checkedout()
+
+    assert session.checkouts == 0 and pool.checkedout() == checked_out
+
+    session.execute(text("SELECT 1"))
+    assert session.checkouts == 1 and pool.checkedout() == checked_out + 1
+
+    session.commit()
+    session.execute(text("SELECT 1"))
+    assert session.checkouts == 2
+
+    observed, requests = checkouts_observed(), requests_observed()
+    with pytest.raises(StopIteration):
+        next(dependency)
+
+    assert pool.checkedout() == checked_out
+    assert (checkouts_observed(), requests_observed()) == (observed + 2, requests + 1)
+    assert sessions == [session]
+
+
+def test_rejected_request_no_session(app_client, sessions):
+    response = app_client.get("/api/v1/clients")
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert not sessions
+
+
+def test_request_checkouts(app_client, sessions, user_info):
+    observed, requests = checkouts_observed(), requests_observed()
+
+    response = app_client.get(
+        "/api/v1/clients", headers={"X-Apigateway-Api-Userinfo": user_info.header_payload}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [session.checkouts for session in sessions] == [1]
+    assert (checkouts_observed(), requests_observed()) == (observed + 1, requests + 1)
+
+
+def test_savepoints_not_counted(disposable_database):
+    session = RoutingSession(bind=disposable_database.engine)
+
+    with session.begin():
+        with session.begin_nested():
+            session.execute(text("SELECT 1"))
+
+    assert session.checkouts == 1
+    session.close()
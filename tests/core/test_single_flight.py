@@ -0,0 +1,128 @@
+import asyncio
+from typing import Awaitable, Callable
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import status
+from prometheus_client import REGISTRY
+
+from tests.auth.mocks import invalid_refresh_token, successful_refresh_token
+from user_management.core.exceptions import AuthenticationError
+from user_management.core.single_flight import SingleFlight
+from user_management.services import GCPIdentityPlatformService
+from user_management.services.gcp_identity import refresh_token_flights
+
+
+def coalesced(operation: str) -> float:
+    return (
+        REGISTRY.get_sample_value("remote_calls_coalesced_total", {"operation": operation}) or 0.0
+    )
+
+
+def slow_gcp_response(status_code: int, content: dict) -> Callable[..., Awaitable[AsyncMock]]:
+    """Mocked GCP Identity Platform response, taking a while to come."""
+    response = AsyncMock()
+    response.status = status_code
+    response.json.return_value = content
+
+    async def respond(*args):
+        await asyncio.sleep(0.01)
+        return response
+
+    return respond
+
+
+@pytest.mark.asyncio
+async def test_single_flight():
+    flights = SingleFlight(operation="test")
+    calls = []
+
+    async def call(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return {"value": value}
+
+    results = await asyncio.gather(
+        flights.do("a", lambda: call(1)),
+        flights.do("a", lambda: call(2)),
+        flights.do("b", lambda: call(3)),
+    )
+
+    assert results == [{"value": 1}, {"value": 1}, {"value": 3}]
+    assert calls == [1, 3]
+    assert coalesced("test") == 1
+    # pylint: disable=protected-access
+    assert not flights._calls
+    # Calls made once done aren't coalesced.
+    assert await flights.do("a", lambda: call(4)) == {"value": 4}
+
+
+@pytest.mark.asyncio
+async def test_single_flight_error():
+    flights = SingleFlight(operation="test")
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise AuthenticationError()
+
+    results = await asyncio.gather(
+        flights.do("a", call), flights.do("a", call), return_exceptions=True
+    )
+
+    assert [type(result) for result in results] == [AuthenticationError, AuthenticationError]
+    # pylint: disable=protected-access
+    assert not flights._calls
+
+
+@pytest.mark.asyncio
+async def test_single_flight_caller_cancelled():
+    flights = SingleFlight(operation="test")
+
+    async def call():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    first = asyncio.ensure_future(flights.do("a", call))
+    second = asyncio.ensure_future(flights.do("a", call))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    # The call goes on for the other callers.
+    assert await second == "result"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+@patch("aiohttp.ClientSession.post")
+async def test_refresh_token_coalesced(mock_aiohttp):
+    mock_aiohttp.return_value.__aenter__.side_effect = slow_gcp_response(
+        status.HTTP_200_OK, successful_refresh_token()
+    )
+    observed = coalesced("identitytoolkit.refresh_token")
+
+    results = await asyncio.gather(
+        *(GCPIdentityPlatformService().refresh_token_gcp_user("token") for _ in range(3)),
+        GCPIdentityPlatformService().refresh_token_gcp_user("other token"),
+    )
+
+    assert results == [successful_refresh_token()] * 4
+    assert mock_aiohttp.call_count == 2
+    assert coalesced("identitytoolkit.refresh_token") == observed + 2
+    # pylint: disable=protected-access
+    assert not refresh_token_flights._calls
+
+
+@pytest.mark.asyncio
+@patch("aiohttp.ClientSession.post")
+async def test_refresh_token_coalesced_error(mock_aiohttp):
+    mock_aiohttp.return_value.__aenter__.side_effect = slow_gcp_response(
+        status.HTTP_400_BAD_REQUEST, invalid_refresh_token()
+    )
+
+    results = await asyncio.gather(
+        *(GCPIdentityPlatformService().refresh_token_gcp_user("token") for _ in range(2)),
+        return_exceptions=True,
+    )
+
+    assert [type(result) for result in results] == [AuthenticationError, AuthenticationError]
+    assert mock_aiohttp.call_count == 1
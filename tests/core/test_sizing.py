@@ -0,0 +1,101 @@
+import pytest
+
+from user_management.core.config.settings import get_settings
+from user_management.core.config.sizing import available_cpus, cgroup_cpu_limit, plan_sizing
+
+
+@pytest.fixture(name="settings")
+def auto_sizing_settings():
+    return get_settings().copy(
+        update={
+            "sizing_mode": "auto",
+            "web_workers_per_cpu": 1.0,
+            "web_max_workers": 16,
+            "database_connection_budget": 50,
+            "database_overflow_ratio": 0.2,
+        }
+    )
+
+
+def test_cgroup_v2_cpu_limit(tmp_path):
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    assert cgroup_cpu_limit(tmp_path) == 1.5
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert cgroup_cpu_limit(tmp_path) is None
+
+
+def test_cgroup_v1_cpu_limit(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("200000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert cgroup_cpu_limit(tmp_path) == 2
+
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    assert cgroup_cpu_limit(tmp_path) is None
+
+
+def test_available_cpus_within_cgroup_limit(tmp_path):
+    assert available_cpus(tmp_path) >= 1
+
+    (tmp_path / "cpu.max").write_text("50000 100000\n")
+    assert available_cpus(tmp_path) == 0.5
+
+
+def test_fixed_sizing(settings):
+    plan = plan_sizing(
+        settings.copy(
+            update={
+                "sizing_mode": "fixed",
+                "web_workers": 3,
+                "database_pool_size": 7,
+                "database_max_overflow": 2,
+            }
+        ),
+        cpus=8,
+    )
+
+    assert (plan.workers, plan.pool_size, plan.max_overflow) == (3, 7, 2)
+    assert plan.max_connections == 27
+
+
+@pytest.mark.parametrize(
+    "cpus, workers, pool_size, max_overflow",
+    [
+        (0.5, 1, 40, 10),
+        (4, 4, 10, 2),
+        (6, 6, 7, 1),
+        (64, 16, 3, 0),
+    ],
+)
+def test_auto_sizing(settings, cpus, workers, pool_size, max_overflow):
+    plan = plan_sizing(settings, cpus=cpus)
+
+    assert (plan.workers, plan.pool_size, plan.max_overflow) == (workers, pool_size, max_overflow)
+    assert plan.max_connections <= settings.database_connection_budget
+
+
+def test_auto_sizing_small_connection_budget(settings):
+    """Workers are reduced so that every one of them gets a connection."""
+    plan = plan_sizing(settings.copy(update={"database_connection_budget": 3}), cpus=8)
+
+    assert (plan.workers, plan.pool_size, plan.max_overflow) == (3, 1, 0)
+    assert plan.as_dict()["max_connections"] == 3
+
+
+@pytest.mark.parametrize("sizing_mode", ["fixed", "auto"])
+def test_pgbouncer_sizing(settings, sizing_mode):
+    """Behind PgBouncer, workers keep small pools, and aren't limited by the connection budget."""
+    settings = settings.copy(
+        update={
+            "sizing_mode": sizing_mode,
+            "web_workers": 8,
+            "database_connection_budget": 4,
+            "database_pgbouncer": True,
+            "database_pgbouncer_pool_size": 2,
+        }
+    )
+
+    plan = plan_sizing(settings, cpus=8)
+
+    assert (plan.workers, plan.pool_size, plan.max_overflow) == (8, 2, 0)
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+
+HEAVY_MODULES = ("aiohttp", "firebase_admin", "google.cloud.pubsub_v1", "passlib", "sentry_sdk")
+
+
+def test_heavy_sdks_imported_when_first_used():
+    """Workers start without importing the SDKs of the remote services (or Sentry, with no DSN)."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, user_management.main; user_management.main.create_app(); "
+            f"print([module for module in {HEAVY_MODULES!r} if module in sys.modules])",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_settings_read_when_app_created():
+    """The application module can be imported without any settings, e.g. by tools."""
+    result = subprocess.run(
+        [sys.executable, "-c", "import user_management.main"],
+        capture_output=True,
+        env={"PATH": os.environ["PATH"]},
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,127 @@
+import io
+import json
+import logging
+
+from fastapi import status
+
+from user_management.core.config.settings import get_settings
+from user_management.core.metrics import LOG_RECORDS_DROPPED
+from user_management.core.structured_logging import (
+    QueueJSONHandler,
+    REQUEST_ID_HEADER,
+    RequestContext,
+    request_context,
+)
+
+
+def test_queue_json_handler():
+    stream = io.StringIO()
+    handler = QueueJSONHandler(stream=stream)
+    logger = logging.getLogger("tests.structured_logging")
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    token = request_context.set(RequestContext(request_id="abc123", route="/api/v1/users"))
+    try:
+        logger.warning("User %s not found", "john.doe@hummingbirdtech.com")
+    finally:
+        request_context.reset(token)
+    logger.warning("Out of any request")
+
+    logger.removeHandler(handler)
+    handler.close()
+
+    in_request, out_of_request = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert in_request["level"] == "WARNING"
+    assert in_request["logger"] == "tests.structured_logging"
+    assert in_request["message"] == "User john.doe@hummingbirdtech.com not found"
+    assert in_request["request_id"] == "abc123"
+    assert in_request["route"] == "/api/v1/users"
+    assert in_request["latency_ms"] >= 0
+    assert "user_uid" not in in_request
+    assert out_of_request["message"] == "Out of any request"
+    assert "request_id" not in out_of_request
+
+
+def test_queue_json_handler_exception():
+    stream = io.StringIO()
+    handler = QueueJSONHandler(stream=stream)
+    logger = logging.getLogger("tests.structured_logging.exception")
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    try:
+        raise ValueError("Invalid email.")
+    except ValueError:
+        logger.exception("Unable to create user %s", "john.doe@hummingbirdtech.com")
+    logger.warning("Stack", stack_info=True)
+
+    logger.removeHandler(handler)
+    handler.close()
+
+    exception, stack = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert exception["message"] == "Unable to create user john.doe@hummingbirdtech.com"
+    assert exception["exception"].startswith("Traceback (most recent call last):")
+    assert exception["exception"].endswith("ValueError: Invalid email.")
+    assert stack["message"] == "Stack"
+    assert stack["stack"].startswith("Stack (most recent call last):")
+    assert "exception" not in stack
+
+
+def test_queue_json_handler_full_queue():
+    handler = QueueJSONHandler(queue_size=1, stream=io.StringIO())
+    handler.listener.stop()
+    dropped = LOG_RECORDS_DROPPED._value.get()  # pylint: disable=protected-access
+
+    for _ in range(3):
+        handler.handle(logging.makeLogRecord({"msg": "Log record"}))
+
+    assert LOG_RECORDS_DROPPED._value.get() == dropped + 2  # pylint: disable=protected-access
+
+
+def test_access_log(test_client, user_info, caplog, monkeypatch):
+    monkeypatch.setattr(get_settings(), "structured_logging", True)
+
+    with caplog.at_level(logging.INFO, logger="user_management.access"):
+        response = test_client.get(
+            f"/api/v1/users/{user_info.user.uid}",
+            headers={
+                "X-Apigateway-Api-Userinfo": user_info.header_payload,
+                REQUEST_ID_HEADER: "abc123",
+            },
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers[REQUEST_ID_HEADER] == "abc123"
+
+    [record] = [record for record in caplog.records if record.name == "user_management.access"]
+    assert record.request_id == "abc123"
+    assert record.route == "/api/v1/users/{uid}"
+    assert record.path == f"/api/v1/users/{user_info.user.uid}"
+    assert record.status == status.HTTP_200_OK
+    assert record.user_uid == str(user_info.user.uid)
+    assert record.latency_ms > 0
+
+
+def test_access_log_disabled(test_client, user_info, caplog, monkeypatch):
+    monkeypatch.setattr(get_settings(), "structured_logging", False)
+
+    with caplog.at_level(logging.INFO, logger="user_management.access"):
+        response = test_client.get(
+            "/api/v1/users", headers={"X-Apigateway-Api-Userinfo": user_info.header_payload}
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    # A request ID is generated when the request doesn't come with one.
+    assert response.headers[REQUEST_ID_HEADER]
+    assert not [record for record in caplog.records if record.name == "user_management.access"]
+
+
+def test_queue_json_handler_stdout(capsys):
+    handler = QueueJSONHandler()
+    handler.handle(logging.makeLogRecord({"msg": "Log record"}))
+    handler.close()
+
+    captured = capsys.readouterr()
+    assert json.loads(captured.out)["message"] == "Log record"
+    assert not captured.err
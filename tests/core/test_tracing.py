@@ -0,0 +1,143 @@
+from unittest.mock import patch
+
+import pytest
+from aiohttp import ClientSession, web
+from fastapi import status
+from opentelemetry.trace import StatusCode
+
+from user_management.core.config.settings import get_settings
+from user_management.core.tracing import client_trace_config, get_span_exporter, get_tracer
+
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_SPAN_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture(name="span_exporter")
+def memory_span_exporter(monkeypatch):
+    """Keeps the spans of the test in memory, as a stand-in of a spans collector."""
+    monkeypatch.setattr(get_settings(), "tracing_exporter", "memory")
+    get_span_exporter.cache_clear()
+    get_tracer.cache_clear()
+
+    yield get_span_exporter()
+
+    get_span_exporter.cache_clear()
+    get_tracer.cache_clear()
+
+
+@patch("user_management.services.mailer.get_publisher_client")
+@patch("firebase_admin.auth.set_custom_user_claims")
+@patch("firebase_admin.auth.create_user")
+@patch("user_management.services.gcp_identity.init_identity_platform_app")
+def test_create_gcp_user_trace(
+    mock_init_gcp_ip_app,  # Mock initializing GCP-IP/Firebase app. pylint: disable=unused-argument
+    mock_create_user,  # pylint: disable=unused-argument
+    mock_set_custom_user_claims,  # pylint: disable=unused-argument
+    mock_pubsub,
+    test_client,
+    staff_user_info,
+    span_exporter,
+):
+    response = test_client.post(
+        "/api/v1/users",
+        headers={
+            "X-Apigateway-Api-Userinfo": staff_user_info.header_payload,
+            "traceparent": f"00-{TRACE_ID}-{PARENT_SPAN_ID}-01",
+        },
+        json={"name": "John Doe", "email": "john.doe@hummingbirdtech.com"},
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    finished_spans = span_exporter.get_finished_spans()
+    spans = {span.name: span for span in finished_spans}
+
+    # The trace started by the caller is continued...
+    server_span = spans["POST /api/v1/users"]
+    assert format(server_span.context.trace_id, "032x") == TRACE_ID
+    assert format(server_span.parent.span_id, "016x") == PARENT_SPAN_ID
+    assert server_span.attributes["http.status_code"] == status.HTTP_201_CREATED
+    assert {format(span.context.trace_id, "032x") for span in spans.values()} == {TRACE_ID}
+
+    # ...with spans for services, repositories, DB commits, Firebase calls and Pub/Sub publishes.
+    parents = {span.context.span_id: span for span in finished_spans}
+
+    def ancestors(span):
+        while span.parent is not None and span.parent.span_id in parents:
+            span = parents[span.parent.span_id]
+            yield span.name
+
+    assert list(ancestors(spans["firebase.create_user"])) == [
+        "GCPIdentityPlatformService.sync_gcp_user",
+        "GCPUserService.create_gcp_user",
+        "POST /api/v1/users",
+    ]
+    assert [
+        list(ancestors(span))
+        for span in finished_spans
+        if span.name == "AlchemyRepository._persist_changes"
+    ] == [
+        # New user, client role and security token committed at once, after GCP-IP is synced.
+        ["AlchemyRepository.commit", "GCPUserService.create_gcp_user", "POST /api/v1/users"],
+    ]
+    assert "MailerService.welcome_message" in ancestors(spans["pubsub.publish"])
+    assert "firebase.set_custom_user_claims" in spans
+
+    # The trace context is propagated in the Pub/Sub messages.
+    assert mock_pubsub().publish.call_args.kwargs["traceparent"].startswith(f"00-{TRACE_ID}-")
+
+
+def test_not_found_trace(test_client, staff_user_info, span_exporter):
+    """Application exceptions which are not server errors are not flagged as errors in spans."""
+    response = test_client.get(
+        "/api/v1/users/d7a9aa45-1737-419a-bf5c-c2a4ac5b60cc",
+        headers={"X-Apigateway-Api-Userinfo": staff_user_info.header_payload},
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    spans = {span.name: span for span in span_exporter.get_finished_spans()}
+
+    assert spans["GET /api/v1/users/{uid}"].status.status_code == StatusCode.UNSET
+    assert spans["AlchemyRepository.get"].attributes["app.exception"] == "ResourceNotFoundError"
+    assert spans["AlchemyRepository.get"].status.status_code == StatusCode.UNSET
+
+
+def test_tracing_disabled(test_client, staff_user_info):
+    assert get_span_exporter() is None
+
+    response = test_client.get(
+        "/api/v1/users", headers={"X-Apigateway-Api-Userinfo": staff_user_info.header_payload}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_aiohttp_client_trace(span_exporter, unused_tcp_port):
+    received_headers = {}
+
+    async def handler(request):
+        received_headers.update(request.headers)
+        return web.json_response({}, status=status.HTTP_400_BAD_REQUEST)
+
+    app = web.Application()
+    app.router.add_post("/v1/token", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", unused_tcp_port).start()
+
+    try:
+        async with ClientSession(trace_configs=[client_trace_config()]) as session:
+            async with session.post(f"http://127.0.0.1:{unused_tcp_port}/v1/token?key=secret"):
+                pass
+    finally:
+        await runner.cleanup()
+
+    [span] = span_exporter.get_finished_spans()
+    assert span.name == "HTTP POST"
+    # API keys in query strings are left out.
+    assert span.attributes["http.url"] == f"http://127.0.0.1:{unused_tcp_port}/v1/token"
+    assert span.attributes["http.status_code"] == status.HTTP_400_BAD_REQUEST
+    assert received_headers["traceparent"].startswith(
+        f"00-{format(span.context.trace_id, '032x')}-{format(span.context.span_id, '016x')}-"
+    )
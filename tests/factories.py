@@ -5,7 +5,7 @@ import factory
 from factory import fuzzy
 from sqlalchemy.orm import Session
 
-from user_management.core.security import pwd_context
+from user_management.core.security import get_pwd_context
 from user_management.models import (
     Capability,
     Client,
@@ -107,7 +107,7 @@ class ClientAPITokenFactory(BaseModelFactory):
         generation. This will replicate the real behavior of Back End and all `ClientAPIToken`s
         generated by the Factory will be stored with encrypted token.
         """
-        kwargs["token"] = pwd_context.hash(kwargs["token"])
+        kwargs["token"] = get_pwd_context().hash(kwargs["token"])
         return kwargs
 
 
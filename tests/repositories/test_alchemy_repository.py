@@ -1,10 +1,23 @@
 import pytest
 import types
+import uuid
 
 from pydantic import BaseModel
 
-from user_management.models import Client
+from user_management.core.exceptions import ResourceConflictError, ResourceNotFoundError
+from user_management.models import Client, ClientUser, Role, SecurityToken
+from user_management.repositories import (
+    ClientRepository,
+    GCPUserRepository,
+    SecurityTokenRepository,
+)
 from user_management.repositories.base import AlchemyRepository
+from user_management.schemas import (
+    ClientUpdateSchema,
+    NewGCPUserSchema,
+    NewNamedEntitySchema,
+    UpdateGCPUserSchema,
+)
 
 
 class DummySchema(BaseModel):
@@ -60,3 +73,98 @@ def test_subclass_alchemy_repository_wrong_schema():
             bases=(AlchemyRepository,),
             exec_body=lambda ns: ns.update(namespace),
         )
+
+
+def test_create_single_statement(test_db_session, query_budget):
+    """Objects are inserted, and returned with their database defaults, by a single statement."""
+    with query_budget(1) as statements:
+        client = ClientRepository(test_db_session).create(NewNamedEntitySchema(name="New"))
+
+    assert "RETURNING" in statements[0]
+    assert client.uid and client.name == "New"
+
+
+def test_create_gcp_user_single_statement(test_db_session, sql_factory, query_budget):
+    """New users are inserted along with their role and security token by a single statement."""
+    client = sql_factory.client.create()
+    schema = NewGCPUserSchema(
+        name="New",
+        email="new@hummingbirdtech.com",
+        role={"client_uid": client.uid, "role": "PILOT"},
+    )
+    repository = GCPUserRepository(test_db_session)
+
+    with query_budget(1):
+        user = repository.create(schema=schema, security_token=True, commit=False)
+    repository.commit()
+
+    assert [(c.client_uid, c.role) for c in user.clients] == [(client.uid, Role.PILOT)]
+    assert test_db_session.get(ClientUser, {"client_uid": client.uid, "gcp_user_uid": user.uid})
+    assert SecurityTokenRepository(test_db_session).get_user_token(gcp_user_uid=user.uid)
+
+
+def test_create_conflict(test_db_session, sql_factory):
+    sql_factory.client.create(name="Existing")
+
+    with pytest.raises(ResourceConflictError):
+        ClientRepository(test_db_session).create(NewNamedEntitySchema(name="Existing"))
+
+
+def test_update_single_statement(test_db_session, sql_factory, query_budget):
+    client = sql_factory.client.create()
+
+    with query_budget(1) as statements:
+        updated = ClientRepository(test_db_session).update(
+            pk=client.uid, schema=ClientUpdateSchema(name="Updated")
+        )
+
+    assert statements[0].startswith("UPDATE") and "RETURNING" in statements[0]
+    assert (updated.uid, updated.name) == (client.uid, "Updated")
+    assert updated.webhook_url == client.webhook_url
+
+
+def test_update_gcp_user_with_clients(test_db_session, sql_factory, query_budget):
+    """Users are updated by a single statement, and their clients roles loaded by another one."""
+    client_user = sql_factory.client_user.create()
+
+    with query_budget(2):
+        updated = GCPUserRepository(test_db_session).update(
+            pk=client_user.gcp_user_uid, schema=UpdateGCPUserSchema(name="Updated")
+        )
+
+    assert updated.name == "Updated"
+    assert [client.client_uid for client in updated.clients] == [client_user.client_uid]
+
+
+def test_delete_single_statement(test_db_session, sql_factory, query_budget):
+    security_token = sql_factory.security_token.create()
+    pk = {"gcp_user_uid": security_token.gcp_user_uid, "uid": security_token.uid}
+
+    with query_budget(1) as statements:
+        SecurityTokenRepository(test_db_session).delete(pk=pk)
+
+    assert statements[0].startswith("DELETE") and "RETURNING" in statements[0]
+    assert test_db_session.get(SecurityToken, pk) is None
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        pytest.param(lambda repository, pk: repository.delete(pk=pk), id="delete"),
+        pytest.param(
+            lambda repository, pk: repository.update(pk=pk, schema=ClientUpdateSchema(name="New")),
+            id="update",
+        ),
+        pytest.param(
+            lambda repository, pk: repository.update(pk=pk, schema=ClientUpdateSchema()),
+            id="update nothing",
+        ),
+    ],
+)
+def test_write_missing_object(test_db_session, query_budget, write):
+    pk = uuid.uuid4()
+
+    with query_budget(1), pytest.raises(
+        ResourceNotFoundError, match=f"No client found with ID {pk}"
+    ):
+        write(ClientRepository(test_db_session), pk)
@@ -0,0 +1,48 @@
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from user_management.core.exceptions import ResourceNotFoundError
+from user_management.models import Client, ClientUser, GCPUser
+from user_management.repositories import ClientRepository
+
+
+def test_delete_client_single_statement(test_db_session, sql_factory, query_budget):
+    client = sql_factory.client.create()
+    sole_members = sql_factory.client_user.create_batch(size=3, client=client)
+    # Members of another client too, and staff users, are kept.
+    other_client_member = sql_factory.client_user.create()
+    sql_factory.client_user.create(client=client, user=other_client_member.user)
+    staff_member = sql_factory.client_user.create(
+        client=client, user=sql_factory.gcp_user.create(staff=True)
+    )
+
+    with query_budget(1):
+        deleted_users = ClientRepository(test_db_session).delete_client(uid=client.uid)
+
+    assert sorted(deleted_users) == sorted(member.gcp_user_uid for member in sole_members)
+    remaining_users = test_db_session.execute(
+        select(GCPUser.uid).where(
+            GCPUser.uid.in_(
+                [*deleted_users, staff_member.gcp_user_uid, other_client_member.gcp_user_uid]
+            )
+        )
+    ).scalars()
+    assert sorted(remaining_users) == sorted(
+        [staff_member.gcp_user_uid, other_client_member.gcp_user_uid]
+    )
+    roles = select(ClientUser.client_uid).filter_by(gcp_user_uid=other_client_member.gcp_user_uid)
+    assert list(test_db_session.execute(roles).scalars()) == [other_client_member.client_uid]
+    assert not test_db_session.get(Client, client.uid, populate_existing=True)
+
+
+def test_delete_client_without_members(test_db_session, sql_factory):
+    client = sql_factory.client.create()
+
+    assert ClientRepository(test_db_session).delete_client(uid=client.uid) == []
+
+
+def test_delete_missing_client(test_db_session):
+    with pytest.raises(ResourceNotFoundError):
+        ClientRepository(test_db_session).delete_client(uid=uuid.uuid4())
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+from time import sleep
+
+from prometheus_client import REGISTRY
+from sqlalchemy import insert, select
+
+from user_management.core.config.settings import get_settings
+from user_management.models import SecurityToken
+from user_management.repositories import SecurityTokenRepository
+from user_management.services import SecurityTokenService
+from user_management.services.security_token import SecurityTokenPurger
+
+
+def expired_token(sql_factory, hours: int = 1) -> SecurityToken:
+    ttl = get_settings().security_token_ttl
+    return sql_factory.security_token.create(
+        created=datetime.now(timezone.utc) - timedelta(hours=ttl + hours)
+    )
+
+
+def purged_tokens() -> float:
+    return REGISTRY.get_sample_value("security_tokens_purged_total") or 0.0
+
+
+def test_get_user_token_skips_expired(test_db_session, sql_factory):
+    token = expired_token(sql_factory)
+    valid_token_uid = test_db_session.scalar(
+        insert(SecurityToken).values(gcp_user_uid=token.gcp_user_uid).returning(SecurityToken.uid)
+    )
+    test_db_session.commit()
+
+    user_token = SecurityTokenRepository(test_db_session).get_user_token(
+        gcp_user_uid=token.gcp_user_uid
+    )
+
+    assert user_token.uid == valid_token_uid
+
+
+def test_purge_expired_batch(test_db_session, sql_factory, query_budget):
+    oldest, older = expired_token(sql_factory, hours=2), expired_token(sql_factory, hours=1)
+    valid_token = sql_factory.security_token.create()
+
+    # A single statement deletes the batch (and the commit ends the transaction).
+    with query_budget(1):
+        deleted = SecurityTokenRepository(test_db_session).purge_expired(batch_size=1)
+
+    assert deleted == 1
+    remaining = test_db_session.execute(select(SecurityToken.uid)).scalars().all()
+    assert sorted(remaining) == sorted([older.uid, valid_token.uid])
+    assert oldest.uid not in remaining
+
+
+def test_purge_expired_in_batches(test_db_session, sql_factory):
+    sql_factory.security_token.create_batch(
+        size=5, created=datetime(2020, 1, 1, tzinfo=timezone.utc)
+    )
+    valid_token = sql_factory.security_token.create()
+    purged = purged_tokens()
+
+    assert SecurityTokenService(test_db_session).purge_expired(batch_size=2) == 5
+
+    assert test_db_session.execute(select(SecurityToken.uid)).scalars().all() == [valid_token.uid]
+    assert purged_tokens() == purged + 5
+
+
+def test_purger_runs_in_background(test_db_session, monkeypatch):
+    purged = []
+    monkeypatch.setattr(SecurityTokenPurger, "purge", lambda self: purged.append(1) or 0)
+    purger = SecurityTokenPurger(interval=0.01)
+
+    purger.start()
+    while len(purged) < 2:
+        sleep(0.01)
+    purger.stop()
+
+    runs = len(purged)
+    assert not purger._thread  # pylint: disable=protected-access
+    assert len(purged) == runs
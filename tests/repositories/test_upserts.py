@@ -0,0 +1,95 @@
+from unittest.mock import patch
+
+import pytest
+from fastapi import status
+from sqlalchemy import select
+
+from user_management.core.exceptions import AuthenticationError, RequestError
+from user_management.models import ClientUser, Role
+from user_management.repositories import ClientRepository, GCPUserRepository
+from user_management.schemas import ClientUserSchema, UpdateGCPUserSchema
+
+
+@pytest.mark.parametrize(
+    ["existing_role", "role", "changed"],
+    [
+        pytest.param(None, Role.PILOT, True, id="New role"),
+        pytest.param(Role.NORMAL_USER, Role.SUPERUSER, True, id="Role changed"),
+        pytest.param(Role.PILOT, Role.PILOT, False, id="Role unchanged"),
+    ],
+)
+def test_update_user_role(test_db_session, sql_factory, query_budget, existing_role, role, changed):
+    client, gcp_user = sql_factory.client.create(), sql_factory.gcp_user.create()
+    if existing_role is not None:
+        sql_factory.client_user.create(client=client, user=gcp_user, role=existing_role)
+    schema = UpdateGCPUserSchema(role=ClientUserSchema(client_uid=client.uid, role=role))
+
+    # Role upserted with a single statement, after loading the user and their roles.
+    with query_budget(3):
+        user, claims_changed = GCPUserRepository(test_db_session).update_with_claims(
+            pk=gcp_user.uid, schema=schema
+        )
+
+    assert claims_changed is changed
+    assert [(c.client_uid, c.role) for c in user.clients] == [(client.uid, role)]
+    client_user = test_db_session.execute(
+        select(ClientUser)
+        .filter_by(gcp_user_uid=gcp_user.uid)
+        .execution_options(populate_existing=True)
+    ).scalar_one()
+    assert client_user.role == role
+
+
+def test_update_user_staff_changes_claims(test_db_session, sql_factory):
+    gcp_user = sql_factory.gcp_user.create(staff=False)
+    repository = GCPUserRepository(test_db_session)
+
+    assert repository.update_with_claims(gcp_user.uid, UpdateGCPUserSchema(name="New"))[1] is False
+    assert repository.update_with_claims(gcp_user.uid, UpdateGCPUserSchema(staff=True))[1] is True
+
+
+@patch("firebase_admin.auth.set_custom_user_claims")
+@patch("firebase_admin.auth.update_user")
+@patch("user_management.services.gcp_identity.init_identity_platform_app")
+def test_unchanged_claims_not_synced(
+    mock_init_gcp_ip_app,
+    mock_update_user,
+    mock_set_custom_user_claims,
+    test_client,
+    user_info,
+    staff_user_info,
+    sql_factory,
+):
+    mock_init_gcp_ip_app.return_value = True
+    client_user = sql_factory.client_user.create(client=user_info.client_1, role=Role.PILOT)
+    role = {"client_uid": str(client_user.client_uid), "role": Role.PILOT.value}
+
+    response = test_client.patch(
+        f"/api/v1/users/{client_user.gcp_user_uid}",
+        headers={"X-Apigateway-Api-Userinfo": staff_user_info.header_payload},
+        json={"name": "New Name", "role": role},
+    )
+
+    assert response.status_code == status.HTTP_200_OK, response.json()
+    mock_update_user.assert_called_once()
+    mock_set_custom_user_claims.assert_not_called()
+
+
+def test_rotate_api_token(test_db_session, sql_factory, query_budget):
+    client = sql_factory.client.create()
+    repository = ClientRepository(test_db_session)
+
+    first = repository.generate_api_token(uid=client.uid)
+    with query_budget(1):
+        second = repository.generate_api_token(uid=client.uid)
+
+    assert repository.check_api_token(token=second.token).client_uid == client.uid
+    with pytest.raises(AuthenticationError):
+        repository.check_api_token(token=first.token)
+
+
+def test_api_token_invalid_client(test_db_session):
+    with pytest.raises(RequestError, match="Invalid Client UUID."):
+        ClientRepository(test_db_session).generate_api_token(
+            uid="fe524b0f-3ee3-4856-b297-84f1a458f374"
+        )
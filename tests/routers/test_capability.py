@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 
 from fastapi import status
@@ -221,3 +223,134 @@ def test_disable_capability(
             "app_exception": "ResourceNotFoundError",
             "context": {"message": f"No Capability {capability_id} found for Client {client_uid}"},
         }
+
+
+def test_get_client_capabilities(test_client, user_info, sql_factory):
+    capability_1 = sql_factory.capability.create(name="Cover Crops")
+    capability_2 = sql_factory.capability.create(name="Crop Type")
+    sql_factory.capability.create(name="Tillage")
+    sql_factory.client_capability.create(client=user_info.client_1, capability=capability_2)
+    sql_factory.client_capability.create(client=user_info.client_1, capability=capability_1)
+    sql_factory.client_capability.create(client=user_info.client_2, capability=capability_2)
+
+    response = test_client.get(
+        f"/api/v1/clients/{user_info.client_1.uid}/capabilities",
+        headers={"X-Apigateway-Api-Userinfo": user_info.header_payload},
+    )
+
+    assert response.status_code == status.HTTP_200_OK, response.json()
+    assert response.json() == {
+        "client_uid": str(user_info.client_1.uid),
+        "capabilities": sorted([capability_1.id, capability_2.id]),
+    }
+
+
+def test_get_client_capabilities_not_member(test_client, user_info, sql_factory):
+    client_capability = sql_factory.client_capability.create()
+
+    response = test_client.get(
+        f"/api/v1/clients/{client_capability.client_uid}/capabilities",
+        headers={"X-Apigateway-Api-Userinfo": user_info.header_payload},
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    ["capability_id", "expected_enabled"],
+    [
+        pytest.param(99, True, id="Capability enabled for client"),
+        pytest.param(100, False, id="Capability not enabled for client"),
+        pytest.param(999999999, False, id="Capability does not exist"),
+    ],
+)
+def test_check_client_capability(
+    test_client, user_info, sql_factory, capability_id, expected_enabled
+):
+    sql_factory.capability.create(id=100)
+    sql_factory.client_capability.create(client=user_info.client_1, capability__id=99)
+
+    response = test_client.get(
+        f"/api/v1/clients/{user_info.client_1.uid}/capabilities/{capability_id}",
+        headers={"X-Apigateway-Api-Userinfo": user_info.header_payload},
+    )
+
+    assert response.status_code == status.HTTP_200_OK, response.json()
+    assert response.json() == {
+        "client_uid": str(user_info.client_1.uid),
+        "capability_id": capability_id,
+        "enabled": expected_enabled,
+    }
+
+
+def test_check_client_capability_after_enable_and_disable(
+    test_client, user_info, staff_user_info, sql_factory
+):
+    """Enabling and disabling capabilities keeps the capabilities lookups up to date."""
+    sql_factory.capability.create(id=99)
+    url = f"/api/v1/clients/{user_info.client_1.uid}/capabilities/99"
+    user_headers = {"X-Apigateway-Api-Userinfo": user_info.header_payload}
+    staff_headers = {"X-Apigateway-Api-Userinfo": staff_user_info.header_payload}
+    payload = {"client_uid": str(user_info.client_1.uid), "capability_id": 99}
+
+    assert test_client.get(url, headers=user_headers).json()["enabled"] is False
+
+    response = test_client.post("/api/v1/capabilities/enable", headers=staff_headers, json=payload)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert test_client.get(url, headers=user_headers).json()["enabled"] is True
+
+    response = test_client.post("/api/v1/capabilities/disable", headers=staff_headers, json=payload)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert test_client.get(url, headers=user_headers).json()["enabled"] is False
+
+
+def test_get_clients_capabilities(test_client, staff_user_info, sql_factory):
+    capability = sql_factory.capability.create()
+    clients = sql_factory.client.create_batch(size=3)
+    sql_factory.client_capability.create(client=clients[0], capability=capability)
+    sql_factory.client_capability.create(client=clients[2], capability=capability)
+
+    response = test_client.post(
+        "/api/v1/clients/capabilities",
+        headers={"X-Apigateway-Api-Userinfo": staff_user_info.header_payload},
+        json={"client_uids": [str(client.uid) for client in clients]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK, response.json()
+    assert response.json() == [
+        {"client_uid": str(clients[0].uid), "capabilities": [capability.id]},
+        {"client_uid": str(clients[1].uid), "capabilities": []},
+        {"client_uid": str(clients[2].uid), "capabilities": [capability.id]},
+    ]
+
+
+@patch("firebase_admin.auth.delete_users")
+def test_clients_capabilities_after_delete(
+    mock_identity_platform, test_client, staff_user_info, sql_factory
+):
+    """Deleting clients drops their capabilities from the capabilities lookups."""
+    # pylint: disable=unused-argument
+    capability = sql_factory.capability.create()
+    client = sql_factory.client.create()
+    sql_factory.client_capability.create(client=client, capability=capability)
+    headers = {"X-Apigateway-Api-Userinfo": staff_user_info.header_payload}
+    url = f"/api/v1/clients/{client.uid}/capabilities/{capability.id}"
+
+    assert test_client.get(url, headers=headers).json()["enabled"] is True
+
+    response = test_client.delete(f"/api/v1/clients/{client.uid}", headers=headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert test_client.get(url, headers=headers).json()["enabled"] is False
+
+
+def test_get_clients_capabilities_not_member(test_client, user_info, sql_factory):
+    """Regular users can only query capabilities of the clients they belong to."""
+    client = sql_factory.client.create()
+
+    response = test_client.post(
+        "/api/v1/clients/capabilities",
+        headers={"X-Apigateway-Api-Userinfo": user_info.header_payload},
+        json={"client_uids": [str(user_info.client_1.uid), str(client.uid)]},
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -122,7 +122,7 @@ def test_list_clients(test_client, user_info, sql_factory):
         ),
     ],
 )
-@patch("user_management.services.gcp_identity.delete_users")
+@patch("firebase_admin.auth.delete_users")
 def test_delete_client(
     mock_identity_platform,  # pylint: disable=unused-argument
     test_client,
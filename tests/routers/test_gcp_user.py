@@ -1,6 +1,7 @@
 import http
 import json
 import uuid
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 
 import pytest
@@ -62,7 +63,7 @@ from user_management.schemas import GCPUserSchema
     ],
 )
 @patch("user_management.services.gcp_user.GCPIdentityPlatformService")
-@patch("user_management.services.mailer.PublisherClient")
+@patch("user_management.services.mailer.get_publisher_client")
 def test_create_gcp_user_as_staff(
     mock_pubsub,
     mock_identity_platform,
@@ -141,7 +142,8 @@ def test_create_gcp_user_as_staff(
             },
         }
         mock_pubsub.publish.assert_called_with(
-            mock_pubsub.topic_path(), json.dumps(message).encode("utf-8")
+            f"projects/{get_settings().google_project_id}/topics/{get_settings().topic_name}",
+            json.dumps(message).encode("utf-8"),
         )
 
 
@@ -250,7 +252,7 @@ def test_create_gcp_user_as_staff(
     ],
 )
 @patch("user_management.services.gcp_user.GCPIdentityPlatformService")
-@patch("user_management.services.mailer.PublisherClient")
+@patch("user_management.services.mailer.get_publisher_client")
 def test_create_gcp_user(
     mock_pubsub,
     mock_identity_platform,
@@ -326,7 +328,8 @@ def test_create_gcp_user(
             },
         }
         mock_pubsub.publish.assert_called_with(
-            mock_pubsub.topic_path(), json.dumps(message).encode("utf-8")
+            f"projects/{get_settings().google_project_id}/topics/{get_settings().topic_name}",
+            json.dumps(message).encode("utf-8"),
         )
 
 
@@ -398,7 +401,7 @@ def test_create_gcp_user(
     ],
 )
 @patch("user_management.services.gcp_identity.init_identity_platform_app")
-@patch("user_management.services.gcp_identity.create_user")
+@patch("firebase_admin.auth.create_user")
 def test_create_sync_gcp_user_errors(
     mock_identity_platform,
     mock_init_gcp_ip_app,  # Mock initializing GCP-IP/Firebase app. pylint: disable=unused-argument
@@ -429,18 +432,12 @@ def test_create_sync_gcp_user_errors(
     gcp_user_uid = response.json().get("context", {}).get("uid")
     assert gcp_user_uid is not None
 
-    # User has been created anyway in local DB.
-    gcp_user = test_db_session.get(GCPUser, gcp_user_uid)
-    assert gcp_user.name == user_name
-    assert gcp_user.email == user_email
-    # User phones normalization.
-    assert gcp_user.phone_number == user_phone.replace(" ", "")
-
-    # Role passed, and new role created successfully.
-    client_user = test_db_session.scalar(
-        select(ClientUser).filter_by(gcp_user_uid=gcp_user_uid, client_uid=client.uid)
-    )
-    assert client_user is not None
+    # Neither the user, nor their role and security token, are left behind in local DB.
+    assert test_db_session.get(GCPUser, gcp_user_uid) is None
+    for model in (ClientUser, SecurityToken):
+        assert not test_db_session.scalar(
+            select(func.count()).select_from(model).filter_by(gcp_user_uid=gcp_user_uid)
+        )
 
 
 @pytest.mark.parametrize(
@@ -890,7 +887,7 @@ def test_update_gcp_user_errors(
     ],
 )
 @patch("user_management.services.gcp_identity.init_identity_platform_app")
-@patch("user_management.services.gcp_identity.update_user")
+@patch("firebase_admin.auth.update_user")
 def test_update_sync_gcp_user_errors(
     mock_identity_platform,
     mock_init_gcp_ip_app,  # Mock initializing GCP-IP/Firebase app. pylint: disable=unused-argument
@@ -1030,7 +1027,7 @@ def test_delete_gcp_user(
         ),
     ],
 )
-@patch("user_management.services.gcp_identity.delete_user")
+@patch("firebase_admin.auth.delete_user")
 def test_delete_sync_gcp_user_errors(
     mock_identity_platform,
     test_client,
@@ -1069,7 +1066,7 @@ def test_delete_sync_gcp_user_errors(
     )
 
 
-@patch("user_management.services.gcp_identity.delete_user")
+@patch("firebase_admin.auth.delete_user")
 def test_delete_user_with_no_password(
     mock_identity_platform,
     test_client,
@@ -1169,12 +1166,13 @@ def test_delete_client_user(test_client, user_info, staff_user_info, test_db_ses
         ),
     ],
 )
-@patch("user_management.services.gcp_identity.update_user")
+@patch("firebase_admin.auth.update_user")
 def test_create_gcp_user_password(
     mock_update_user,
     test_client,
     test_db_session,
     sql_factory,
+    query_budget,
     user_uid,
     token_uid,
     payload,
@@ -1183,10 +1181,12 @@ def test_create_gcp_user_password(
     gcp_user = sql_factory.gcp_user.create(uid="d7a9aa45-1737-419a-bf5c-c2a4ac5b60cc")
     sql_factory.security_token.create(uid="95a78c35-ede7-4b8b-8c88-a3ce2c105406", user=gcp_user)
 
-    response = test_client.post(
-        f"/api/v1/users/{user_uid}/create-password/{token_uid}",
-        json=payload,
-    )
+    # The security token is checked and deleted with a single statement.
+    with query_budget(1):
+        response = test_client.post(
+            f"/api/v1/users/{user_uid}/create-password/{token_uid}",
+            json=payload,
+        )
 
     assert response.status_code == expected_status
 
@@ -1216,6 +1216,48 @@ def test_create_gcp_user_password(
         }
 
 
+@patch("firebase_admin.auth.update_user")
+def test_create_gcp_user_password_expired_token(
+    mock_update_user, test_client, test_db_session, sql_factory
+):
+    """Expired security tokens can't be used, as if they didn't exist."""
+    token = sql_factory.security_token.create(
+        created=datetime.now(timezone.utc) - timedelta(hours=get_settings().security_token_ttl + 1)
+    )
+
+    response = test_client.post(
+        f"/api/v1/users/{token.gcp_user_uid}/create-password/{token.uid}",
+        json={"password": "testing", "verified_password": "testing"},
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    mock_update_user.assert_not_called()
+    assert test_db_session.scalar(
+        select(func.count()).select_from(SecurityToken).filter_by(uid=token.uid)
+    )
+
+
+@patch("firebase_admin.auth.update_user")
+def test_create_gcp_user_password_failure_keeps_token(
+    mock_update_user, test_client, test_db_session, sql_factory
+):
+    """The security token can be used again when the password couldn't be set."""
+    mock_update_user.side_effect = Exception("Service unavailable.")
+    gcp_user = sql_factory.gcp_user.create()
+    token = sql_factory.security_token.create(user=gcp_user)
+    test_db_session.commit()
+
+    response = test_client.post(
+        f"/api/v1/users/{gcp_user.uid}/create-password/{token.uid}",
+        json={"password": "testing", "verified_password": "testing"},
+    )
+
+    assert response.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert test_db_session.scalar(
+        select(func.count()).select_from(SecurityToken).filter_by(uid=token.uid)
+    )
+
+
 @pytest.mark.parametrize(
     ["user_email", "expected_status"],
     [
@@ -1232,7 +1274,7 @@ def test_create_gcp_user_password(
     ],
 )
 @patch("user_management.services.mailer.GCPIdentityPlatformService")
-@patch("user_management.services.mailer.PublisherClient")
+@patch("user_management.services.mailer.get_publisher_client")
 def test_reset_gcp_user_password(
     mock_pubsub, mock_identity_platform, test_client, sql_factory, user_email, expected_status
 ):
@@ -1253,7 +1295,8 @@ def test_reset_gcp_user_password(
             "context": {"full_name": gcp_user.name, "reset_password_link": link},
         }
         mock_pubsub.publish.assert_called_with(
-            mock_pubsub.topic_path(), json.dumps(message).encode("utf-8")
+            f"projects/{get_settings().google_project_id}/topics/{get_settings().topic_name}",
+            json.dumps(message).encode("utf-8"),
         )
         mock_identity_platform.get_password_reset_link.assert_called_with(
             GCPUserSchema(
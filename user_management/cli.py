@@ -0,0 +1,324 @@
+"""
+User Management Service administration commands, run straight against the database (and GCP
+Identity Platform), rather than through the API:
+
+    user_management seed --users 1000000
+    user_management export ./dump
+    user_management import ./dump
+    user_management purge-security-tokens
+    user_management reconcile-gcp --apply
+    user_management sizing-plan
+"""
+import csv
+import io
+import json
+import math
+import random
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Iterable, Iterator, List, Optional, Sequence, Set
+
+import typer
+from firebase_admin.auth import list_users
+from sqlalchemy import Sequence as SQLSequence, text
+
+from user_management.core.config.sizing import get_sizing_plan
+from user_management.core.database import Base, db_session_factory, get_engine
+from user_management.core.firebase import init_identity_platform_app
+from user_management.models import Role
+from user_management.repositories import GCPUserRepository
+from user_management.services.gcp_identity import GCPIdentityPlatformService
+from user_management.services.security_token import SecurityTokenService
+
+
+app = typer.Typer(help="User Management Service administration commands.")
+
+
+@dataclass
+class Throughput:
+    label: str
+    rows: int = 0
+    seconds: float = 0
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        start = perf_counter()
+        yield
+        self.seconds += perf_counter() - start
+
+    def report(self) -> None:
+        typer.echo(
+            f"{self.label}: {self.rows:,} rows in {self.seconds:.2f}s "
+            f"({self.rows / self.seconds if self.seconds else 0:,.0f} rows/s)"
+        )
+
+
+@contextmanager
+def throughput(label: str) -> Iterator[Throughput]:
+    """Reports the rows processed per second in the context block, counted in `Throughput.rows`."""
+    counter = Throughput(label)
+    with counter.measure():
+        yield counter
+    counter.report()
+
+
+def copy_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence]) -> int:
+    """Loads the rows in the table with a single `COPY` statement, returning the number of rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    return count
+
+
+@app.command()
+def seed(
+    users: int = typer.Option(1_000_000, help="Users to seed."),
+    users_per_client: int = typer.Option(10, help="Users of every seeded client."),
+    capabilities: int = typer.Option(50, help="Capabilities to seed."),
+    capabilities_per_client: int = typer.Option(5, help="Capabilities enabled for every client."),
+    batch_size: int = typer.Option(100_000, help="Rows loaded with every COPY statement."),
+):
+    """
+    Seeds a synthetic dataset of users, clients (every user is given a role in one of them) and
+    capabilities, loaded with PostgreSQL COPY statements. Seeded rows are added to the existing
+    ones, so the command can be run several times.
+    """
+    connection = get_engine().raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            with throughput("capability") as counter:
+                cursor.execute(
+                    "INSERT INTO capability (id, name) "
+                    "SELECT nextval('capability_id_seq'), 'Seed capability ' || md5(random()::text) "
+                    "FROM generate_series(1, %s) RETURNING id",
+                    (capabilities,),
+                )
+                capability_ids = [id_ for (id_,) in cursor.fetchall()]
+                counter.rows = len(capability_ids)
+
+            client_uids = [uuid.uuid4() for _ in range(max(math.ceil(users / users_per_client), 1))]
+            with throughput("client") as counter:
+                for start in range(0, len(client_uids), batch_size):
+                    counter.rows += copy_rows(
+                        cursor,
+                        "client",
+                        ("uid", "name", "webhook_url"),
+                        (
+                            (uid, f"Seed client {uid.hex}", f"https://{uid.hex}.example.com")
+                            for uid in client_uids[start : start + batch_size]
+                        ),
+                    )
+
+            with throughput("client_capability") as counter:
+                for start in range(0, len(client_uids), batch_size):
+                    counter.rows += copy_rows(
+                        cursor,
+                        "client_capability",
+                        ("client_uid", "capability_id"),
+                        (
+                            (uid, capability_id)
+                            for uid in client_uids[start : start + batch_size]
+                            for capability_id in random.sample(
+                                capability_ids, min(capabilities_per_client, len(capability_ids))
+                            )
+                        ),
+                    )
+
+            users_counter, roles_counter = Throughput("gcp_user"), Throughput("client_user")
+            for start in range(0, users, batch_size):
+                user_uids = [uuid.uuid4() for _ in range(min(batch_size, users - start))]
+                with users_counter.measure():
+                    users_counter.rows += copy_rows(
+                        cursor,
+                        "gcp_user",
+                        ("uid", "name", "email", "phone_number", "staff"),
+                        (
+                            (
+                                uid,
+                                f"Seed user {uid.hex[:12]}",
+                                f"{uid.hex}@seed.hummingbirdtech.com",
+                                f"+44{random.randint(2000000000, 3999999999)}",
+                                False,
+                            )
+                            for uid in user_uids
+                        ),
+                    )
+                with roles_counter.measure():
+                    roles_counter.rows += copy_rows(
+                        cursor,
+                        "client_user",
+                        ("client_uid", "gcp_user_uid", "role"),
+                        (
+                            (client_uids[(start + index) // users_per_client], uid, role.value)
+                            for index, uid in enumerate(user_uids)
+                            for role in [random.choice(list(Role))]
+                        ),
+                    )
+            users_counter.report()
+            roles_counter.report()
+
+        connection.commit()
+        # Planner statistics are refreshed for the seeded rows (ANALYZE can't run in a
+        # transaction).
+        connection.autocommit = True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        finally:
+            connection.autocommit = False
+    finally:
+        connection.close()
+
+
+@app.command()
+def export(directory: Path = typer.Argument(..., help="Directory to write the CSV files to.")):
+    """Exports every table to a CSV file (with a header line) with PostgreSQL COPY statements."""
+    directory.mkdir(parents=True, exist_ok=True)
+    connection = get_engine().raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            for table in Base.metadata.sorted_tables:
+                with throughput(table.name) as counter:
+                    with open(directory / f"{table.name}.csv", "w", encoding="utf-8") as file:
+                        cursor.copy_expert(
+                            f"COPY {table.name} TO STDOUT WITH (FORMAT csv, HEADER)", file
+                        )
+                    counter.rows = cursor.rowcount
+    finally:
+        connection.close()
+
+
+@app.command(name="import")
+def import_(directory: Path = typer.Argument(..., help="Directory to read the CSV files from.")):
+    """
+    Imports the CSV files written by the `export` command, in a single transaction. Rows are first
+    loaded with PostgreSQL COPY statements into temporary tables, so rows already existing (with
+    the same primary key or unique values) are skipped rather than failing the whole import.
+    """
+    connection = get_engine().raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            for table in Base.metadata.sorted_tables:
+                if not (path := directory / f"{table.name}.csv").exists():
+                    continue
+
+                with throughput(table.name) as counter, open(path, encoding="utf-8") as file:
+                    columns = ", ".join(next(csv.reader(file)))
+                    file.seek(0)
+                    cursor.execute(
+                        f"CREATE TEMPORARY TABLE import_{table.name} "
+                        f"(LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DROP"
+                    )
+                    cursor.copy_expert(
+                        f"COPY import_{table.name} ({columns}) FROM STDIN WITH (FORMAT csv, HEADER)",
+                        file,
+                    )
+                    loaded = cursor.rowcount
+                    cursor.execute(
+                        f"INSERT INTO {table.name} ({columns}) "
+                        f"SELECT {columns} FROM import_{table.name} ON CONFLICT DO NOTHING"
+                    )
+                    counter.rows = cursor.rowcount
+                    if skipped := loaded - cursor.rowcount:
+                        typer.echo(f"{table.name}: {skipped:,} existing rows skipped")
+
+                # Keep sequences ahead of the imported IDs.
+                for column in table.columns:
+                    if isinstance(column.default, SQLSequence):
+                        cursor.execute(
+                            f"SELECT setval('{column.default.name}', "
+                            f"(SELECT coalesce(max({column.name}), 0) + 1 FROM {table.name}), false)"
+                        )
+
+        connection.commit()
+    finally:
+        connection.close()
+
+
+@app.command()
+def purge_security_tokens(
+    older_than: Optional[int] = typer.Option(
+        None, help="Age (in hours) of the tokens to purge (`SECURITY_TOKEN_TTL` by default)."
+    ),
+    batch_size: int = typer.Option(10_000, help="Tokens deleted in every transaction."),
+):
+    """
+    Deletes the security tokens (sent to new users to set up their password) expired, or older than
+    the given age. Tokens are deleted in batches, each one in its own transaction, so locks are held
+    briefly (the service purges them in the background too).
+    """
+    with throughput("security_token") as counter:
+        with db_session_factory()() as session:
+            counter.rows = SecurityTokenService(session).purge_expired(
+                batch_size=batch_size, ttl=older_than
+            )
+
+
+@app.command()
+def reconcile_gcp(
+    apply: bool = typer.Option(
+        False, "--apply", help="Fix the differences found, rather than list them."
+    ),
+):
+    """
+    Compares the users in the database with the ones in GCP Identity Platform. Users missing in GCP
+    Identity Platform are created there, and users that only exist there are deleted, when the
+    `--apply` option is given.
+    """
+    if not init_identity_platform_app():
+        typer.echo("GCP Identity Platform not connected.", err=True)
+        raise typer.Exit(code=1)
+
+    with throughput("gcp_user") as counter:
+        with get_engine().connect() as connection:
+            local_uids: Set[str] = {
+                str(uid) for (uid,) in connection.execute(text("SELECT uid FROM gcp_user"))
+            }
+        counter.rows = len(local_uids)
+
+    with throughput("GCP Identity Platform users") as counter:
+        gcp_uids: Set[str] = set()
+        for gcp_user in list_users().iterate_all():
+            gcp_uids.add(gcp_user.uid)
+        counter.rows = len(gcp_uids)
+
+    missing: List[str] = sorted(local_uids - gcp_uids)
+    orphans: List[str] = sorted(gcp_uids - local_uids)
+    typer.echo(f"Users missing in GCP Identity Platform: {len(missing):,}")
+    typer.echo(f"Users only in GCP Identity Platform: {len(orphans):,}")
+    if not apply:
+        for uid in missing:
+            typer.echo(f"missing {uid}")
+        for uid in orphans:
+            typer.echo(f"orphan {uid}")
+        return
+
+    gcp_identity_service = GCPIdentityPlatformService()
+    with throughput("Users created in GCP Identity Platform") as counter:
+        with db_session_factory()() as session:
+            repository = GCPUserRepository(session)
+            for uid in missing:
+                gcp_identity_service.sync_gcp_user(repository.get(pk=uuid.UUID(uid)))
+                counter.rows += 1
+
+    with throughput("Users deleted in GCP Identity Platform") as counter:
+        GCPIdentityPlatformService.remove_bulk_gcp_users(uids=[uuid.UUID(uid) for uid in orphans])
+        counter.rows = len(orphans)
+
+
+@app.command()
+def sizing_plan():
+    """
+    Prints (as JSON) the Gunicorn workers and database pools sizing the service runs with, on this
+    machine and with the current settings.
+    """
+    typer.echo(json.dumps(get_sizing_plan().as_dict(), indent=2))
@@ -0,0 +1,99 @@
+import functools
+import threading
+from time import monotonic
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from user_management.core.config.settings import get_settings
+
+
+class CapabilityIndex:
+    """
+    In-memory index of the capabilities enabled for every client, so "does client X have
+    capability Y" questions can be answered without going to the database.
+
+    Every client's capabilities are stored as a bitset (a plain Python `int`). Capability IDs are
+    mapped to dense bit positions when they are first seen, so sparse or very high capability IDs
+    don't make bitsets grow. The index is loaded in bulk from `client_capability` rows, kept up to
+    date by the worker process that enables or disables capabilities (or deletes clients), and
+    considered stale after `ttl` seconds, so changes made by other worker processes are picked up
+    too, `ttl` seconds later at most.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._bitsets: Dict[UUID, int] = {}
+        self._positions: Dict[int, int] = {}
+        self._capability_ids: List[int] = []
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def stale(self) -> bool:
+        return self._loaded_at is None or monotonic() - self._loaded_at > self.ttl
+
+    def _position(self, capability_id: int) -> int:
+        """Returns the bit position of the given capability ID, assigning a new one if needed."""
+        if (position := self._positions.get(capability_id)) is None:
+            position = self._positions[capability_id] = len(self._capability_ids)
+            self._capability_ids.append(capability_id)
+
+        return position
+
+    def load(self, rows: Iterable[Tuple[UUID, int]]) -> None:
+        """Replaces the index contents with the given `(client_uid, capability_id)` rows."""
+        with self._lock:
+            self._bitsets.clear()
+            self._positions.clear()
+            self._capability_ids.clear()
+            for client_uid, capability_id in rows:
+                bit = 1 << self._position(capability_id)
+                self._bitsets[client_uid] = self._bitsets.get(client_uid, 0) | bit
+
+            self._loaded_at = monotonic()
+
+    def invalidate(self) -> None:
+        """Marks the index as stale, so it will be fully reloaded on next lookup."""
+        with self._lock:
+            self._loaded_at = None
+
+    def enable(self, client_uid: UUID, capability_id: int) -> None:
+        with self._lock:
+            if self._loaded_at is not None:
+                bit = 1 << self._position(capability_id)
+                self._bitsets[client_uid] = self._bitsets.get(client_uid, 0) | bit
+
+    def disable(self, client_uid: UUID, capability_id: int) -> None:
+        with self._lock:
+            position = self._positions.get(capability_id)
+            if self._loaded_at is not None and position is not None:
+                self._bitsets[client_uid] = self._bitsets.get(client_uid, 0) & ~(1 << position)
+
+    def remove(self, client_uid: UUID) -> None:
+        """Drops the capabilities of the given (deleted) client."""
+        with self._lock:
+            self._bitsets.pop(client_uid, None)
+
+    def has_capability(self, client_uid: UUID, capability_id: int) -> bool:
+        position = self._positions.get(capability_id)
+        if position is None:
+            return False
+
+        return bool(self._bitsets.get(client_uid, 0) >> position & 1)
+
+    def capabilities(self, client_uid: UUID) -> List[int]:
+        """Returns the sorted list of capability IDs enabled for the given client."""
+        bitset = self._bitsets.get(client_uid, 0)
+        capability_ids = []
+        while bitset:
+            lowest_bit = bitset & -bitset
+            capability_ids.append(self._capability_ids[lowest_bit.bit_length() - 1])
+            bitset ^= lowest_bit
+
+        return sorted(capability_ids)
+
+
+@functools.cache
+def get_capability_index() -> CapabilityIndex:
+    """Process wide `CapabilityIndex` instance."""
+    return CapabilityIndex(ttl=get_settings().capability_index_ttl)
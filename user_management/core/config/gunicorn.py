@@ -1,9 +1,52 @@
+import gc
+import os
+import shutil
+
 from user_management.core.config.settings import get_settings
+from user_management.core.config.sizing import get_sizing_plan
 
 settings = get_settings()
+sizing_plan = get_sizing_plan()
 
-workers = 2
+workers = sizing_plan.workers
 threads = 1
 timeout = 120
 worker_class = "user_management.core.config.workers.FactoryUvicornWorker"
-accesslog = "-"  # Log to stdout.
+# In preload mode, the application (routes, OpenAPI schema, middlewares...) is created once in the
+# master process, and shared copy-on-write by the workers. Database connections, the GCP Identity
+# Platform / Firebase app and Pub/Sub client are created by every worker after the fork, when first
+# used. The application can't be given in the command line in this mode, as it's not the factory.
+preload_app = settings.preload_app
+if preload_app:
+    wsgi_app = "user_management.main:create_app()"
+    worker_class = "user_management.core.config.workers.PreloadedUvicornWorker"
+# Log to stdout, unless requests are logged by the application structured access log.
+accesslog = None if settings.structured_logging else "-"
+
+
+def on_starting(server):
+    """
+    Logs the workers and database pools sizing, and cleans up Prometheus multiprocess metrics left
+    over by any previous run.
+    """
+    server.log.info("Using %s", sizing_plan)
+    if multiproc_dir := os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def when_ready(server):  # pylint: disable=unused-argument
+    """
+    Leaves the preloaded application objects out of garbage collection, so that collections in the
+    workers don't write to (and so copy) the memory pages shared with the master process.
+    """
+    if preload_app:
+        gc.freeze()
+
+
+def child_exit(server, worker):  # pylint: disable=unused-argument
+    """Drops the live gauges of dead worker processes from the Prometheus metrics."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess  # pylint: disable=import-outside-toplevel
+
+        multiprocess.mark_process_dead(worker.pid)
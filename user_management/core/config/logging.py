@@ -1,48 +1,64 @@
+from typing import Any, Dict
+
 from user_management.core.config.settings import get_settings
 
 
-LOGGING_LEVEL = "DEBUG" if get_settings().debug else "INFO"
+def get_logging_config() -> Dict[str, Any]:
+    """Python logging configuration (see `logging.config.dictConfig`), from the settings."""
+    settings = get_settings()
 
-logging_config = {
-    "version": 1,
-    "disable_existing_loggers": True,
-    "formatters": {
-        "standard": {
-            "format": "%(levelname)s: [%(name)s:%(funcName)s:%(lineno)s] %(message)s",
-        },
-    },
-    "handlers": {
+    level = "DEBUG" if settings.debug else "INFO"
+    handler = "structured" if settings.structured_logging else "console"
+
+    handlers = {
         "console": {
-            "level": LOGGING_LEVEL,
+            "level": level,
             "class": "logging.StreamHandler",
             "formatter": "standard",
         },
-    },
-    "loggers": {
-        "user_management": {
-            "handlers": ["console"],
-            "propagate": False,
-            "level": LOGGING_LEVEL,
+        "structured": {
+            "level": level,
+            "()": "user_management.core.structured_logging.QueueJSONHandler",
+            "queue_size": settings.log_queue_size,
         },
-        "uvicorn": {
-            "handlers": ["console"],
-            "propagate": False,
-            "level": LOGGING_LEVEL,
-        },
-        "gunicorn": {
-            "handlers": ["console"],
-            "propagate": False,
-            "level": LOGGING_LEVEL,
-        },
-        "google.cloud.pubsub_v1": {
-            "handlers": ["console"],
-            "propagate": False,
-            "level": LOGGING_LEVEL,
+    }
+
+    return {
+        "version": 1,
+        "disable_existing_loggers": True,
+        "formatters": {
+            "standard": {
+                "format": "%(levelname)s: [%(name)s:%(funcName)s:%(lineno)s] %(message)s",
+            },
         },
-        "sentry_sdk": {
-            "handlers": ["console"],
-            "propagate": False,
-            "level": LOGGING_LEVEL,
+        # Only the handler in use is configured, so the structured logging thread isn't started
+        # needlessly.
+        "handlers": {handler: handlers[handler]},
+        "loggers": {
+            "user_management": {
+                "handlers": [handler],
+                "propagate": False,
+                "level": level,
+            },
+            "uvicorn": {
+                "handlers": [handler],
+                "propagate": False,
+                "level": level,
+            },
+            "gunicorn": {
+                "handlers": [handler],
+                "propagate": False,
+                "level": level,
+            },
+            "google.cloud.pubsub_v1": {
+                "handlers": [handler],
+                "propagate": False,
+                "level": level,
+            },
+            "sentry_sdk": {
+                "handlers": [handler],
+                "propagate": False,
+                "level": level,
+            },
         },
-    },
-}
+    }
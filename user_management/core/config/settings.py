@@ -1,6 +1,6 @@
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseSettings, DirectoryPath, HttpUrl, PostgresDsn, SecretStr
 from pydantic.schema import Pattern
@@ -11,6 +11,24 @@ class DBSettings(BaseSettings):
     database_pool_size: int = 40
     database_max_overflow: int = 10
     database_pool_recycle: int = 3600
+    # Read replicas. Read-only repository calls are sent to one of them, unless it lags behind the
+    # primary database more than `database_replica_max_lag` seconds (checked every
+    # `database_replica_lag_check_interval` seconds in the background, giving up on unavailable
+    # replicas after `database_replica_check_timeout` seconds).
+    database_replica_urls: List[PostgresDsn] = []
+    database_replica_max_lag: float = 5.0
+    database_replica_lag_check_interval: float = 5.0
+    database_replica_check_timeout: int = 2
+    # PgBouncer transaction pooling mode. Database connections are pooled by PgBouncer, so every
+    # worker keeps `database_pgbouncer_pool_size` connections at most (or opens a connection for
+    # every transaction, when 0), rather than the sized pools, and doesn't ping them before use.
+    database_pgbouncer: bool = False
+    database_pgbouncer_pool_size: int = 0
+
+    # Queries taking longer than this are logged along with their query plan.
+    slow_query_threshold_ms: int = 500
+    # Requests running the same statement this many times are logged as potential N+1 queries.
+    n_plus_one_threshold: int = 10
 
     class Config:
         env_file = ".env"
@@ -19,6 +37,11 @@ class DBSettings(BaseSettings):
 
 class Settings(DBSettings):
     debug: bool = True
+    fast_json_responses: bool = True
+    # Logging. Structured logging writes JSON lines from a background thread, through a queue of
+    # `log_queue_size` records, and replaces Gunicorn access logs.
+    structured_logging: bool = False
+    log_queue_size: int = 10000
     google_project_id: str
     project_root: DirectoryPath = Path(__file__).resolve().parent.parent.parent.parent
 
@@ -32,6 +55,27 @@ class Settings(DBSettings):
     gcp_api_key: SecretStr
     gcp_credentials: Optional[SecretStr]
     gcp_request_timeout: int = 30
+    # GCP Identity Platform endpoints: base URL of the REST API users log in with, and `host:port`
+    # of an emulator (e.g. `benchmarks.identity_platform`) the Firebase Admin SDK calls go to
+    # instead of Google, with no credentials.
+    gcp_identity_toolkit_url: str = "https://identitytoolkit.googleapis.com"
+    gcp_auth_emulator_host: Optional[str]
+    # GCP Identity Platform calls resilience (see `core.resilience`). Every operation has a circuit
+    # breaker, opened (failing calls fast) after `gcp_breaker_failure_threshold` failures in a row,
+    # for `gcp_breaker_reset_timeout` seconds. Concurrent calls to every service are limited, from
+    # `gcp_concurrency_initial`, within `gcp_concurrency_min` and `gcp_concurrency_max`: the limit
+    # grows while calls succeed, and is halved when they fail or take longer than
+    # `gcp_concurrency_latency_threshold` seconds.
+    gcp_breaker_failure_threshold: int = 5
+    gcp_breaker_reset_timeout: float = 30.0
+    gcp_concurrency_initial: int = 20
+    gcp_concurrency_min: int = 2
+    gcp_concurrency_max: int = 200
+    gcp_concurrency_latency_threshold: float = 5.0
+
+    # Seconds requests are given to complete, unless the caller sets a shorter deadline (in the
+    # `X-Request-Timeout-Ms` header). Remote calls are never given longer than what is left.
+    request_timeout: float = 20.0
 
     # GCP Pub/Sub configuration
     topic_name: str = "mailing"
@@ -45,6 +89,59 @@ class Settings(DBSettings):
     # API tokens security
     encrypt_salt: SecretStr
 
+    # Security tokens (sent to new users to set up their password). Hours before tokens expire,
+    # and background purge of the expired ones, run by every worker process every
+    # `security_token_purge_interval` seconds (0 disables it) in batches (transactions) of
+    # `security_token_purge_batch_size` tokens.
+    security_token_ttl: int = 72
+    security_token_purge_interval: int = 3600
+    security_token_purge_batch_size: int = 1000
+
+    # Application exceptions logging. Where handled exceptions were raised from: `none`, `origin`
+    # (the frame raising the exception) or `full` (every frame the exception went through).
+    exception_context: Literal["none", "origin", "full"] = "origin"
+
+    # OpenTelemetry tracing. Spans exporter (`none`, `console`, `memory` or `otlp`), OTLP collector
+    # endpoint (defaults to the `OTEL_EXPORTER_OTLP_TRACES_ENDPOINT` environment variable) and ratio
+    # of the traces started by the service to be sampled.
+    tracing_exporter: Literal["none", "console", "memory", "otlp"] = "none"
+    tracing_otlp_endpoint: Optional[HttpUrl]
+    tracing_sample_rate: float = 1.0
+
+    # Gunicorn workers and database pools sizing (see `core.config.sizing`). `fixed` runs
+    # `web_workers` workers with the `database_pool_size`/`database_max_overflow` pools, `auto`
+    # derives the workers from the available CPUs and divides the `database_connection_budget`
+    # connections of the service instance among them.
+    sizing_mode: Literal["fixed", "auto"] = "fixed"
+    web_workers: int = 2
+    web_workers_per_cpu: float = 1.0
+    web_max_workers: int = 16
+    database_connection_budget: int = 50
+    database_overflow_ratio: float = 0.2
+    # Gunicorn preload mode: the application is created once, in the master process, and shared
+    # (copy-on-write) by the forked workers, rather than created by every worker.
+    preload_app: bool = False
+
+    # Rate limiting of the unauthenticated endpoints (login and password reset), with token buckets
+    # of `*_burst` requests, refilled at `*_rate` requests per second: by client IP address, by
+    # user email, and for the whole endpoint (shedding the load beyond what the worker, and the
+    # remote services quotas, can take). Buckets are kept in memory by every worker process, and
+    # shared by all of them too (in the database) with `rate_limit_shared`. The IP address limit is
+    # only enabled with `rate_limit_ip_enabled`, once Uvicorn is set up to take client addresses
+    # from the proxies `X-Forwarded-For` headers: it would otherwise limit every client together.
+    rate_limit_enabled: bool = True
+    rate_limit_ip_enabled: bool = False
+    rate_limit_ip_rate: float = 1.0
+    rate_limit_ip_burst: int = 20
+    rate_limit_email_rate: float = 0.1
+    rate_limit_email_burst: int = 5
+    rate_limit_endpoint_rate: float = 50.0
+    rate_limit_endpoint_burst: int = 100
+    rate_limit_shared: bool = False
+
+    # Capabilities lookups. Seconds before the in-memory client capabilities index is reloaded.
+    capability_index_ttl: int = 60
+
 
 @lru_cache(maxsize=1)
 def get_settings():
@@ -0,0 +1,106 @@
+import math
+import os
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from user_management.core.config.settings import get_settings, Settings
+
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+@dataclass(frozen=True)
+class SizingPlan:
+    """Gunicorn workers and database connection pools sizing, for one service instance."""
+
+    mode: str
+    cpus: float
+    workers: int
+    # Per worker process.
+    pool_size: int
+    max_overflow: int
+
+    @property
+    def max_connections(self) -> int:
+        """Database connections the service instance may open, from all of its workers."""
+        return self.workers * (self.pool_size + self.max_overflow)
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "max_connections": self.max_connections}
+
+    def __str__(self) -> str:
+        return (
+            f"{self.mode} sizing: {self.workers} workers for {self.cpus:g} CPUs, database pools "
+            f"of {self.pool_size} (+{self.max_overflow} overflow) connections per worker, "
+            f"{self.max_connections} connections at most"
+        )
+
+
+def cgroup_cpu_limit(cgroup_root: Path = CGROUP_ROOT) -> Optional[float]:
+    """CPUs the process is limited to by its cgroup (v2 or v1) CPU quota, if any."""
+    try:
+        quota, period = (cgroup_root / "cpu.max").read_text().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        quota = (cgroup_root / "cpu" / "cpu.cfs_quota_us").read_text()
+        period = (cgroup_root / "cpu" / "cpu.cfs_period_us").read_text()
+        return None if int(quota) <= 0 else int(quota) / int(period)
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus(cgroup_root: Path = CGROUP_ROOT) -> float:
+    """CPUs available to the process: the ones it can be scheduled on, within cgroup limits."""
+    cpus: float = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else 0
+    cpus = cpus or os.cpu_count() or 1
+    if (limit := cgroup_cpu_limit(cgroup_root)) is not None:
+        cpus = min(cpus, limit)
+    return cpus
+
+
+def plan_sizing(settings: Settings, cpus: float) -> SizingPlan:
+    """
+    Sizes the workers and database pools. In `fixed` mode, `web_workers` and the database pool
+    settings are used as they are. In `auto` mode, `web_workers_per_cpu` workers are run for every
+    available CPU (up to `web_max_workers`), and `database_connection_budget` connections are
+    divided among them, `database_overflow_ratio` of them kept as pool overflow. Workers are reduced
+    when the budget can't give every one of them a connection.
+
+    Behind PgBouncer (`database_pgbouncer`), pools are `database_pgbouncer_pool_size` connections
+    (to PgBouncer, which shares a few database connections among all of them) in both modes, so
+    workers aren't limited by the connection budget.
+    """
+    if settings.sizing_mode == "fixed":
+        workers = settings.web_workers
+        pool_size, max_overflow = settings.database_pool_size, settings.database_max_overflow
+    else:
+        workers = max(math.floor(cpus * settings.web_workers_per_cpu), 1)
+        workers = min(workers, settings.web_max_workers)
+        if not settings.database_pgbouncer:
+            workers = min(workers, max(settings.database_connection_budget, 1))
+        connections = max(settings.database_connection_budget // workers, 1)
+        max_overflow = math.floor(connections * settings.database_overflow_ratio)
+        # Every worker keeps at least one pooled connection.
+        max_overflow = min(max_overflow, connections - 1)
+        pool_size = connections - max_overflow
+
+    if settings.database_pgbouncer:
+        pool_size, max_overflow = settings.database_pgbouncer_pool_size, 0
+
+    return SizingPlan(
+        mode=settings.sizing_mode,
+        cpus=cpus,
+        workers=workers,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_sizing_plan() -> SizingPlan:
+    return plan_sizing(get_settings(), available_cpus())
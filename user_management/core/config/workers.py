@@ -1,5 +1,7 @@
 from uvicorn.workers import UvicornWorker
 
+from user_management.core.config.settings import get_settings
+
 
 class FactoryUvicornWorker(UvicornWorker):
     """
@@ -11,4 +13,15 @@ class FactoryUvicornWorker(UvicornWorker):
         "factory": True,
         "http": "auto",
         "loop": "auto",
+        # Requests are logged by the application structured access log instead.
+        "access_log": not get_settings().structured_logging,
     }
+
+
+class PreloadedUvicornWorker(FactoryUvicornWorker):
+    """
+    `UvicornWorker` serving the application created in the Gunicorn master process, in preload
+    mode (see `PRELOAD_APP` setting), rather than creating it from the factory.
+    """
+
+    CONFIG_KWARGS = {**FactoryUvicornWorker.CONFIG_KWARGS, "factory": False}
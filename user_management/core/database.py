@@ -1,25 +1,256 @@
 import functools
+import logging
+import math
+import os
+import random
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Dict, Iterator, List, Optional, Union
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, Session, sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.selectable import Select
 
 from user_management.core.config.settings import get_settings
+from user_management.core.config.sizing import get_sizing_plan
+from user_management.core.metrics import DB_REPLICA_LAG, instrument_pool, InstrumentedQueuePool
+from user_management.core.query_stats import instrument_queries
 
 
-@functools.lru_cache(maxsize=1)
-def db_session_factory() -> sessionmaker:
-    """Sessions registry for PostgreSQL Farm Management database."""
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary database: none when it has replayed everything it
+# received (even if the primary has had no writes for a while).
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def _create_engine(database_url: str, **options) -> Engine:
     settings = get_settings()
+    sizing_plan = get_sizing_plan()
+    if settings.database_pgbouncer and not sizing_plan.pool_size:
+        # PgBouncer pools the database connections: connections to it are opened for every
+        # transaction, and closed right after.
+        pool_options: Dict[str, Any] = {"poolclass": NullPool}
+    else:
+        pool_options = {
+            "poolclass": InstrumentedQueuePool,
+            "pool_recycle": settings.database_pool_recycle,
+            "pool_size": sizing_plan.pool_size,
+            "max_overflow": sizing_plan.max_overflow,
+        }
+
+    # PgBouncer checks the database connections health itself, so pinging them on every checkout
+    # would only add a round trip. Psycopg2 doesn't use server-side prepared statements, and the
+    # service sets no session state (`SET` statements, advisory locks, `LISTEN`...), so nothing
+    # else breaks with transaction pooling, where transactions may run on different connections.
     engine = create_engine(
-        settings.database_url,
-        pool_pre_ping=True,
-        pool_recycle=settings.database_pool_recycle,
-        pool_size=settings.database_pool_size,
-        max_overflow=settings.database_max_overflow,
+        database_url, pool_pre_ping=not settings.database_pgbouncer, **pool_options, **options
     )
+    instrument_queries(engine)
+
+    return engine
+
+
+@functools.lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    """PostgreSQL Farm Management database engine, with its connections pool."""
+    engine = _create_engine(get_settings().database_url)
+    instrument_pool(engine)
+
+    return engine
+
+
+@dataclass
+class Replica:
+    """
+    PostgreSQL Farm Management database read replica, with its last checked replication lag
+    (unknown, so not read from, until first checked).
+    """
+
+    name: str
+    engine: Engine
+    lag: float = math.inf
+    checked: float = -math.inf
+
+
+@functools.lru_cache(maxsize=1)
+def get_replicas() -> List[Replica]:
+    """Read replicas set up with the `DATABASE_REPLICA_URLS` setting, if any."""
+    # Unreachable replicas are given up on quickly, and reads sent to the primary database.
+    connect_args = {"connect_timeout": get_settings().database_replica_check_timeout}
+    return [
+        Replica(
+            name=f"{url.host}:{url.port or 5432}{url.path or ''}",
+            engine=_create_engine(url, connect_args=connect_args),
+        )
+        for url in get_settings().database_replica_urls
+    ]
+
+
+def _dispose_engines_after_fork() -> None:
+    """
+    Drops the pooled connections inherited from the parent process (e.g. a preloaded Gunicorn
+    master), without closing them, so forked processes open connections of their own.
+    """
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=False)
+    if get_replicas.cache_info().currsize:
+        for replica in get_replicas():
+            replica.engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_dispose_engines_after_fork)
+
+
+def check_replica_lag(replica: Replica) -> float:
+    """
+    Checks (and reports, in the `db_replica_lag_seconds` metric) the replica replication lag,
+    within `database_replica_check_timeout` seconds. Unavailable replicas lag infinitely.
+    """
+    timeout_ms = get_settings().database_replica_check_timeout * 1000
+    try:
+        with replica.engine.begin() as connection:
+            connection.execute(text(f"SET LOCAL statement_timeout = {timeout_ms}"))
+            lag = float(connection.execute(REPLICA_LAG_QUERY).scalar() or 0)
+    except SQLAlchemyError:
+        logger.exception(
+            "Unable to check the replication lag of database replica %s.", replica.name
+        )
+        lag = math.inf
+
+    if lag > get_settings().database_replica_max_lag:
+        logger.warning(
+            "Database replica %s is %.1fs behind the primary: not read from.", replica.name, lag
+        )
+
+    replica.lag, replica.checked = lag, monotonic()
+    DB_REPLICA_LAG.labels(replica=replica.name).set(lag)
+    return lag
 
-    return sessionmaker(autocommit=False, autoflush=True, bind=engine)
+
+class ReplicaLagMonitor:
+    """
+    Background thread checking the replication lag of every replica every `interval` seconds,
+    started and stopped with the application (by every worker process), so requests never wait
+    for it: replicas are picked by their last checked lag.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-lag-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def check(self) -> None:
+        for replica in get_replicas():
+            check_replica_lag(replica)
+
+    def _run(self) -> None:
+        delay = 0.0
+        while not self._stopped.wait(delay):
+            try:
+                self.check()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Unable to check the database replicas replication lag.")
+            delay = self.interval
+
+
+def pick_replica() -> Optional[Replica]:
+    """
+    Picks one of the replicas not lagging behind the primary database more than allowed (as last
+    checked by the `ReplicaLagMonitor`), at random.
+    """
+    max_lag = get_settings().database_replica_max_lag
+    replicas = [replica for replica in get_replicas() if replica.lag <= max_lag]
+
+    return random.choice(replicas) if replicas else None
+
+
+class RoutingSession(Session):
+    """
+    Session reading from a database replica within `replica_reads()` blocks (when replicas are
+    set up), and using the primary database for everything else. Once the session writes to the
+    primary, it reads from it too, so requests always read their own writes.
+
+    Like any session, it only checks a connection out of the pool when first used (and again after
+    every commit or rollback); `checkouts` counts them.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.replica: Optional[Replica] = None
+        self.wrote = False
+        self.checkouts = 0
+        self._replica_reads = 0
+
+    @contextmanager
+    def replica_reads(self) -> Iterator[None]:
+        self._replica_reads += 1
+        try:
+            yield
+        finally:
+            self._replica_reads -= 1
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        # pylint: disable=protected-access
+        if self._flushing or (
+            clause is not None
+            and (not isinstance(clause, Select) or clause._for_update_arg is not None)
+        ):
+            self.wrote = True
+        elif self._replica_reads and not self.wrote:
+            # The same replica is used for the whole session, for consistent reads.
+            if self.replica is None:
+                self.replica = pick_replica()
+            if self.replica is not None:
+                return self.replica.engine
+
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _count_checkout(session: RoutingSession, transaction, connection) -> None:
+    # pylint: disable=unused-argument
+    # Savepoints and subtransactions run on the connection of their root transaction.
+    if transaction.parent is None:
+        session.checkouts += 1
+
+
+@contextmanager
+def replica_reads(db: Union[Session, scoped_session]) -> Iterator[None]:
+    """Reads from a database replica within the block, if the session is a `RoutingSession`."""
+    session = db.registry() if isinstance(db, scoped_session) else db
+    if isinstance(session, RoutingSession):
+        with session.replica_reads():
+            yield
+    else:
+        yield
+
+
+@functools.lru_cache(maxsize=1)
+def db_session_factory() -> sessionmaker:
+    """Sessions factory for PostgreSQL Farm Management database."""
+    return sessionmaker(class_=RoutingSession, autocommit=False, autoflush=True, bind=get_engine())
 
 
 Base = declarative_base()
@@ -8,8 +8,10 @@ from fastapi import Header
 from pydantic import UUID4, BaseModel
 from sqlalchemy.orm import scoped_session, Session
 
-from user_management.core.database import db_session_factory
+from user_management.core.database import db_session_factory, RoutingSession
 from user_management.core.exceptions import AuthenticationError, AuthorizationError
+from user_management.core.metrics import DB_POOL_CHECKOUTS_PER_REQUEST
+from user_management.core.structured_logging import request_context
 from user_management.models import Role
 
 logger = logging.getLogger(__name__)
@@ -27,14 +29,19 @@ class User(BaseModel):
     roles: Dict[UUID4, Role]
 
 
-def get_database() -> Generator[scoped_session, None, None]:
-    session_factory = db_session_factory()
-    db_session = scoped_session(session_factory)
+def get_database() -> Generator[Session, None, None]:
+    """
+    Database session of the request. No connection is checked out of the pool until the session is
+    first used, so routes should depend on it after their authentication dependencies: rejected
+    requests, and the ones never querying the database, don't take a pool connection.
+    """
+    db_session: RoutingSession = db_session_factory()()
 
     try:
         yield db_session
     finally:
-        db_session.remove()
+        db_session.close()
+        DB_POOL_CHECKOUTS_PER_REQUEST.observe(db_session.checkouts)
 
 
 class RequestUserCheck:
@@ -72,6 +79,8 @@ class RequestUserCheck:
         the parameter `check_staff` set to `True`, it also checks that the user is an HB Staff user.
         """
         user = self.get_user(x_apigateway_api_userinfo=x_apigateway_api_userinfo)
+        if context := request_context.get():
+            context.user_uid = str(user.uid)
 
         if self.check_staff is True and not user.staff:
             raise AuthorizationError({"message": "User not authorized."})
@@ -1,6 +1,6 @@
-import inspect
 import logging
-from typing import Optional
+import traceback
+from typing import Dict, Optional
 
 from fastapi import Request, status
 from fastapi.encoders import jsonable_encoder
@@ -10,11 +10,17 @@ from starlette.exceptions import HTTPException
 from starlette.responses import JSONResponse
 from starlette.status import HTTP_400_BAD_REQUEST
 
+from user_management.core.config.settings import get_settings
+
 
 logger = logging.getLogger(__name__)
 
 
 class AppExceptionCase(Exception):
+    # Whether the exception is logged when handled, and response headers.
+    logged = True
+    headers: Optional[Dict[str, str]] = None
+
     def __init__(self, status_code: int, context: Optional[dict]):
         super().__init__()
 
@@ -71,17 +77,70 @@ class ResourceConflictError(AppExceptionCase):
         AppExceptionCase.__init__(self, status_code, context)
 
 
-def caller_info() -> str:
-    info = inspect.getframeinfo(inspect.stack()[2][0])
-    return f"{info.filename}:{info.function}:{info.lineno}"
+class TooManyRequestsError(AppExceptionCase):
+    # Rejections are counted in the `rate_limited_requests_total` metric instead, so bursts of
+    # requests don't flood the logs.
+    logged = False
+
+    def __init__(self, context: Optional[dict] = None, retry_after: int = 1):
+        """The user has sent too many requests, and should retry after `retry_after` seconds."""
+        status_code = status.HTTP_429_TOO_MANY_REQUESTS
+        AppExceptionCase.__init__(self, status_code, context)
+        self.headers = {"Retry-After": str(retry_after)}
+
+
+class ServiceUnavailableError(AppExceptionCase):
+    # Counted in the `remote_call_rejections_total` metric instead, as there may be many while a
+    # remote service is failing.
+    logged = False
+
+    def __init__(self, context: Optional[dict] = None, retry_after: Optional[int] = None):
+        """A remote service needed is failing or overloaded: the request was rejected right away."""
+        status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        AppExceptionCase.__init__(self, status_code, context)
+        if retry_after is not None:
+            self.headers = {"Retry-After": str(retry_after)}
+
+
+class DeadlineExceededError(AppExceptionCase):
+    def __init__(self, context: Optional[dict] = None):
+        """The request ran out of time waiting for (or before calling) a remote service."""
+        status_code = status.HTTP_504_GATEWAY_TIMEOUT
+        AppExceptionCase.__init__(self, status_code, context)
+
+
+def caller_info(exc: BaseException) -> str:
+    """
+    Returns where the given exception was raised from, as `<file>:<function>:<line>`, from the
+    traceback the exception carries since it was raised. No source files are read, and no other
+    frames than those the exception went through are inspected, so it's cheap enough to be used
+    for every handled exception.
+
+    The `EXCEPTION_CONTEXT` setting controls the level of detail: `none`, `origin` (just the frame
+    that raised the exception) or `full` (every frame the exception went through).
+    """
+    detail = get_settings().exception_context
+    if detail == "none" or exc.__traceback__ is None:
+        return ""
+
+    frames = [
+        f"{frame.f_code.co_filename}:{frame.f_code.co_name}:{lineno}"
+        for frame, lineno in traceback.walk_tb(exc.__traceback__)
+    ]
+    return frames[-1] if detail == "origin" else " > ".join(frames)
 
 
 # pylint: disable=unused-argument
 async def app_exception_handler(request: Request, exc: AppExceptionCase):
-    logger.error("%s | caller=%s", exc, caller_info())
+    if exc.logged:
+        if caller := caller_info(exc):
+            logger.error("%s | caller=%s", exc, caller)
+        else:
+            logger.error("%s", exc)
     return JSONResponse(
         status_code=exc.status_code,
         content={"app_exception": exc.exception_case, "context": exc.context},
+        headers=exc.headers or {},
     )
 
 
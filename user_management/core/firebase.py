@@ -1,28 +1,44 @@
 import json
 import logging
+import os
 from functools import cache
-from typing import Optional
-
-from firebase_admin import App, initialize_app
-from firebase_admin.credentials import Certificate
+from types import ModuleType
+from typing import Optional, TYPE_CHECKING
 
 from user_management.core.config.settings import get_settings
 
 
+if TYPE_CHECKING:
+    from firebase_admin import App
+
+
 logger = logging.getLogger(__name__)
 
+# Environment variable the Firebase Admin SDK reads the Auth emulator address from.
+EMULATOR_HOST_ENV = "FIREBASE_AUTH_EMULATOR_HOST"
+
 
 @cache
-def init_identity_platform_app() -> Optional[App]:
+def init_identity_platform_app() -> Optional["App"]:
     """
     Cached function to initialize GCP Identity Platform / Firebase app.
 
     If an environment variable `GCP_CREDENTIALS` is set, the app will be initialized using those
     credentials. Otherwise, it will use Google Application Default Credentials as per the Firebase
-    SDK implementation.
+    SDK implementation. With `GCP_AUTH_EMULATOR_HOST` set, the app calls that emulator instead,
+    with no credentials, for the `GOOGLE_PROJECT_ID` project.
     """
+    # pylint: disable=import-outside-toplevel
+    from firebase_admin import initialize_app
+    from firebase_admin.credentials import Certificate
+
     settings = get_settings()
     gcp_credentials = None
+    options: dict = {"httpTimeout": settings.gcp_request_timeout}
+
+    if settings.gcp_auth_emulator_host:
+        os.environ[EMULATOR_HOST_ENV] = settings.gcp_auth_emulator_host
+        options["projectId"] = settings.google_project_id
 
     if settings.gcp_credentials:
         try:
@@ -32,9 +48,7 @@ def init_identity_platform_app() -> Optional[App]:
             return None
 
     try:
-        app = initialize_app(
-            credential=gcp_credentials, options={"httpTimeout": settings.gcp_request_timeout}
-        )
+        app = initialize_app(credential=gcp_credentials, options=options)
     except Exception:  # pylint: disable=broad-except
         logger.exception("GCP Identity Platform NOT connected: unable to initialize app.")
         return None
@@ -42,3 +56,33 @@ def init_identity_platform_app() -> Optional[App]:
     logger.info("GCP Identity Platform / Firebase app initialized.")
 
     return app
+
+
+def get_firebase_auth() -> ModuleType:
+    """
+    Firebase SDK `firebase_admin.auth` module, with the GCP Identity Platform / Firebase app
+    initialized. The Firebase SDK (and the Google libraries it uses) takes long to import, so it's
+    only imported when GCP Identity Platform is first used, rather than when workers start.
+    """
+    from firebase_admin import auth  # pylint: disable=import-outside-toplevel
+
+    init_identity_platform_app()
+    return auth
+
+
+def reset_identity_platform_app() -> None:
+    """
+    Forgets the GCP Identity Platform / Firebase app, so a new one is initialized when first used
+    (e.g. after the settings changed). Forked processes forget the app inherited from the parent
+    process (e.g. a preloaded Gunicorn master), as its HTTP connections can't be shared.
+    """
+    if init_identity_platform_app.cache_info().currsize:
+        app = init_identity_platform_app()
+        init_identity_platform_app.cache_clear()
+        if app:
+            from firebase_admin import delete_app  # pylint: disable=import-outside-toplevel
+
+            delete_app(app)
+
+
+os.register_at_fork(after_in_child=reset_identity_platform_app)
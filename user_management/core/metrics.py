@@ -0,0 +1,228 @@
+import os
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator
+
+from opentelemetry.trace import SpanKind
+from prometheus_client import (
+    CollectorRegistry,
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    generate_latest,
+    Histogram,
+    multiprocess,
+    REGISTRY,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from user_management.core.exceptions import AppExceptionCase
+from user_management.core.routing import route_path
+from user_management.core.tracing import start_span
+
+
+# Metrics are aggregated across Gunicorn worker processes when the `PROMETHEUS_MULTIPROC_DIR`
+# environment variable is set. Gauges are then added up for all the live processes.
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP requests latency, by route.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being currently served, by route.",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Database connections currently checked out from the pool.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Database connections currently open beyond the pool size.",
+    multiprocess_mode="livesum",
+)
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Replication lag of the database read replicas, as last checked (+Inf when unavailable).",
+    ["replica"],
+    multiprocess_mode="livemax",
+)
+DB_CONNECTIONS_OPENED = Counter(
+    "db_connections_opened_total",
+    "Database connections opened, by the pools or (when not pooled) for every transaction.",
+)
+DB_POOL_CHECKOUTS_PER_REQUEST = Histogram(
+    "db_pool_checkouts_per_request",
+    "Database connections checked out from the pools while serving a request.",
+    buckets=(0, 1, 2, 3, 5, 10),
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to get a database connection from the pool.",
+)
+REMOTE_CALL_LATENCY = Histogram(
+    "remote_call_duration_seconds",
+    "Latency of calls to remote services, by operation.",
+    ["operation"],
+)
+REMOTE_CALL_ERRORS = Counter(
+    "remote_call_errors_total",
+    "Failed calls to remote services, by operation.",
+    ["operation"],
+)
+RATE_LIMITED_REQUESTS = Counter(
+    "rate_limited_requests_total",
+    "Requests rejected by the rate limits (429 responses), by limit.",
+    ["limit"],
+)
+SECURITY_TOKENS_PURGED = Counter(
+    "security_tokens_purged_total",
+    "Expired security tokens deleted by the purges.",
+)
+SECURITY_TOKEN_PURGE_BATCH = Histogram(
+    "security_token_purge_batch_duration_seconds",
+    "Time spent deleting every batch of expired security tokens.",
+)
+REMOTE_CALL_REJECTIONS = Counter(
+    "remote_call_rejections_total",
+    "Calls to remote services not made, failed fast, by operation and reason (`circuit_open`, "
+    "`concurrency_limit` or `deadline`).",
+    ["operation", "reason"],
+)
+CIRCUIT_BREAKER_STATE = Gauge(
+    "circuit_breaker_state",
+    "State of the remote services operations circuit breakers: 0 closed, 1 open, 2 half-open.",
+    ["operation"],
+    multiprocess_mode="livemax",
+)
+REMOTE_CONCURRENCY_LIMIT = Gauge(
+    "remote_call_concurrency_limit",
+    "Concurrent calls to remote services allowed (adaptive limit), by service.",
+    ["service"],
+    multiprocess_mode="livesum",
+)
+REMOTE_CALLS_IN_FLIGHT = Gauge(
+    "remote_calls_in_flight",
+    "Calls to remote services currently waiting for a response, by service.",
+    ["service"],
+    multiprocess_mode="livesum",
+)
+REMOTE_CALLS_COALESCED = Counter(
+    "remote_calls_coalesced_total",
+    "Calls to remote services not made, sharing the result of an identical call in flight, by "
+    "operation.",
+    ["operation"],
+)
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the logging queue was full.",
+)
+
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware recording requests latency and requests in progress for every route. Routes
+    are labelled with their path template (e.g. `/api/v1/users/{uid}`), to keep the labels
+    cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method, route = scope["method"], route_path(scope)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method, route=route)
+        in_progress.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.labels(method=method, route=route, status=status_code).observe(
+                perf_counter() - start
+            )
+            in_progress.dec()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """SQLAlchemy `QueuePool` recording the time spent waiting for connections."""
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(perf_counter() - start)
+
+
+def instrument_pool(engine: Engine) -> None:
+    """
+    Counts the database connections opened, and keeps the connection pool gauges updated on every
+    connection checkout and checkin (unless connections aren't pooled, e.g. behind PgBouncer).
+    """
+
+    def count_connection(*args) -> None:  # pylint: disable=unused-argument
+        DB_CONNECTIONS_OPENED.inc()
+
+    event.listen(engine, "connect", count_connection)
+    if not isinstance(engine.pool, QueuePool):
+        return
+
+    def update_pool_gauges(*args) -> None:  # pylint: disable=unused-argument
+        DB_POOL_CHECKED_OUT.set(engine.pool.checkedout())  # type: ignore
+        DB_POOL_OVERFLOW.set(max(engine.pool.overflow(), 0))  # type: ignore
+
+    event.listen(engine, "checkout", update_pool_gauges)
+    event.listen(engine, "checkin", update_pool_gauges)
+
+
+@contextmanager
+def remote_call(operation: str) -> Iterator[None]:
+    """
+    Context manager to measure and trace calls to remote services (GCP Identity Platform,
+    Pub/Sub...). Any exception raised within the context counts as an error, except application
+    exceptions that don't represent a server error (like an `AuthenticationError` for wrong user
+    credentials).
+    """
+    start = perf_counter()
+    with start_span(operation, kind=SpanKind.CLIENT):
+        try:
+            yield
+        except AppExceptionCase as error:
+            if error.status_code >= 500:
+                REMOTE_CALL_ERRORS.labels(operation=operation).inc()
+            raise
+        except Exception:
+            REMOTE_CALL_ERRORS.labels(operation=operation).inc()
+            raise
+        finally:
+            REMOTE_CALL_LATENCY.labels(operation=operation).observe(perf_counter() - start)
+
+
+def metrics_endpoint(request: Request) -> Response:  # pylint: disable=unused-argument
+    """Exposes the metrics in Prometheus text format."""
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
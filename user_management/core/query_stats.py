@@ -0,0 +1,157 @@
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Optional
+
+from psycopg2.extensions import TRANSACTION_STATUS_INTRANS
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from user_management.core.config.settings import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Query-Time-Ms"
+
+
+@dataclass
+class QueryStats:
+    """Database queries issued while serving a single request."""
+
+    count: int = 0
+    duration: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+
+request_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+
+
+# Statements PostgreSQL can show the query plan of.
+EXPLAINABLE_STATEMENT = re.compile(r"\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+
+
+def explain(connection, statement: str, parameters) -> str:
+    """Returns the query plan of the given statement. A separate DBAPI cursor is used, within a
+    savepoint, so neither the results nor the transaction of the original statement are affected.
+    Statements that can't be explained, or run outside a transaction (e.g. on `AUTOCOMMIT`
+    connections, where savepoints can't be used), are not. Errors are returned, never raised.
+    """
+    if not EXPLAINABLE_STATEMENT.match(statement):
+        return "Unavailable: statement not explainable."
+
+    try:
+        dbapi_connection = connection.connection
+        if dbapi_connection.get_transaction_status() != TRANSACTION_STATUS_INTRANS:
+            return "Unavailable: not in a transaction."
+
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute("SAVEPOINT explain_slow_query")
+            try:
+                cursor.execute(f"EXPLAIN {statement}", parameters)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            except Exception:
+                cursor.execute("ROLLBACK TO SAVEPOINT explain_slow_query")
+                raise
+            cursor.execute("RELEASE SAVEPOINT explain_slow_query")
+            return plan
+    except Exception as error:  # pylint: disable=broad-except
+        return f"Unavailable: {error}"
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # pylint: disable=unused-argument,too-many-arguments
+    conn.info.setdefault("query_start_time", []).append(perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # pylint: disable=unused-argument,too-many-arguments
+    duration = perf_counter() - conn.info["query_start_time"].pop()
+
+    if stats := request_query_stats.get():
+        stats.record(statement, duration)
+
+    settings = get_settings()
+    if duration * 1000 >= settings.slow_query_threshold_ms:
+        logger.warning(
+            "Slow query (%.1f ms): %s\nParameters: %s\nQuery plan:\n%s",
+            duration * 1000,
+            statement,
+            parameters,
+            explain(conn, statement, parameters) if not executemany else "Unavailable",
+        )
+
+
+def handle_error(exception_context) -> None:
+    # Failed statements never get to `after_cursor_execute`: their start time is dropped here, so
+    # it isn't left behind on the (pooled) connection.
+    connection = exception_context.connection
+    if connection is not None and (start_times := connection.info.get("query_start_time")):
+        start_times.pop()
+
+
+def instrument_queries(engine: Engine) -> None:
+    """Records every query run by the engine in the current request `QueryStats`, and logs slow
+    queries along with their query plan.
+    """
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware collecting the database queries issued by every request. In debug mode, the
+    number of queries and the total time spent on them are returned in the response headers.
+
+    Requests that run the same `SELECT` statement many times are logged as potential N+1 query
+    problems (e.g. lazy loading a relationship for every row of a list).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        stats = QueryStats()
+        token = request_query_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.debug:
+                headers = MutableHeaders(scope=message)
+                headers.append(QUERY_COUNT_HEADER, str(stats.count))
+                headers.append(QUERY_TIME_HEADER, f"{stats.duration * 1000:.2f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_query_stats.reset(token)
+            for statement, count in stats.statements.items():
+                if count >= settings.n_plus_one_threshold and statement.lstrip().startswith(
+                    "SELECT"
+                ):
+                    logger.warning(
+                        "Potential N+1 queries in %s %s, statement run %d times: %s",
+                        scope["method"],
+                        scope["path"],
+                        count,
+                        statement,
+                    )
@@ -0,0 +1,195 @@
+import functools
+import logging
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from time import monotonic
+from typing import Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import delete, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+
+from user_management.core.config.settings import get_settings
+from user_management.core.database import get_engine
+from user_management.core.exceptions import TooManyRequestsError
+from user_management.core.metrics import RATE_LIMITED_REQUESTS
+from user_management.models import RateLimitBucket
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Bucket:
+    tokens: float
+    updated: float
+
+
+class TokenBuckets:
+    """
+    In-memory token buckets, one for every key, holding up to `burst` tokens and refilled at `rate`
+    tokens per second. Keys are spread over `shards` dictionaries, each one with its own lock, so
+    concurrent requests for different keys rarely wait for each other. Every shard keeps
+    `max_keys / shards` buckets at most, dropping the least recently used ones beyond that (a
+    dropped bucket starts full again).
+    """
+
+    def __init__(self, rate: float, burst: int, shards: int = 16, max_keys: int = 100_000):
+        self.rate = rate
+        self.burst = burst
+        self._max_shard_keys = max(max_keys // shards, 1)
+        self._shards: List["OrderedDict[str, Bucket]"] = [OrderedDict() for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    def take(self, key: str) -> float:
+        """Takes a token from the key bucket. Returns 0 if taken, or the seconds to wait otherwise."""
+        index = hash(key) % len(self._shards)
+        shard = self._shards[index]
+        now = monotonic()
+        with self._locks[index]:
+            if (bucket := shard.get(key)) is None:
+                bucket = shard[key] = Bucket(tokens=self.burst, updated=now)
+                if len(shard) > self._max_shard_keys:
+                    shard.popitem(last=False)
+            else:
+                shard.move_to_end(key)
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+
+            if bucket.tokens < 1:
+                return (1 - bucket.tokens) / self.rate
+            bucket.tokens -= 1
+            return 0
+
+    def drain(self, key: str) -> None:
+        """Empties the key bucket (e.g. when the shared bucket of the key is empty)."""
+        index = hash(key) % len(self._shards)
+        with self._locks[index]:
+            if (bucket := self._shards[index].get(key)) is not None:
+                bucket.tokens, bucket.updated = 0, monotonic()
+
+    def clear(self) -> None:
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                shard.clear()
+
+
+class SharedTokenBuckets:
+    """
+    Token buckets shared by all the worker processes (and service instances), stored in the
+    `rate_limit_bucket` table. Every token is taken with a single statement (an upsert refilling the
+    bucket, only updating it when there is a token to take). Buckets not used for long enough to be
+    full again are deleted every `cleanup_interval` seconds, as they are the same as no bucket.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, cleanup_interval: float = 60.0):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.cleanup_interval = cleanup_interval
+        self._cleaned = monotonic()
+
+    def take(self, key: str) -> float:
+        """Takes a token from the key bucket. Returns 0 if taken, or the seconds to wait otherwise."""
+        bucket = RateLimitBucket.__table__
+        now = func.clock_timestamp()
+        refilled = func.least(
+            self.burst, bucket.c.tokens + func.extract("epoch", now - bucket.c.updated) * self.rate
+        )
+        statement = (
+            insert(bucket)
+            .values(key=f"{self.name}:{key}", tokens=literal(self.burst - 1.0), updated=now)
+            .on_conflict_do_update(
+                index_elements=[bucket.c.key],
+                set_={"tokens": refilled - 1, "updated": now},
+                where=refilled >= 1,
+            )
+            .returning(bucket.c.tokens)
+        )
+        with get_engine().begin() as connection:
+            taken = connection.execute(statement).first() is not None
+            if monotonic() - self._cleaned > self.cleanup_interval:
+                self._cleaned = monotonic()
+                full_after = timedelta(seconds=self.burst / self.rate)
+                connection.execute(
+                    delete(bucket).where(
+                        bucket.c.key.startswith(f"{self.name}:"),
+                        bucket.c.updated < now - full_after,
+                    )
+                )
+
+        return 0 if taken else 1 / self.rate
+
+
+class RateLimiter:
+    """
+    Rate limiter of the requests sharing a key (e.g. a client IP address), with in-memory token
+    buckets, and the shared ones too, when set up. Shared buckets are only checked once the request
+    got a token in memory, so rejected requests never reach the database: the in-memory bucket of
+    the key is emptied when its shared bucket is, and shared buckets errors let requests through.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, shared: bool = False):
+        self.name = name
+        self.local = TokenBuckets(rate=rate, burst=burst)
+        self.shared = SharedTokenBuckets(name=name, rate=rate, burst=burst) if shared else None
+
+    def _reject(self, retry_after: float) -> TooManyRequestsError:
+        RATE_LIMITED_REQUESTS.labels(limit=self.name).inc()
+        return TooManyRequestsError(
+            context={"message": "Too many requests."}, retry_after=math.ceil(retry_after)
+        )
+
+    async def check(self, key: str) -> None:
+        """Raises a `TooManyRequestsError` when the key has run out of requests."""
+        if retry_after := self.local.take(key):
+            raise self._reject(retry_after)
+
+        if self.shared is not None:
+            try:
+                retry_after = await run_in_threadpool(self.shared.take, key)
+            except SQLAlchemyError:
+                logger.exception("Unable to check the %s shared rate limit.", self.name)
+                return
+            if retry_after:
+                self.local.drain(key)
+                raise self._reject(retry_after)
+
+
+@functools.lru_cache(maxsize=1)
+def get_rate_limiters() -> Dict[str, RateLimiter]:
+    """Rate limiters by client IP address (`ip`), user email (`email`) and endpoint (`endpoint`)."""
+    settings = get_settings()
+    return {
+        name: RateLimiter(
+            name=name,
+            rate=getattr(settings, f"rate_limit_{name}_rate"),
+            burst=getattr(settings, f"rate_limit_{name}_burst"),
+            shared=settings.rate_limit_shared,
+        )
+        for name in ("ip", "email", "endpoint")
+    }
+
+
+async def rate_limit(scope: str, request: Request, email: Optional[str] = None) -> None:
+    """
+    Rate limits the requests to the `scope` endpoint, by client IP address (as given by Uvicorn,
+    from the `X-Forwarded-For` header of trusted proxies, with `rate_limit_ip_enabled`), by user
+    email (if any), and for the whole endpoint, in that order, so requests rejected by the first limits don't count for the others.
+    Endpoints should call it before doing anything else (it raises `TooManyRequestsError`).
+    """
+    settings = get_settings()
+    if not settings.rate_limit_enabled:
+        return
+
+    limiters = get_rate_limiters()
+    if settings.rate_limit_ip_enabled and request.client is not None:
+        await limiters["ip"].check(request.client.host)
+    if email is not None:
+        await limiters["email"].check(f"{scope}:{email.lower()}")
+    await limiters["endpoint"].check(scope)
@@ -0,0 +1,259 @@
+import asyncio
+import functools
+import math
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from time import monotonic, perf_counter
+from typing import Iterator, Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from user_management.core.config.settings import get_settings
+from user_management.core.exceptions import (
+    AppExceptionCase,
+    DeadlineExceededError,
+    ServiceUnavailableError,
+)
+from user_management.core.metrics import (
+    CIRCUIT_BREAKER_STATE,
+    remote_call,
+    REMOTE_CALL_REJECTIONS,
+    REMOTE_CALLS_IN_FLIGHT,
+    REMOTE_CONCURRENCY_LIMIT,
+)
+
+
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+# Monotonic time the request being served must be answered by.
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware setting the deadline of every request: `request_timeout` seconds from now, or
+    the (shorter) timeout given by the caller in the `X-Request-Timeout-Ms` header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timeout = get_settings().request_timeout
+        try:
+            timeout = min(timeout, float(Headers(scope=scope)[DEADLINE_HEADER]) / 1000)
+        except (KeyError, ValueError):
+            pass
+
+        token = request_deadline.set(monotonic() + timeout)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_deadline.reset(token)
+
+
+class CircuitState(IntEnum):
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of a remote operation. It opens after `failure_threshold` failures in a row,
+    failing calls fast for `reset_timeout` seconds. Then it's half-open: a single trial call is let
+    through, closing it if it succeeds, or opening it again otherwise.
+    """
+
+    def __init__(self, operation: str, failure_threshold: int, reset_timeout: float):
+        self.operation = operation
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened = -math.inf
+        self._trial = False
+        self._lock = threading.Lock()
+        CIRCUIT_BREAKER_STATE.labels(operation=operation).set(self.state)
+
+    def _set_state(self, state: CircuitState) -> None:
+        self.state = state
+        CIRCUIT_BREAKER_STATE.labels(operation=self.operation).set(state)
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds before the breaker lets a trial call through."""
+        return max(self.opened + self.reset_timeout - monotonic(), 0)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CircuitState.OPEN and not self.retry_after:
+                self._set_state(CircuitState.HALF_OPEN)
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record(self, success: Optional[bool]) -> None:
+        """Records the call outcome (none if it didn't complete, e.g. it was cancelled)."""
+        with self._lock:
+            self._trial = False
+            if success is None:
+                return
+            if success:
+                self.failures = 0
+                if self.state != CircuitState.CLOSED:
+                    self._set_state(CircuitState.CLOSED)
+                return
+
+            self.failures += 1
+            if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened = monotonic()
+                self._set_state(CircuitState.OPEN)
+
+
+class AIMDLimit:
+    """
+    Adaptive (additive increase, multiplicative decrease) limit of the concurrent calls to a remote
+    service. Every successful call grows the limit by `1 / limit` (about one more call per round of
+    calls), and every failed or slow one (taking over `latency_threshold` seconds) halves it, so
+    calls back off as soon as the service struggles, and ramp up again slowly. Calls beyond the
+    limit are rejected right away, rather than queued.
+    """
+
+    def __init__(
+        self, service: str, initial: int, minimum: int, maximum: int, latency_threshold: float
+    ):
+        self.service = service
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_threshold = latency_threshold
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        REMOTE_CONCURRENCY_LIMIT.labels(service=service).set(self.limit)
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+        REMOTE_CALLS_IN_FLIGHT.labels(service=self.service).inc()
+        return True
+
+    def release(self, success: Optional[bool] = None, latency: float = 0.0) -> None:
+        """Releases a call slot, adjusting the limit to the call outcome (none if not made)."""
+        with self._lock:
+            self.in_flight -= 1
+            if success is not None:
+                if success and latency <= self.latency_threshold:
+                    self.limit = min(self.limit + 1 / self.limit, self.maximum)
+                else:
+                    self.limit = max(self.limit / 2, self.minimum)
+            limit = self.limit
+        REMOTE_CALLS_IN_FLIGHT.labels(service=self.service).dec()
+        REMOTE_CONCURRENCY_LIMIT.labels(service=self.service).set(limit)
+
+
+@functools.lru_cache(maxsize=None)
+def get_circuit_breaker(operation: str) -> CircuitBreaker:
+    settings = get_settings()
+    return CircuitBreaker(
+        operation=operation,
+        failure_threshold=settings.gcp_breaker_failure_threshold,
+        reset_timeout=settings.gcp_breaker_reset_timeout,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_concurrency_limit(service: str) -> AIMDLimit:
+    settings = get_settings()
+    return AIMDLimit(
+        service=service,
+        initial=settings.gcp_concurrency_initial,
+        minimum=settings.gcp_concurrency_min,
+        maximum=settings.gcp_concurrency_max,
+        latency_threshold=settings.gcp_concurrency_latency_threshold,
+    )
+
+
+def is_remote_failure(error: BaseException) -> bool:
+    """
+    Whether the error means the remote service failed (timeouts, connection or server errors), as
+    opposed to rejecting the call itself (e.g. wrong credentials, or an email already taken).
+    """
+    if isinstance(error, AppExceptionCase):
+        return error.status_code >= 500
+    if isinstance(error, ValueError):
+        # Invalid arguments, rejected by the SDK before calling the service.
+        return False
+    # Firebase SDK errors carry the HTTP response, if the service answered.
+    if (response := getattr(error, "http_response", None)) is not None:
+        return response.status_code >= 500
+    return True
+
+
+def remaining_timeout(operation: str) -> float:
+    """
+    Seconds a remote call can take: `gcp_request_timeout`, or the time left before the request
+    deadline, if shorter. Raises `DeadlineExceededError` when there is no time left.
+    """
+    timeout: float = get_settings().gcp_request_timeout
+    if (deadline := request_deadline.get()) is not None:
+        if (remaining := deadline - monotonic()) <= 0:
+            REMOTE_CALL_REJECTIONS.labels(operation=operation, reason="deadline").inc()
+            raise DeadlineExceededError(context={"message": "Request deadline exceeded."})
+        timeout = min(timeout, remaining)
+
+    return timeout
+
+
+@contextmanager
+def protected_call(operation: str) -> Iterator[float]:
+    """
+    Context manager wrapping calls to remote services like `remote_call`, and failing them fast
+    (with a `ServiceUnavailableError`) when the operation circuit breaker is open or the service
+    has as many calls in flight as its concurrency limit allows, and with a
+    `DeadlineExceededError` when the request has run out of time. It gives the seconds the call
+    can take, to be used as its timeout. Services are named by the operation prefix (e.g.
+    `identitytoolkit` for `identitytoolkit.refresh_token`).
+    """
+    timeout = remaining_timeout(operation)
+    limit = get_concurrency_limit(operation.split(".")[0])
+    if not limit.acquire():
+        REMOTE_CALL_REJECTIONS.labels(operation=operation, reason="concurrency_limit").inc()
+        raise ServiceUnavailableError(context={"message": "Service overloaded."}, retry_after=1)
+
+    breaker = get_circuit_breaker(operation)
+    if not breaker.allow():
+        limit.release()
+        REMOTE_CALL_REJECTIONS.labels(operation=operation, reason="circuit_open").inc()
+        raise ServiceUnavailableError(
+            context={"message": "Service unavailable."},
+            retry_after=math.ceil(breaker.retry_after) or 1,
+        )
+
+    start = perf_counter()
+    success: Optional[bool] = None
+    try:
+        with remote_call(operation):
+            yield timeout
+        success = True
+    except (asyncio.TimeoutError, TimeoutError) as error:
+        success = False
+        raise DeadlineExceededError(context={"message": "Service timed out."}) from error
+    except Exception as error:
+        success = not is_remote_failure(error)
+        raise
+    finally:
+        breaker.record(success)
+        limit.release(success=success, latency=perf_counter() - start)
@@ -0,0 +1,85 @@
+import asyncio
+import copy
+import functools
+from typing import Any, Callable, Coroutine
+
+import orjson
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+from user_management.core.config.settings import get_settings
+
+
+def _default(value: Any) -> Any:
+    """`orjson` fallback for the types it can't serialize natively."""
+    if isinstance(value, BaseModel):
+        # Pydantic models built by repositories are already validated, so their fields can be
+        # handed over to `orjson` as they are, without copying or re-validating them.
+        return value.__dict__
+
+    raise TypeError(f"Type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with `orjson`, able to serialize Pydantic models directly."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default)
+
+
+class FastJSONRoute(APIRoute):
+    """
+    API route that serializes the endpoint results straight away with `FastJSONResponse`, instead
+    of validating them again against the `response_model` and encoding them with `json`. The
+    `response_model` is still used to document the route in the OpenAPI schema.
+
+    Endpoints are expected to return instances of the declared `response_model`, as our services
+    do. The fast path can be switched off with the `FAST_JSON_RESPONSES` setting.
+    """
+
+    def _render(self, content: Any) -> Response:
+        if isinstance(content, Response):
+            return content
+
+        return FastJSONResponse(content=content, status_code=self.status_code or 200)
+
+    def _fast_json_endpoint(self, call: Callable[..., Any]) -> Callable[..., Any]:
+        if asyncio.iscoroutinefunction(call):
+
+            @functools.wraps(call)
+            async def async_endpoint(**kwargs: Any) -> Response:
+                return self._render(await call(**kwargs))
+
+            return async_endpoint
+
+        @functools.wraps(call)
+        def endpoint(**kwargs: Any) -> Response:
+            return self._render(call(**kwargs))
+
+        return endpoint
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        default_handler = super().get_route_handler()
+        if self.response_field is None:
+            return default_handler
+
+        # Build the request handler from a copy of the dependant with the wrapped endpoint, so the
+        # original one is still used for the OpenAPI schema generation.
+        dependant = self.dependant
+        self.dependant = copy.copy(dependant)
+        self.dependant.call = self._fast_json_endpoint(self.endpoint)
+        try:
+            fast_handler = super().get_route_handler()
+        finally:
+            self.dependant = dependant
+
+        # Routes are set up when their module is imported, so the setting is only read when
+        # serving requests.
+        async def handler(request: Request) -> Response:
+            if get_settings().fast_json_responses:
+                return await fast_handler(request)
+            return await default_handler(request)
+
+        return handler
@@ -0,0 +1,17 @@
+from starlette.routing import Match
+from starlette.types import Scope
+
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_path(scope: Scope) -> str:
+    """Returns the path template of the route matching the request (e.g. `/api/v1/users/{uid}`),
+    to identify routes in metrics, logs and traces with bounded cardinality.
+    """
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+
+    return UNMATCHED_ROUTE
@@ -1,8 +1,18 @@
-from passlib.hash import bcrypt
-from passlib.utils import bcrypt64
+import functools
+from typing import Type, TYPE_CHECKING
 
 from user_management.core.config.settings import get_settings
 
-pwd_context = bcrypt.using(
-    salt=bcrypt64.repair_unused(get_settings().encrypt_salt.get_secret_value())
-)
+
+if TYPE_CHECKING:
+    from passlib.handlers.bcrypt import bcrypt as BcryptHasher
+
+
+@functools.cache
+def get_pwd_context() -> Type["BcryptHasher"]:
+    """API tokens hasher. Built (and `passlib` imported) when API tokens are first hashed."""
+    # pylint: disable=import-outside-toplevel
+    from passlib.hash import bcrypt
+    from passlib.utils import bcrypt64
+
+    return bcrypt.using(salt=bcrypt64.repair_unused(get_settings().encrypt_salt.get_secret_value()))
@@ -0,0 +1,40 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+from user_management.core.metrics import REMOTE_CALLS_COALESCED
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls (sharing a key) within a worker process: the first caller
+    makes the call, and the ones arriving while it's in flight wait for it, getting its result (or
+    its error) too. Calls are only tracked while in flight, so nothing is kept once they're done.
+
+    The call runs in a task of its own (with the context of the first caller, e.g. its request
+    deadline), so callers going away (e.g. cancelled on client disconnection) don't cancel it for
+    the others.
+    """
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self._calls: Dict[str, "asyncio.Task"] = {}
+
+    def _done(self, key: str, task: "asyncio.Task") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Retrieved, in case every caller went away.
+            task.exception()
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Returns the result of `call`, or of the identical call already in flight for `key`."""
+        if (task := self._calls.get(key)) is not None:
+            REMOTE_CALLS_COALESCED.labels(operation=self.operation).inc()
+        else:
+            task = self._calls[key] = asyncio.ensure_future(call())
+            task.add_done_callback(lambda done: self._done(key, done))
+
+        return await asyncio.shield(task)
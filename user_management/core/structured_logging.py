@@ -0,0 +1,200 @@
+import copy
+import logging
+import os
+import queue
+import sys
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from time import perf_counter
+from typing import Optional
+
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from user_management.core.config.settings import get_settings
+from user_management.core.metrics import LOG_RECORDS_DROPPED
+from user_management.core.routing import route_path
+
+
+access_logger = logging.getLogger("user_management.access")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Log record attributes added by `RequestContextFilter` and the access log, in output order.
+CONTEXT_FIELDS = ("request_id", "route", "user_uid", "latency_ms")
+ACCESS_FIELDS = ("method", "path", "status")
+
+
+@dataclass
+class RequestContext:
+    """Request being served, for log records to carry. Mutable, so the user found out by request
+    dependencies running in the threadpool is seen by the access log too.
+    """
+
+    request_id: str
+    route: str
+    user_uid: Optional[str] = None
+    start: float = field(default_factory=perf_counter)
+
+    @property
+    def latency_ms(self) -> float:
+        return round((perf_counter() - self.start) * 1000, 2)
+
+
+request_context: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+class RequestContextFilter(logging.Filter):
+    """Adds the current request context to log records, in the thread logging them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = request_context.get()
+        for name in CONTEXT_FIELDS:
+            if not hasattr(record, name):
+                setattr(record, name, getattr(context, name) if context else None)
+
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats log records as JSON lines, including the request context and access fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "location": f"{record.module}:{record.funcName}:{record.lineno}",
+            "message": record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS + ACCESS_FIELDS:
+            if (value := getattr(record, name, None)) is not None:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+
+        return orjson.dumps(entry).decode()
+
+
+class _QueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Wait for the listener thread to make room for the sentinel, rather than failing, when the
+        # queue is full.
+        self.queue.put(self._sentinel)  # type: ignore
+
+    def stop(self) -> None:
+        if self._thread is not None:  # type: ignore
+            super().stop()
+
+
+class QueueJSONHandler(QueueHandler):
+    """
+    Logging handler that never blocks the caller: records get the request context attached and
+    are put in a bounded queue, then formatted as JSON and written to `stream` (stdout by default)
+    by a background thread. Records are dropped, and counted as so, when the queue is full (e.g. when the stream
+    backs up under load).
+    """
+
+    def __init__(self, queue_size: int = 10000, stream=None):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.addFilter(RequestContextFilter())
+
+        self._formatter = JSONFormatter()
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.target.setFormatter(self._formatter)
+        self.listener = _QueueListener(self.queue, self.target)
+        self.listener.start()
+
+        # Threads don't survive `fork()`, so forked processes (e.g. preloaded Gunicorn workers) need
+        # a listener of their own.
+        os.register_at_fork(after_in_child=self._restart_listener)
+
+    def _restart_listener(self) -> None:
+        if self.listener._thread is None:  # type: ignore  # pylint: disable=protected-access
+            return  # Closed handler.
+
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)  # type: ignore
+        self.listener = _QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Copies the record to be formatted by the listener thread. Only its traceback is rendered
+        right away (it refers to frames that won't last), and kept apart from the message.
+        """
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = self._formatter.formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+    def close(self) -> None:
+        # Called on `logging.shutdown()` at exit too, so queued records are written before exiting.
+        self.listener.stop()
+        super().close()
+
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware setting the `RequestContext` of every request, identified by the incoming
+    `X-Request-ID` header or a new ID, which is returned in the response headers too.
+
+    With the `STRUCTURED_LOGGING` setting enabled, it also replaces Gunicorn/Uvicorn access logs:
+    every request is logged once served, with its context, status and latency.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        context = RequestContext(request_id=request_id, route=route_path(scope))
+        token = request_context.set(context)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if get_settings().structured_logging:
+                access_logger.info(
+                    '"%s %s" %s',
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    extra={
+                        "request_id": context.request_id,
+                        "route": context.route,
+                        "user_uid": context.user_uid,
+                        "latency_ms": context.latency_ms,
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                    },
+                )
+            request_context.reset(token)
@@ -0,0 +1,237 @@
+import asyncio
+import functools
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, TYPE_CHECKING, TypeVar
+
+from opentelemetry import propagate, trace
+from opentelemetry.context import Context
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SimpleSpanProcessor,
+    SpanExporter,
+)
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import Span, SpanKind, Status, StatusCode
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from user_management.core.config.settings import get_settings
+from user_management.core.exceptions import AppExceptionCase
+from user_management.core.routing import route_path
+
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession, TraceConfig, TraceRequestEndParams
+    from aiohttp import TraceRequestExceptionParams, TraceRequestStartParams
+
+SERVICE_NAME = "hb-platform-user-management"
+
+Class = TypeVar("Class", bound=type)
+
+
+@functools.cache
+def get_span_exporter() -> Optional[SpanExporter]:
+    """Spans exporter set up with the `TRACING_EXPORTER` setting: `none` (tracing disabled),
+    `console`, `memory` (spans kept in memory, as a local collector stand-in for testing) or `otlp`
+    (requires the `otlp` package extra).
+    """
+    settings = get_settings()
+    if settings.tracing_exporter == "console":
+        return ConsoleSpanExporter()
+    if settings.tracing_exporter == "memory":
+        return InMemorySpanExporter()
+    if settings.tracing_exporter == "otlp":
+        # pylint: disable=import-outside-toplevel
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        endpoint = settings.tracing_otlp_endpoint
+        return OTLPSpanExporter(endpoint=str(endpoint) if endpoint else None)
+
+    return None
+
+
+@functools.cache
+def get_tracer() -> trace.Tracer:
+    """Application tracer. A no-op tracer, with negligible overhead, when tracing is disabled."""
+    if (exporter := get_span_exporter()) is None:
+        return trace.NoOpTracer()
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": SERVICE_NAME}),
+        # Traces started upstream are sampled, or not, as decided by the caller.
+        sampler=ParentBased(TraceIdRatioBased(get_settings().tracing_sample_rate)),
+    )
+    if isinstance(exporter, InMemorySpanExporter):
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+    else:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+
+    return provider.get_tracer(__name__)
+
+
+def _set_error(span: Span, error: BaseException) -> None:
+    span.record_exception(error)
+    span.set_status(Status(StatusCode.ERROR, str(error)))
+
+
+@contextmanager
+def start_span(
+    name: str,
+    kind: SpanKind = SpanKind.INTERNAL,
+    attributes: Optional[Dict[str, Any]] = None,
+    context: Optional[Context] = None,
+) -> Iterator[Span]:
+    """
+    Starts a span as the current one for the context block. Spans are marked as failed when an
+    exception is raised within the context, except for application exceptions that don't represent
+    a server error (like a `ResourceNotFoundError`), which are just recorded in the span attributes.
+    """
+    with get_tracer().start_as_current_span(
+        name,
+        context=context,
+        kind=kind,
+        attributes=attributes,
+        record_exception=False,
+        set_status_on_exception=False,
+    ) as span:
+        try:
+            yield span
+        except AppExceptionCase as error:
+            span.set_attribute("app.exception", error.exception_case)
+            if error.status_code >= 500:
+                _set_error(span, error)
+            raise
+        except Exception as error:
+            _set_error(span, error)
+            raise
+
+
+def _traced(func: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with start_span(func.__qualname__):
+                return await func(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with start_span(func.__qualname__):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def trace_methods(cls: Class, include: Iterable[str] = ()) -> Class:
+    """Wraps every public method defined in the class, and the `include`d private ones, in a span
+    named after the method qualified name (e.g. `GCPUserService.create_gcp_user`).
+    """
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_") and name not in include:
+            continue
+
+        if isinstance(attribute, (staticmethod, classmethod)):
+            setattr(cls, name, type(attribute)(_traced(attribute.__func__)))
+        elif callable(attribute) and not isinstance(attribute, type):
+            setattr(cls, name, _traced(attribute))
+
+    return cls
+
+
+def traced(cls: Class) -> Class:
+    """Class decorator tracing every public method of the class. See `trace_methods`."""
+    return trace_methods(cls)
+
+
+async def _on_request_start(
+    session: "ClientSession", context: SimpleNamespace, params: "TraceRequestStartParams"
+) -> None:
+    # pylint: disable=unused-argument
+    # Query strings are left out of the spans, as they may carry credentials (e.g. API keys).
+    context.span = get_tracer().start_span(
+        f"HTTP {params.method}",
+        kind=SpanKind.CLIENT,
+        attributes={"http.method": params.method, "http.url": str(params.url.with_query(None))},
+    )
+    propagate.inject(params.headers, context=trace.set_span_in_context(context.span))
+
+
+async def _on_request_end(
+    session: "ClientSession", context: SimpleNamespace, params: "TraceRequestEndParams"
+) -> None:
+    # pylint: disable=unused-argument
+    context.span.set_attribute("http.status_code", params.response.status)
+    context.span.end()
+
+
+async def _on_request_exception(
+    session: "ClientSession", context: SimpleNamespace, params: "TraceRequestExceptionParams"
+) -> None:
+    # pylint: disable=unused-argument
+    _set_error(context.span, params.exception)
+    context.span.end()
+
+
+def client_trace_config() -> "TraceConfig":
+    """`aiohttp` client sessions trace configuration: a span is started for every request, and
+    the trace context is propagated to the remote service in the request headers.
+    """
+    from aiohttp import TraceConfig  # pylint: disable=import-outside-toplevel
+
+    trace_config = TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)  # type: ignore
+    trace_config.on_request_end.append(_on_request_end)  # type: ignore
+    trace_config.on_request_exception.append(_on_request_exception)  # type: ignore
+    return trace_config
+
+
+def trace_context_carrier() -> Dict[str, str]:
+    """Returns the current trace context, to be propagated in outgoing messages (e.g. Pub/Sub
+    message attributes). Empty when tracing is disabled or there is no active trace.
+    """
+    carrier: Dict[str, str] = {}
+    propagate.inject(carrier)
+    return carrier
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware starting a server span for every request, named after the route path template
+    (e.g. `GET /api/v1/users/{uid}`). Traces started by the callers are continued, from the W3C
+    Trace Context (`traceparent`) request headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or get_span_exporter() is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {
+            key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]
+        }
+        method, route = scope["method"], route_path(scope)
+
+        with start_span(
+            f"{method} {route}",
+            kind=SpanKind.SERVER,
+            attributes={"http.method": method, "http.route": route, "http.target": scope["path"]},
+            context=propagate.extract(headers),
+        ) as span:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -1,25 +1,45 @@
 import logging.config
 
-import sentry_sdk
 from fastapi import APIRouter, FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
-from sentry_sdk.integrations.dedupe import DedupeIntegration
-from sentry_sdk.integrations.logging import LoggingIntegration
 from starlette.exceptions import HTTPException
 
-from user_management.core.config.logging import logging_config
+from user_management.core.config.logging import get_logging_config
 from user_management.core.config.settings import get_settings
-from user_management.core.firebase import init_identity_platform_app
+from user_management.core.database import ReplicaLagMonitor
+from user_management.core.metrics import metrics_endpoint, PrometheusMiddleware
+from user_management.core.query_stats import QueryStatsMiddleware
+from user_management.core.resilience import DeadlineMiddleware
+from user_management.core.structured_logging import AccessLogMiddleware
+from user_management.core.tracing import TracingMiddleware
 from user_management.routers.capability import router as capabilities_router
 from user_management.routers.client import router as clients_router
 from user_management.routers.gcp_user import router as gcp_user_router
 from user_management.routers.login import router as login_router
+from user_management.services.security_token import SecurityTokenPurger
 
 
-# Configuring Python logging.
-logging.config.dictConfig(logging_config)
+def init_sentry() -> None:
+    """Initializes Sentry SDK, to report unhandled exceptions."""
+    # pylint: disable=import-outside-toplevel
+    import sentry_sdk
+    from sentry_sdk.integrations.dedupe import DedupeIntegration
+    from sentry_sdk.integrations.logging import LoggingIntegration
+
+    settings = get_settings()
+    sentry_sdk.init(  # pylint: disable=abstract-class-instantiated
+        dsn=settings.sentry_dsn,
+        # Disable Python log events in Sentry. We only want to send the unhandled exceptions/errors.
+        integrations=[LoggingIntegration(event_level=None), DedupeIntegration()],
+        environment=settings.google_project_id,
+        # Set traces_sample_rate to 1.0 to capture 100% of transactions for performance monitoring.
+        # Otherwise, implement a `traces_sampler` function to customize transaction tracing
+        # behaviour.
+        # For more information: https://docs.sentry.io/platforms/python/configuration/sampling/
+        traces_sample_rate=0.15,
+        release=settings.release,
+    )
 
 
 def create_app() -> FastAPI:
@@ -34,30 +54,39 @@ def create_app() -> FastAPI:
         user_management.main:create_app \
             --bind=0.0.0.0:8000 \
             --config python:user_management.core.config.gunicorn \
+
+    Usage with Gunicorn, in preload mode (`PRELOAD_APP=true`, the application is then given by the
+    configuration):
+
+        gunicorn --bind=0.0.0.0:8000 --config python:user_management.core.config.gunicorn
     """
     settings = get_settings()
 
-    # Sentry SDK must be initialized as early as possible.
-    sentry_sdk.init(  # pylint: disable=abstract-class-instantiated
-        dsn=settings.sentry_dsn,
-        # Disable Python log events in Sentry. We only want to send the unhandled exceptions/errors.
-        integrations=[LoggingIntegration(event_level=None), DedupeIntegration()],
-        environment=settings.google_project_id,
-        # Set traces_sample_rate to 1.0 to capture 100% of transactions for performance monitoring.
-        # Otherwise, implement a `traces_sampler` function to customize transaction tracing
-        # behaviour.
-        # For more information: https://docs.sentry.io/platforms/python/configuration/sampling/
-        traces_sample_rate=0.15,
-        release=settings.release,
-    )
+    # Configuring Python logging, from the settings (read when the app is created rather than
+    # imported).
+    logging.config.dictConfig(get_logging_config())
 
-    init_identity_platform_app()
+    # Sentry SDK must be initialized as early as possible. It's only imported when a DSN is set,
+    # as it takes long to import. GCP Identity Platform / Firebase app and GCP Pub/Sub clients are
+    # initialized when first used, for the same reason.
+    if settings.sentry_dsn:
+        init_sentry()
 
     # Initialize FastAPI app.
     app = FastAPI(title="Users Management")
 
     # Initialize middlewares.
-    app.add_middleware(SentryAsgiMiddleware)
+    if settings.sentry_dsn:
+        from sentry_sdk.integrations.asgi import (  # pylint: disable=import-outside-toplevel
+            SentryAsgiMiddleware,
+        )
+
+        app.add_middleware(SentryAsgiMiddleware)
+    app.add_middleware(PrometheusMiddleware)
+    app.add_middleware(QueryStatsMiddleware)
+    app.add_middleware(AccessLogMiddleware)
+    app.add_middleware(TracingMiddleware)
+    app.add_middleware(DeadlineMiddleware)
 
     if settings.cors_allow_origins:
         app.add_middleware(
@@ -96,5 +125,18 @@ def create_app() -> FastAPI:
     api_router.include_router(login_router, prefix="/login", tags=["Login user"])
 
     app.include_router(api_router, prefix="/api/v1")
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+    # Read replicas lag checks, run in the background by every worker process.
+    if settings.database_replica_urls:
+        monitor = ReplicaLagMonitor(interval=settings.database_replica_lag_check_interval)
+        app.add_event_handler("startup", monitor.start)
+        app.add_event_handler("shutdown", monitor.stop)
+
+    # Expired security tokens purge, run in the background by every worker process.
+    if settings.security_token_purge_interval:
+        purger = SecurityTokenPurger(interval=settings.security_token_purge_interval)
+        app.add_event_handler("startup", purger.start)
+        app.add_event_handler("shutdown", purger.stop)
 
     return app
@@ -1,6 +1,16 @@
 from enum import Enum
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, ForeignKey, Sequence, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    ForeignKey,
+    Sequence,
+    String,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import backref, relationship
 from sqlalchemy.sql import func
@@ -17,6 +27,11 @@ class Role(Enum):
 
 class ClientUser(Base):
     __tablename__ = "client_user"
+    __table_args__ = (
+        # Lookups of the user roles, and deletions of users (cascaded to their roles): the primary
+        # key starts with the `client_uid`.
+        Index("ix_client_user_gcp_user_uid", "gcp_user_uid"),
+    )
 
     client_uid = Column(ForeignKey("client.uid", ondelete="CASCADE"), primary_key=True)
     gcp_user_uid = Column(ForeignKey("gcp_user.uid", ondelete="CASCADE"), primary_key=True)
@@ -90,6 +105,12 @@ class GCPUser(Base):
 
 class SecurityToken(Base):
     __tablename__ = "security_token"
+    __table_args__ = (
+        # Lookups of the user tokens (the primary key starts with the token `uid`), and purges of
+        # the tokens expired (`security_token_ttl` hours after they are created).
+        Index("ix_security_token_gcp_user_uid_created", "gcp_user_uid", "created"),
+        Index("ix_security_token_created", "created"),
+    )
 
     uid = Column(UUID(as_uuid=True), server_default=func.uuid_generate_v4(), primary_key=True)
     gcp_user_uid = Column(
@@ -113,3 +134,17 @@ class ClientAPIToken(Base):
 
     def __repr__(self):
         return f"<ClientAPIToken: client_uid={self.client_uid}>"
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_bucket"
+    # Not written to the WAL (nor replicated): buckets are short lived, and losing them on a crash
+    # only resets the rate limits.
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key = Column(String(255), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<RateLimitBucket: key={self.key}, tokens={self.tokens}>"
@@ -1,19 +1,24 @@
+import functools
 import re
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any, Generic, List, NamedTuple, Type, TypeVar
+from typing import Any, Callable, Generic, Iterator, List, NamedTuple, Optional, Type, TypeVar
 
 from psycopg2.errors import (  # pylint: disable=no-name-in-module
     ForeignKeyViolation,
     UniqueViolation,
 )
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.engine import RowMapping
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, Query
+from sqlalchemy.sql import ColumnElement, Executable, Insert
 from sqlalchemy.sql.selectable import Select
 
-from user_management.core.database import Base
+from user_management.core.database import Base, replica_reads
 from user_management.core.exceptions import ResourceConflictError, ResourceNotFoundError
+from user_management.core.tracing import trace_methods
 
 
 # Type to return Pydantic model instances from the repository.
@@ -21,6 +26,8 @@ Schema = TypeVar("Schema", bound="BaseModel")
 
 PATTERN = re.compile(r'.*Key (.*) is not present in table "(.*)".', flags=re.DOTALL)
 
+Method = TypeVar("Method", bound=Callable[..., Any])
+
 
 class Order(NamedTuple):
     direction: str
@@ -35,10 +42,24 @@ class Order(NamedTuple):
         return cls(direction="desc", column=column)
 
 
+def read_only(method: Method) -> Method:
+    """
+    Repository methods decorator, reading from a database replica (when replicas are set up, see
+    `RoutingSession`) unless the session has already written to the primary database.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with replica_reads(self.db):
+            return method(self, *args, **kwargs)
+
+    return wrapper  # type: ignore
+
+
 class MetaAlchemyRepository(type):
     """
     Metaclass for `AlchemyRepository` to enforce all subclasses to follow defined patterns for
-    attributes.
+    attributes. Repositories public methods, and changes commits, are traced.
     """
 
     def __new__(mcs, name, bases, class_dict):
@@ -53,7 +74,9 @@ class MetaAlchemyRepository(type):
             if not issubclass(schema, BaseModel):
                 raise TypeError("`schema` attribute must be a Pydantic model.")
 
-        return type.__new__(mcs, name, bases, class_dict)
+        return trace_methods(
+            type.__new__(mcs, name, bases, class_dict), include=("_persist_changes",)
+        )
 
 
 class AlchemyRepository(Generic[Schema], metaclass=MetaAlchemyRepository):
@@ -76,16 +99,18 @@ class AlchemyRepository(Generic[Schema], metaclass=MetaAlchemyRepository):
     def model_name(self):
         return type(self.model()).__name__.lower()
 
-    def _persist_changes(self, schema: BaseModel):
-        """Helper method that attempts to persist changes into the database.
+    @contextmanager
+    def _integrity_errors(self, schema: Optional[BaseModel]) -> Iterator[None]:
+        """Translates the database integrity errors raised within the block.
 
         It handles the actual database integrity errors via the Psycopg2 connector exceptions, and
-        returns appropriate custom application exceptions that can be handled upstream by functions
+        raises appropriate custom application exceptions that can be handled upstream by functions
         or classes that uses `AlchemyRepository` based repositories.
         """
         try:
-            self.db.commit()
+            yield
         except IntegrityError as e:
+            self.db.rollback()
             if isinstance(e.__cause__, UniqueViolation):
                 raise ResourceConflictError(
                     {"message": f"{self.model_name} already exists with {schema}"}
@@ -101,6 +126,42 @@ class AlchemyRepository(Generic[Schema], metaclass=MetaAlchemyRepository):
 
             raise e from None
 
+    def _persist_changes(self, schema: Optional[BaseModel]):
+        """Helper method that attempts to persist changes into the database."""
+        with self._integrity_errors(schema=schema):
+            self.db.commit()
+
+    def _write(
+        self, statement: Executable, schema: Optional[BaseModel], commit: bool = True
+    ) -> Optional[RowMapping]:
+        """Runs a write statement returning (`RETURNING`) a single row, and commits it (unless
+        `commit` is false, to commit it along with later changes).
+        """
+        with self._integrity_errors(schema=schema):
+            row = self.db.execute(statement).mappings().first()
+        if commit:
+            self._persist_changes(schema=schema)
+
+        return row
+
+    def _where_pk(self, pk: Any) -> List[ColumnElement]:
+        """Conditions matching the primary key value: a single value, or a dict of the values of
+        every column, for composite primary keys (as `Session.get` takes them).
+        """
+        keys = self.model.__table__.primary_key.columns.keys()
+        values = pk if isinstance(pk, dict) else {keys[0]: pk}
+        # Mapped attributes, so the ORM can update the objects of the session matching them.
+        return [getattr(self.model, key) == value for key, value in values.items()]
+
+    def _not_found(self, pk: Any) -> ResourceNotFoundError:
+        return ResourceNotFoundError({"message": f"No {self.model_name} found with ID {pk}"})
+
+    def _select(self) -> Select:
+        """Base query to list objects. Can be overridden to eager load relationships needed by the
+        `schema`, so they aren't lazy loaded one row at a time.
+        """
+        return select(self.model)
+
     def _filter_and_order(self, query: Select, order: Order = None, **kwargs) -> Query:
         if kwargs:
             query = query.filter_by(**kwargs)
@@ -113,30 +174,42 @@ class AlchemyRepository(Generic[Schema], metaclass=MetaAlchemyRepository):
         if entity := self.db.get(self.model, pk):
             return entity
 
-        raise ResourceNotFoundError({"message": f"No {self.model_name} found with ID {pk}"})
+        raise self._not_found(pk=pk)
 
     def _response(self, entity: Base) -> Schema:
         values = {key: getattr(entity, key) for key in self.properties.keys()}
         return self.schema(**values)
 
+    def _row_response(self, row: RowMapping, **values) -> Schema:
+        """Response from a row returned by a write statement. Values not in the model table (e.g.
+        relationships) are passed in.
+        """
+        row_values = {key: row[key] for key in self.properties.keys() if key in row}
+        return self.schema(**row_values, **values)
+
     def create(self, schema: BaseModel) -> Schema:
-        values = schema.dict().items()
-        row = {key: value for key, value in values if key in self.model.__table__.columns.keys()}
-        entity = self.model(**row)
-        self.db.add(entity)
-        self._persist_changes(schema=schema)
-        self.db.refresh(entity)
+        """Inserts a single object in a DB table, returning it as stored (with defaults)."""
+        return self._row_response(self._insert(schema=schema))
 
-        return self._response(entity)
+    def _insert(self, schema: BaseModel, commit: bool = True) -> RowMapping:
+        statement = self._insert_statement(schema=schema)
+        return self._write(statement=statement, schema=schema, commit=commit)  # type: ignore
+
+    def _insert_statement(self, schema: BaseModel) -> Insert:
+        table = self.model.__table__
+        row = {key: value for key, value in schema.dict().items() if key in table.columns.keys()}
+        return insert(self.model).values(**row).returning(*table.columns)
 
+    @read_only
     def get(self, pk: Any) -> Schema:
         """Returns a single object from a DB table, given its primary key value."""
         entity = self._select_from_db(pk=pk)
         return self._response(entity)
 
+    @read_only
     def list(self, order_by: Order = None, **filters) -> List[Schema]:
         """Lists all the objects for the given filter and order"""
-        query = select(self.model)
+        query = self._select()
 
         results = (
             self.db.execute(self._filter_and_order(query=query, order=order_by, **filters))
@@ -147,18 +220,50 @@ class AlchemyRepository(Generic[Schema], metaclass=MetaAlchemyRepository):
 
     def update(self, pk: Any, schema: BaseModel) -> Schema:
         """Updates a single object from a DB table, given its primary key value."""
-        entity = self._select_from_db(pk=pk)
-        for key, val in schema.dict(exclude_unset=True).items():
-            setattr(entity, key, val)
-        if hasattr(entity, "updated_at"):
-            setattr(entity, "updated_at", datetime.now(timezone.utc))
-
-        self._persist_changes(schema=schema)
-
-        return self._response(entity)
+        return self._row_response(self._update(pk=pk, schema=schema))
+
+    def _update(self, pk: Any, schema: BaseModel, commit: bool = True) -> RowMapping:
+        table = self.model.__table__
+        values = {
+            key: value
+            for key, value in schema.dict(exclude_unset=True).items()
+            if key in table.columns.keys()
+        }
+        if "updated_at" in table.columns.keys():
+            values["updated_at"] = datetime.now(timezone.utc)
+
+        if values:
+            statement = (
+                update(self.model)
+                .where(*self._where_pk(pk=pk))
+                .values(**values)
+                .returning(*table.columns)
+                .execution_options(synchronize_session="evaluate")
+            )
+            row = self._write(statement=statement, schema=schema, commit=commit)
+        else:
+            # Nothing to update.
+            row = self.db.execute(select(table).where(*self._where_pk(pk=pk))).mappings().first()
+
+        if row is None:
+            raise self._not_found(pk=pk)
+
+        return row
+
+    def delete(self, pk: Any, commit: bool = True) -> None:
+        """Deletes a single object from a DB table, given its primary key value. With `commit`
+        false, the deletion is only committed by a later `commit()`, and rolled back otherwise.
+        """
+        # Related rows are deleted by the database (`ON DELETE CASCADE` foreign keys).
+        statement = (
+            delete(self.model)
+            .where(*self._where_pk(pk=pk))
+            .returning(*self.model.__table__.primary_key.columns)
+            .execution_options(synchronize_session="evaluate")
+        )
+        if self._write(statement=statement, schema=None, commit=commit) is None:
+            raise self._not_found(pk=pk)
 
-    def delete(self, pk: Any) -> None:
-        """Deletes a single object from a DB table, given its primary key value."""
-        entity = self._select_from_db(pk=pk)
-        self.db.delete(entity)
-        self.db.commit()
+    def commit(self) -> None:
+        """Commits the changes left uncommitted."""
+        self._persist_changes(schema=None)
@@ -1,7 +1,11 @@
+from typing import List, Tuple
+
 from psycopg2.errors import (  # pylint: disable=no-name-in-module
     ForeignKeyViolation,
     UniqueViolation,
 )
+from pydantic import UUID4
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
 from user_management.core.exceptions import (
@@ -55,3 +59,9 @@ class CapabilityRepository(AlchemyRepository):
                     f"{client_capability.client_uid}"
                 }
             )
+
+    def list_client_capabilities(self) -> List[Tuple[UUID4, int]]:
+        """Returns all the `(client_uid, capability_id)` pairs of enabled client capabilities."""
+        return self.db.execute(
+            select([ClientCapability.client_uid, ClientCapability.capability_id])
+        ).all()
@@ -1,27 +1,30 @@
 import binascii
+import logging
 import os
 from typing import List
 
-from psycopg2.errors import (  # pylint: disable=no-name-in-module
-    ForeignKeyViolation,
-    UniqueViolation,
-)
+from psycopg2.errors import ForeignKeyViolation  # pylint: disable=no-name-in-module
 from pydantic import UUID4
-from sqlalchemy import delete, func, select
+from sqlalchemy import delete, exists, func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError, NoResultFound
+from sqlalchemy.orm import aliased
 
 from user_management.core.dependencies import User
 from user_management.core.exceptions import AuthenticationError, RequestError
-from user_management.core.security import pwd_context
+from user_management.core.security import get_pwd_context
 from user_management.models import Client, ClientAPIToken, ClientUser, GCPUser
-from user_management.repositories.base import AlchemyRepository, Order, Schema
+from user_management.repositories.base import AlchemyRepository, Order, read_only, Schema
 from user_management.schemas import ClientAPITokenSchema, ClientSchema, VerifiedAPITokenSchema
 
+logger = logging.getLogger(__name__)
+
 
 class ClientRepository(AlchemyRepository):
     model = Client
     schema = ClientSchema
 
+    @read_only
     def list_restricted(self, user: User, order_by: Order = None, **filters) -> List[Schema]:
         """Lists `Clients`s filtering the results to only those that the current user has been
         assigned to.
@@ -36,59 +39,82 @@ class ClientRepository(AlchemyRepository):
         )
         return [self._response(entity) for entity in results]
 
-    def delete_client_only_users(self, uid: UUID4) -> List[UUID4]:
-        """Deletes `GCPUser`s that are only members of the `Client` specified by `uid`."""
-        client_only_users = (
-            self.db.execute(
-                select(GCPUser.uid)
-                .join(ClientUser)
-                .where(
-                    GCPUser.uid.in_(select(ClientUser.gcp_user_uid).filter_by(client_uid=uid)),
-                    GCPUser.staff == False,
-                )
-                .group_by(GCPUser.uid)
-                .having(func.count() < 2)
+    def delete_client(self, uid: UUID4) -> List[UUID4]:
+        """Deletes the `Client` specified by `uid`, and the `GCPUser`s that are only members of it
+        (but staff users), with a single statement, returning the UUIDs of the deleted users.
+        """
+        other_role = aliased(ClientUser)
+        sole_members = (
+            select(ClientUser.gcp_user_uid)
+            .join(GCPUser)
+            .where(
+                ClientUser.client_uid == uid,
+                GCPUser.staff == False,
+                ~exists().where(
+                    other_role.gcp_user_uid == ClientUser.gcp_user_uid,
+                    other_role.client_uid != uid,
+                ),
             )
-            .scalars()
-            .all()
         )
-        self.db.execute(delete(GCPUser).where(GCPUser.uid.in_(client_only_users)))
-        self.db.commit()
+        deleted_users = (
+            delete(GCPUser)
+            .where(GCPUser.uid.in_(sole_members))
+            .returning(GCPUser.uid)
+            .cte("deleted_users")
+        )
+        # Users are deleted along with the client, whose roles and API token (and the deleted users
+        # roles and security tokens) are deleted by the database (`ON DELETE CASCADE` foreign keys,
+        # indexed by `gcp_user_uid`, so every deleted user is an index lookup, not a table scan).
+        statement = (
+            delete(Client)
+            .where(Client.uid == uid)
+            .returning(
+                select(func.array_agg(deleted_users.c.uid)).scalar_subquery().label("user_uids")
+            )
+            .add_cte(deleted_users)
+            .execution_options(synchronize_session=False)
+        )
+        row = self._write(statement=statement, schema=None)
+        if row is None:
+            raise self._not_found(pk=uid)
 
-        return client_only_users
+        return row["user_uids"] or []
 
     def generate_api_token(self, uid: UUID4) -> ClientAPITokenSchema:
         """Generates an API access token, composed of a random 40-chars length string. The string is
         then encrypted to be stored in the DB, being returned as plain text to the user so it can be
-        used securely on its end.
+        used securely on its end. A Client existing API token is replaced (rotated), atomically.
         """
         token = binascii.hexlify(os.urandom(20)).decode()
-        encrypted_token = pwd_context.hash(token)
+        encrypted_token = get_pwd_context().hash(token)
 
-        client_api_token = ClientAPIToken(client_uid=uid, token=encrypted_token)
-        self.db.add(client_api_token)
+        statement = insert(ClientAPIToken).values(client_uid=uid, token=encrypted_token)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ClientAPIToken.client_uid], set_={"token": statement.excluded.token}
+        ).returning(
+            # Rows inserted, rather than updated, have no deleting transaction ID.
+            (literal_column("xmax") == 0).label("inserted")
+        )
 
         try:
+            inserted = self.db.execute(statement).scalar()
             self.db.commit()
         except IntegrityError as error:
+            self.db.rollback()
             if isinstance(error.__cause__, ForeignKeyViolation):
                 raise RequestError(context={"message": "Invalid Client UUID."}) from error
-            if isinstance(error.__cause__, UniqueViolation):
-                # The Client already had an API token, so this request will delete the existing and
-                # re-generate a new one.
-                self.db.rollback()
-                self.db.execute(delete(ClientAPIToken).where(ClientAPIToken.client_uid == uid))
-                return self.generate_api_token(uid=uid)
 
             raise error from None
 
+        logger.info("API token %s for client %s.", "created" if inserted else "rotated", uid)
         return ClientAPITokenSchema(client_uid=uid, token=token)
 
+    @read_only
     def check_api_token(self, token: str) -> VerifiedAPITokenSchema:
         """Given a Client UUID and its API token, it checks if it really is the valid token for the
         claiming client.
         """
-        token_hash = pwd_context.hash(token)
+        token_hash = get_pwd_context().hash(token)
         try:
             client_api_token = (
                 self.db.execute(select(ClientAPIToken).filter_by(token=token_hash)).scalars().one()
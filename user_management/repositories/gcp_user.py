@@ -1,12 +1,16 @@
-from typing import Iterable, List, Optional
+import uuid
+from typing import Iterable, List, Optional, Tuple
 
 from pydantic import BaseModel, EmailStr, UUID4
 from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql.selectable import Select
 
 from user_management.core.exceptions import ResourceNotFoundError
-from user_management.models import ClientUser, GCPUser, Role
-from user_management.repositories.base import AlchemyRepository, Order, Schema
+from user_management.models import ClientUser, GCPUser, Role, SecurityToken
+from user_management.repositories.base import AlchemyRepository, Order, read_only, Schema
 from user_management.schemas import ClientUserSchema, GCPUserSchema
 
 
@@ -14,37 +18,42 @@ class GCPUserRepository(AlchemyRepository):
     model = GCPUser
     schema = GCPUserSchema
 
-    def _persist_user_role(self, schema: BaseModel, ready_response: GCPUserSchema):
-        """Helper method to check up for submitted user roles for a given client."""
+    def _upsert_role(self, gcp_user_uid: UUID4, client_user: ClientUserSchema) -> bool:
+        """Sets the user role in a client with a single, atomic, statement. Returns whether the role
+        changed: the user didn't have a role in the client, or had another one.
+        """
+        statement = insert(ClientUser).values(
+            client_uid=client_user.client_uid, gcp_user_uid=gcp_user_uid, role=client_user.role
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[ClientUser.client_uid, ClientUser.gcp_user_uid],
+            set_={"role": statement.excluded.role},
+            # Unchanged roles aren't updated, nor returned.
+            where=ClientUser.role != statement.excluded.role,
+        ).returning(ClientUser.client_uid)
+
+        return self._write(statement=statement, schema=client_user, commit=False) is not None
+
+    def _persist_user_role(self, schema: BaseModel, ready_response: GCPUserSchema) -> bool:
+        """Helper method to set up submitted user roles for a given client, committing them along
+        with the user changes. Returns whether the user role changed.
+        """
         client_user: Optional[ClientUserSchema] = getattr(schema, "role", None)
+        changed = False
         if client_user is not None:
-            # User role passed in.
-            existing_client_user = self.db.get(
-                ClientUser,
-                {"client_uid": client_user.client_uid, "gcp_user_uid": ready_response.uid},
-            )
-
-            if existing_client_user:
-                # User already has a role in the given Client.
-                if existing_client_user.role == client_user.role:
-                    # The user already has this role in the given Client. So don't do anything.
-                    return ready_response
-
-                # Role has changed.
-                existing_client_user.role = client_user.role
-                ready_response.clients = [existing_client_user]
-            else:
-                # Create new role for given Client.
-                new_client_user = ClientUser(
-                    client_uid=client_user.client_uid,
-                    gcp_user_uid=ready_response.uid,
-                    role=client_user.role,
-                )
-                self.db.add(new_client_user)
-                ready_response.clients = [new_client_user]
+            if changed := self._upsert_role(
+                gcp_user_uid=ready_response.uid, client_user=client_user
+            ):
+                ready_response.clients = [
+                    *(c for c in ready_response.clients if c.client_uid != client_user.client_uid),
+                    client_user,
+                ]
 
         self._persist_changes(schema=schema)
-        return ready_response
+        return changed
+
+    def _select(self) -> Select:
+        return select(self.model).options(selectinload(self.model.clients))
 
     def get_from_email(self, email: EmailStr) -> GCPUserSchema:
         try:
@@ -56,18 +65,48 @@ class GCPUserRepository(AlchemyRepository):
 
         return self._response(gcp_user)
 
-    def create(self, schema: BaseModel) -> Schema:
-        """Overrides base `create` method to handle user roles creation for a given client"""
-        response = super().create(schema=schema)
+    def create(
+        self, schema: BaseModel, security_token: bool = False, commit: bool = True
+    ) -> Schema:
+        """Overrides base `create` method to insert the user role for a given client, and a one-time
+        security token (with `security_token`), along with the user, in a single statement. With
+        `commit` false, the new user is only committed by a later `commit()`.
+        """
+        # The user UID is generated here, so the role and token rows can refer to it.
+        uid = uuid.uuid4()
+        statement = self._insert_statement(schema=schema).values(uid=uid)
+        client_user: Optional[ClientUserSchema] = getattr(schema, "role", None)
+        if client_user is not None:
+            statement = statement.add_cte(
+                insert(ClientUser)
+                .values(client_uid=client_user.client_uid, gcp_user_uid=uid, role=client_user.role)
+                .cte("new_client_user")
+            )
+        if security_token:
+            statement = statement.add_cte(
+                insert(SecurityToken).values(gcp_user_uid=uid).inline().cte("new_security_token")
+            )
 
-        return self._persist_user_role(schema=schema, ready_response=response)
+        row = self._write(statement=statement, schema=schema, commit=commit)
+        return self._row_response(row, clients=[client_user] if client_user else [])
 
     def update(self, pk: UUID4, schema: BaseModel) -> Schema:
         """Overrides base `update` method to handle user roles modifications for a given client."""
-        response = super().update(pk=pk, schema=schema)
+        return self.update_with_claims(pk=pk, schema=schema)[0]  # type: ignore
+
+    def update_with_claims(self, pk: UUID4, schema: BaseModel) -> Tuple[GCPUserSchema, bool]:
+        """Updates the user, and their role in a given client, in a single transaction. Returns the
+        updated user, and whether their GCP Identity Platform claims (staff flag and roles) may
+        have changed.
+        """
+        row = self._update(pk=pk, schema=schema, commit=False)
+        clients = self.db.execute(select(ClientUser).filter_by(gcp_user_uid=pk)).scalars().all()
+        response = self._row_response(row, clients=[ClientUserSchema.from_orm(c) for c in clients])
+        role_changed = self._persist_user_role(schema=schema, ready_response=response)
 
-        return self._persist_user_role(schema=schema, ready_response=response)
+        return response, role_changed or "staff" in schema.dict(exclude_unset=True)
 
+    @read_only
     def list_restricted(
         self,
         clients: List[UUID4],
@@ -77,7 +116,7 @@ class GCPUserRepository(AlchemyRepository):
         """Lists `GCPUser`s filtering the results to only those users that belong to the passed list
         of clients (by `Client.uid`).
         """
-        query = select(self.model).join(ClientUser).filter(ClientUser.client_uid.in_(clients))
+        query = self._select().join(ClientUser).filter(ClientUser.client_uid.in_(clients))
         results = (
             self.db.execute(
                 super()._filter_and_order(query=query, order=order_by, **filters).distinct()
@@ -99,6 +138,7 @@ class GCPUserRepository(AlchemyRepository):
             {"message": f"User {gcp_user} doesn't have a role with Client {client}."}
         )
 
+    @read_only
     def get_matching_clients(
         self, gcp_user_uid: UUID4, clients: Iterable[UUID4]
     ) -> List[ClientUser]:
@@ -1,7 +1,12 @@
+from datetime import timedelta
+from typing import Optional
+
 from pydantic import UUID4
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, select
+from sqlalchemy.sql import ColumnElement
 
+from user_management.core.config.settings import get_settings
 from user_management.models import SecurityToken
 from user_management.repositories.base import AlchemyRepository
 from user_management.schemas import SecurityTokenSchema
@@ -11,9 +16,65 @@ class SecurityTokenRepository(AlchemyRepository):
     model = SecurityToken
     schema = SecurityTokenSchema
 
+    def _valid(self, ttl: Optional[int] = None) -> ColumnElement:
+        """Condition matching the tokens not expired yet, `ttl` hours (`security_token_ttl` by
+        default) after they were created.
+        """
+        ttl = ttl or get_settings().security_token_ttl
+        return self.model.created >= func.now() - timedelta(hours=ttl)
+
     def get_user_token(self, gcp_user_uid: UUID4) -> SecurityTokenSchema:
+        """Returns the latest valid token of the user."""
         token = (
-            self.db.execute(select(self.model).filter_by(gcp_user_uid=gcp_user_uid)).scalars().one()
+            self.db.execute(
+                select(self.model)
+                .where(self.model.gcp_user_uid == gcp_user_uid, self._valid())
+                .order_by(self.model.created.desc())
+                .limit(1)
+            )
+            .scalars()
+            .one()
         )
 
         return self._response(token)
+
+    def use_token(self, gcp_user_uid: UUID4, uid: UUID4, commit: bool = True) -> None:
+        """Deletes the user token, so it can't be used again. Expired tokens are not found."""
+        pk = {"gcp_user_uid": gcp_user_uid, "uid": uid}
+        statement = (
+            delete(self.model)
+            .where(*self._where_pk(pk=pk), self._valid())
+            .returning(self.model.uid)
+            .execution_options(synchronize_session=False)
+        )
+        if self._write(statement=statement, schema=None, commit=commit) is None:
+            raise self._not_found(pk=pk)
+
+    def purge_expired(self, batch_size: int, ttl: Optional[int] = None) -> int:
+        """
+        Deletes (and commits the deletion of) a batch of expired tokens, the oldest first, returning
+        how many were deleted. Tokens locked by concurrent purges are skipped, so purges don't wait
+        for one another.
+        """
+        # The batch is selected in a CTE, run once (CTEs locking rows are never inlined), as an
+        # `IN (subquery)` may run the subquery again, selecting (and deleting) more rows.
+        expired = (
+            select(self.model.uid, self.model.gcp_user_uid)
+            .where(~self._valid(ttl=ttl))
+            .order_by(self.model.created)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("expired")
+        )
+        statement = (
+            delete(self.model)
+            .where(
+                self.model.uid == expired.c.uid,
+                self.model.gcp_user_uid == expired.c.gcp_user_uid,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        deleted = self.db.execute(statement).rowcount
+        self.commit()
+
+        return deleted
@@ -3,12 +3,13 @@ from typing import List
 from fastapi import APIRouter, Depends, Response, status
 
 from user_management.core.dependencies import DBSession, get_database, staff_check, User, user_check
+from user_management.core.responses import FastJSONRoute
 from user_management.repositories.base import Order
 from user_management.schemas import CapabilitySchema, ClientCapabilitySchema, NewNamedEntitySchema
 from user_management.services.capability import CapabilityService
 
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=CapabilitySchema)
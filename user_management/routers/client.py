@@ -4,18 +4,23 @@ from fastapi import APIRouter, Depends, Response, status
 from pydantic import UUID4
 
 from user_management.core.dependencies import DBSession, get_database, staff_check, User, user_check
+from user_management.core.responses import FastJSONRoute
 from user_management.schemas import (
     APITokenSchema,
     ClientAPITokenSchema,
+    ClientCapabilitiesSchema,
+    ClientCapabilityCheckSchema,
     ClientSchema,
+    ClientsCapabilitiesQuerySchema,
     ClientUpdateSchema,
     NewNamedEntitySchema,
     VerifiedAPITokenSchema,
 )
+from user_management.services.capability import CapabilityService
 from user_management.services.client import ClientService
 
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=ClientSchema)
@@ -70,3 +75,45 @@ async def generate_api_token(
 @router.post("/api-token/verify", response_model=VerifiedAPITokenSchema)
 async def verify_api_token(payload: APITokenSchema, db: DBSession = Depends(get_database)):
     return ClientService(db).verify_api_token(payload=payload)
+
+
+@router.get("/{uid}/capabilities", response_model=ClientCapabilitiesSchema)
+async def get_client_capabilities(
+    uid: UUID4, user: User = Depends(user_check), db: DBSession = Depends(get_database)
+):
+    """
+    Lists the IDs of the capabilities enabled for the client.
+
+    Capabilities are looked up in an in-memory index kept by every worker process, so changes made
+    through another worker (enabling or disabling capabilities, deleting clients) are only seen
+    once its index is reloaded: `CAPABILITY_INDEX_TTL` seconds (60 by default) later at most.
+    """
+    return CapabilityService(db).get_client_capabilities(client_uid=uid, user=user)
+
+
+@router.get("/{uid}/capabilities/{capability_id}", response_model=ClientCapabilityCheckSchema)
+async def check_client_capability(
+    uid: UUID4,
+    capability_id: int,
+    user: User = Depends(user_check),
+    db: DBSession = Depends(get_database),
+):
+    """
+    Checks if the capability is enabled for the client, as of `CAPABILITY_INDEX_TTL` seconds ago
+    at most (see `get_client_capabilities`).
+    """
+    return CapabilityService(db).check_client_capability(
+        client_uid=uid, capability_id=capability_id, user=user
+    )
+
+
+@router.post("/capabilities", response_model=List[ClientCapabilitiesSchema])
+async def get_clients_capabilities(
+    query: ClientsCapabilitiesQuerySchema,
+    user: User = Depends(user_check),
+    db: DBSession = Depends(get_database),
+):
+    """
+    Batch version of `get_client_capabilities`, with the same `CAPABILITY_INDEX_TTL` staleness.
+    """
+    return CapabilityService(db).get_clients_capabilities(client_uids=query.client_uids, user=user)
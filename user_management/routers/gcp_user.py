@@ -1,9 +1,11 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from pydantic import EmailStr, UUID4
 
 from user_management.core.dependencies import DBSession, get_database, user_check, User
+from user_management.core.rate_limiting import rate_limit
+from user_management.core.responses import FastJSONRoute
 from user_management.schemas import (
     CreatePasswordSchema,
     GCPUserSchema,
@@ -13,7 +15,7 @@ from user_management.schemas import (
 from user_management.services import GCPUserService, MailerService
 
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=GCPUserSchema)
@@ -88,5 +90,9 @@ async def create_gcp_user_password(
 @router.get(
     "/{email}/reset-password", status_code=status.HTTP_204_NO_CONTENT, response_class=Response
 )
-async def reset_gcp_user_password(email: EmailStr, db: DBSession = Depends(get_database)):
+async def reset_gcp_user_password(
+    email: EmailStr, request: Request, db: DBSession = Depends(get_database)
+):
+    # Rejected requests don't use the database session, so they never take a pool connection.
+    await rate_limit(scope="reset-password", request=request, email=email)
     MailerService(db).reset_password_message(gcp_user_email=email)
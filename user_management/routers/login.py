@@ -1,5 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
+from user_management.core.rate_limiting import rate_limit
 from user_management.schemas import LoginSchema, RefreshTokenSchema
 from user_management.services import GCPIdentityPlatformService
 
@@ -8,7 +9,8 @@ router = APIRouter()
 
 
 @router.post("")
-async def login(login_credentials: LoginSchema):
+async def login(login_credentials: LoginSchema, request: Request):
+    await rate_limit(scope="login", request=request, email=login_credentials.email)
     login_response = await GCPIdentityPlatformService().login_gcp_user(
         email=login_credentials.email, password=login_credentials.password.get_secret_value()
     )
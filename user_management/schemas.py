@@ -162,6 +162,19 @@ class ClientCapabilitySchema(BaseModel):
         orm_mode = True
 
 
+class ClientCapabilitiesSchema(BaseModel):
+    client_uid: UUID4
+    capabilities: List[int]
+
+
+class ClientCapabilityCheckSchema(ClientCapabilitySchema):
+    enabled: bool
+
+
+class ClientsCapabilitiesQuerySchema(BaseModel):
+    client_uids: List[UUID4]
+
+
 class LoginSchema(BaseModel):
     email: EmailStr
     password: SecretStr
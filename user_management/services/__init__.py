@@ -1,3 +1,4 @@
 from user_management.services.gcp_identity import GCPIdentityPlatformService
 from user_management.services.gcp_user import GCPUserService
 from user_management.services.mailer import MailerService
+from user_management.services.security_token import SecurityTokenService
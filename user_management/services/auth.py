@@ -2,10 +2,12 @@ from pydantic import UUID4
 
 from user_management.core.dependencies import DBSession, User
 from user_management.core.exceptions import AuthorizationError, ResourceNotFoundError
+from user_management.core.tracing import traced
 from user_management.repositories import GCPUserRepository
 from user_management.schemas import GCPUserSchema, UpdateGCPUserSchema
 
 
+@traced
 class AuthService:
     def __init__(self, db: DBSession):
         self.gcp_user_repository = GCPUserRepository(db)
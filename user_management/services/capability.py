@@ -1,14 +1,35 @@
 from typing import List, Optional
 
-from user_management.core.dependencies import DBSession
+from pydantic import UUID4
+
+from user_management.core.capability_index import CapabilityIndex, get_capability_index
+from user_management.core.dependencies import DBSession, User
+from user_management.core.tracing import traced
 from user_management.repositories import CapabilityRepository
 from user_management.repositories.base import Order
-from user_management.schemas import CapabilitySchema, ClientCapabilitySchema, NewNamedEntitySchema
+from user_management.schemas import (
+    CapabilitySchema,
+    ClientCapabilitiesSchema,
+    ClientCapabilityCheckSchema,
+    ClientCapabilitySchema,
+    NewNamedEntitySchema,
+)
+from user_management.services.auth import AuthService
 
 
+@traced
 class CapabilityService:
     def __init__(self, db: DBSession):
+        self.auth_service = AuthService(db)
         self.capability_repository = CapabilityRepository(db)
+        self.capability_index = get_capability_index()
+
+    def _get_index(self) -> CapabilityIndex:
+        """Returns the client capabilities index, reloading it from database if it's stale."""
+        if self.capability_index.stale:
+            self.capability_index.load(self.capability_repository.list_client_capabilities())
+
+        return self.capability_index
 
     def create_capability(self, capability: NewNamedEntitySchema) -> CapabilitySchema:
         return self.capability_repository.create(schema=capability)
@@ -22,11 +43,40 @@ class CapabilityService:
         return self.capability_repository.list(order_by=order_by)
 
     def enable_capability(self, client_capability: ClientCapabilitySchema) -> None:
-        return self.capability_repository.create_client_capability(
-            client_capability=client_capability
-        )
+        self.capability_repository.create_client_capability(client_capability=client_capability)
+        self.capability_index.enable(**client_capability.dict())
 
     def disable_capability(self, client_capability: ClientCapabilitySchema) -> None:
-        return self.capability_repository.remove_client_capability(
-            client_capability=client_capability
+        self.capability_repository.remove_client_capability(client_capability=client_capability)
+        self.capability_index.disable(**client_capability.dict())
+
+    def get_client_capabilities(self, client_uid: UUID4, user: User) -> ClientCapabilitiesSchema:
+        """Lists the IDs of the capabilities enabled for the given client."""
+        self.auth_service.check_client_member(request_user=user, client_uid=client_uid)
+        return ClientCapabilitiesSchema(
+            client_uid=client_uid, capabilities=self._get_index().capabilities(client_uid)
         )
+
+    def check_client_capability(
+        self, client_uid: UUID4, capability_id: int, user: User
+    ) -> ClientCapabilityCheckSchema:
+        """Checks if the given capability is enabled for the given client."""
+        self.auth_service.check_client_member(request_user=user, client_uid=client_uid)
+        return ClientCapabilityCheckSchema(
+            client_uid=client_uid,
+            capability_id=capability_id,
+            enabled=self._get_index().has_capability(client_uid, capability_id),
+        )
+
+    def get_clients_capabilities(
+        self, client_uids: List[UUID4], user: User
+    ) -> List[ClientCapabilitiesSchema]:
+        """Batch version of `get_client_capabilities`, for many clients in a single call."""
+        for client_uid in client_uids:
+            self.auth_service.check_client_member(request_user=user, client_uid=client_uid)
+
+        index = self._get_index()
+        return [
+            ClientCapabilitiesSchema(client_uid=uid, capabilities=index.capabilities(uid))
+            for uid in client_uids
+        ]
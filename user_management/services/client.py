@@ -2,7 +2,9 @@ from typing import List
 
 from pydantic import UUID4
 
+from user_management.core.capability_index import get_capability_index
 from user_management.core.dependencies import DBSession, User
+from user_management.core.tracing import traced
 from user_management.repositories import ClientRepository
 from user_management.schemas import (
     APITokenSchema,
@@ -16,6 +18,7 @@ from user_management.services.auth import AuthService
 from user_management.services.gcp_identity import GCPIdentityPlatformService
 
 
+@traced
 class ClientService:
     def __init__(self, db: DBSession):
         self.auth_service = AuthService(db)
@@ -43,9 +46,9 @@ class ClientService:
         from database and GCP-IP remote backend, except those users that are also assigned to other
         clients as well.
         """
-        deleted_users = self.client_repository.delete_client_only_users(uid=uid)
+        deleted_users = self.client_repository.delete_client(uid=uid)
+        get_capability_index().remove(uid)
         self.gcp_identity_service.remove_bulk_gcp_users(uids=deleted_users)
-        return self.client_repository.delete(pk=uid)
 
     def generate_api_token(self, uid: UUID4, user: User) -> ClientAPITokenSchema:
         self.auth_service.check_client_allowance(request_user=user, client_uid=uid)
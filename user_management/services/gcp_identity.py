@@ -1,61 +1,81 @@
+import hashlib
 import logging
-from typing import Dict, List, TypedDict, Union
+from functools import cached_property
+from typing import Dict, List, TYPE_CHECKING, TypedDict, Union
 
-from aiohttp import ClientSession
 from fastapi import status
-from firebase_admin.auth import (
-    create_user,
-    delete_user,
-    delete_users,
-    EmailAlreadyExistsError,
-    generate_password_reset_link,
-    PhoneNumberAlreadyExistsError,
-    set_custom_user_claims,
-    UidAlreadyExistsError,
-    update_user,
-    UserNotFoundError,
-)
-from firebase_admin.exceptions import FirebaseError, InvalidArgumentError, PermissionDeniedError
 from pydantic import EmailStr, UUID4
 
 from user_management.core.config.settings import get_settings
 from user_management.core.exceptions import (
+    AppExceptionCase,
     AuthenticationError,
     RemoteServiceError,
     RequestError,
     ResourceConflictError,
     ResourceNotFoundError,
 )
-from user_management.core.firebase import init_identity_platform_app
+from user_management.core.firebase import get_firebase_auth, init_identity_platform_app
+from user_management.core.resilience import protected_call
+from user_management.core.single_flight import SingleFlight
+from user_management.core.tracing import client_trace_config, traced
 from user_management.schemas import GCPUserSchema
 
 
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
 logger = logging.getLogger(__name__)
 
 Claims = TypedDict("Claims", {"roles": Dict[str, str], "staff": bool}, total=False)
 
+# Refresh token requests in flight in this worker, by refresh token digest.
+refresh_token_flights = SingleFlight("identitytoolkit.refresh_token")
+
 
+@traced
 class GCPIdentityPlatformService:
     """Service implementation to communicate and synchronize data with GCP Identity Platform."""
 
     def __init__(self):
         self.api_key = get_settings().gcp_api_key.get_secret_value()
-        self.gcp_api_session = ClientSession(
-            base_url="https://identitytoolkit.googleapis.com",
+
+    @cached_property
+    def gcp_api_session(self) -> "ClientSession":
+        """GCP Identity Platform REST API client session, only created (within an event loop) when
+        the service is used to log users in.
+        """
+        from aiohttp import ClientSession  # pylint: disable=import-outside-toplevel
+
+        return ClientSession(
+            base_url=get_settings().gcp_identity_toolkit_url,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
+            trace_configs=[client_trace_config()],
         )
 
     @staticmethod
     def _handle_gcp_exception(error: Exception, gcp_user: Union[GCPUserSchema, UUID4]) -> None:
         """Helper method to handle all possible error responses from GCP in detail."""
+        # pylint: disable=import-outside-toplevel
+        from firebase_admin.exceptions import (
+            FirebaseError,
+            InvalidArgumentError,
+            PermissionDeniedError,
+        )
+
+        if isinstance(error, AppExceptionCase):
+            # Calls failed fast (see `protected_call`), or already handled.
+            raise error
+
         logger.error("Error syncing users data with GCP Identity Platform: %s", str(error))
 
+        auth = get_firebase_auth()
         map_exceptions = {
-            EmailAlreadyExistsError: (ResourceConflictError, "Duplicated email."),
+            auth.EmailAlreadyExistsError: (ResourceConflictError, "Duplicated email."),
             InvalidArgumentError: (RequestError, str(error)),
-            PhoneNumberAlreadyExistsError: (ResourceConflictError, "Duplicated phone number."),
-            UidAlreadyExistsError: (ResourceConflictError, "Duplicated UID."),
-            UserNotFoundError: (ResourceNotFoundError, "User not found."),
+            auth.PhoneNumberAlreadyExistsError: (ResourceConflictError, "Duplicated phone number."),
+            auth.UidAlreadyExistsError: (ResourceConflictError, "Duplicated UID."),
+            auth.UserNotFoundError: (ResourceNotFoundError, "User not found."),
             PermissionDeniedError: (RemoteServiceError, str(error)),
             FirebaseError: (RemoteServiceError, str(error)),
             ValueError: (RequestError, str(error)),
@@ -63,7 +83,10 @@ class GCPIdentityPlatformService:
             Exception: (RemoteServiceError, str(error)),
         }
 
-        exception_class, message = map_exceptions[type(error)]
+        # The most specific mapping (e.g. timeouts, raised as `FirebaseError` subclasses).
+        exception_class, message = next(
+            map_exceptions[cls] for cls in type(error).__mro__ if cls in map_exceptions
+        )
         context: dict = {"message": message}
 
         # Build exception response context with the available data.
@@ -81,22 +104,35 @@ class GCPIdentityPlatformService:
 
         raise exception_class(context=context) from error
 
-    def sync_gcp_user(self, gcp_user: GCPUserSchema, update: bool = False) -> None:
-        """Synchronizes data from a local DB `GCPUser` with GCP."""
+    def sync_gcp_user(
+        self, gcp_user: GCPUserSchema, update: bool = False, claims: bool = True
+    ) -> None:
+        """Synchronizes data from a local DB `GCPUser` with GCP (and its claims, unless `claims` is
+        false).
+        """
         if not init_identity_platform_app():
             logger.debug("GCP Identity Platform not connected. New user not synced.")
             return
 
         try:
             if update is False:
-                create_user(uid=str(gcp_user.uid), display_name=gcp_user.name, email=gcp_user.email)
+                with protected_call("firebase.create_user"):
+                    get_firebase_auth().create_user(
+                        uid=str(gcp_user.uid), display_name=gcp_user.name, email=gcp_user.email
+                    )
             else:
-                update_user(uid=str(gcp_user.uid), display_name=gcp_user.name, email=gcp_user.email)
+                with protected_call("firebase.update_user"):
+                    get_firebase_auth().update_user(
+                        uid=str(gcp_user.uid), display_name=gcp_user.name, email=gcp_user.email
+                    )
         except Exception as error:  # pylint: disable=broad-except
             self._handle_gcp_exception(error, gcp_user)
 
+        if not claims:
+            return
+
         # Synchronize user claims.
-        claims: Claims = {
+        user_claims: Claims = {
             "staff": gcp_user.staff,
             "roles": {
                 str(client_user.client_uid): client_user.role.value
@@ -104,14 +140,16 @@ class GCPIdentityPlatformService:
             },
         }
         try:
-            set_custom_user_claims(str(gcp_user.uid), claims)
+            with protected_call("firebase.set_custom_user_claims"):
+                get_firebase_auth().set_custom_user_claims(str(gcp_user.uid), user_claims)
         except Exception as error:  # pylint: disable=broad-except
             self._handle_gcp_exception(error, gcp_user)
 
     def remove_gcp_user(self, uid: UUID4) -> None:
         """Removes a user from GCP Identity Platform remote backend, given its GCP-IP user ID."""
         try:
-            delete_user(uid=str(uid))
+            with protected_call("firebase.delete_user"):
+                get_firebase_auth().delete_user(uid=str(uid))
         except Exception as error:  # pylint: disable=broad-except
             self._handle_gcp_exception(error, uid)
 
@@ -122,7 +160,8 @@ class GCPIdentityPlatformService:
 
         def remove_users(gcp_users: list) -> None:
             try:
-                delete_users(uids=gcp_users)
+                with protected_call("firebase.delete_users"):
+                    get_firebase_auth().delete_users(uids=gcp_users)
             except Exception:  # pylint: disable=broad-except
                 logger.exception("Error when trying to delete users in GCP-IP.")
 
@@ -140,12 +179,14 @@ class GCPIdentityPlatformService:
     @staticmethod
     def get_password_reset_link(gcp_user: GCPUserSchema) -> str:
         """Generates and returns the "reset password" link for the given GCP-IP user email."""
-        return generate_password_reset_link(email=gcp_user.email)
+        with protected_call("firebase.generate_password_reset_link"):
+            return get_firebase_auth().generate_password_reset_link(email=gcp_user.email)
 
     def set_password(self, gcp_user_uid: UUID4, password: str):
         """Sets up the user password for the given GCP-IP user ID."""
         try:
-            update_user(uid=str(gcp_user_uid), password=password)
+            with protected_call("firebase.update_user"):
+                get_firebase_auth().update_user(uid=str(gcp_user_uid), password=password)
         except Exception as error:  # pylint: disable=broad-except
             self._handle_gcp_exception(error, gcp_user_uid)
 
@@ -167,19 +208,28 @@ class GCPIdentityPlatformService:
 
         Other possible errors are mostly undocumented in GCP.
         """
+        from aiohttp import ClientTimeout  # pylint: disable=import-outside-toplevel
+
         async with self.gcp_api_session as session:
-            async with session.post(
-                f"/v1/accounts:signInWithPassword?key={self.api_key}",
-                data={"email": email, "password": password, "returnSecureToken": True},
-            ) as response:
-                response_payload = await response.json()
-                if response.status == status.HTTP_400_BAD_REQUEST:
-                    if response_payload.get("error", {}).get("status") == "INVALID_ARGUMENT":
+            with protected_call("identitytoolkit.sign_in_with_password") as timeout:
+                async with session.post(
+                    f"/v1/accounts:signInWithPassword?key={self.api_key}",
+                    data={"email": email, "password": password, "returnSecureToken": True},
+                    timeout=ClientTimeout(total=timeout),
+                ) as response:
+                    response_payload = await response.json()
+                    if response.status == status.HTTP_400_BAD_REQUEST:
+                        if response_payload.get("error", {}).get("status") == "INVALID_ARGUMENT":
+                            logger.error("GCP error on user login: %s", response_payload)
+                            raise RemoteServiceError(context={"message": "Service unavailable."})
+
+                        raise AuthenticationError(context={"message": "Invalid credentials."})
+
+                    if response.status != status.HTTP_200_OK:
+                        # E.g. quota exceeded, or GCP Identity Platform unavailable.
                         logger.error("GCP error on user login: %s", response_payload)
                         raise RemoteServiceError(context={"message": "Service unavailable."})
 
-                    raise AuthenticationError(context={"message": "Invalid credentials."})
-
             return response_payload
 
     async def refresh_token_gcp_user(self, refresh_token: str) -> dict[str, str]:
@@ -195,35 +245,50 @@ class GCPIdentityPlatformService:
         - User not found in GCP-IP. Most probably, if the user did log in successfully and it had a
           valid refresh token, the situation is that an admin completely deleted that user in GCP
           Identity Platform.
+
+        Concurrent requests with the same refresh token (e.g. from several browser tabs) share a
+        single request to GCP-IP, and its response.
         """
+        key = hashlib.sha256(refresh_token.encode()).hexdigest()
+        return await refresh_token_flights.do(key, lambda: self._refresh_token(refresh_token))
+
+    async def _refresh_token(self, refresh_token: str) -> dict[str, str]:
+        from aiohttp import ClientTimeout  # pylint: disable=import-outside-toplevel
+
         async with self.gcp_api_session as session:
-            async with session.post(
-                f"/v1/token?key={self.api_key}",
-                data={"grant_type": "refresh_token", "refresh_token": refresh_token},
-            ) as response:
-                response_payload = await response.json()
-                if response.status != status.HTTP_200_OK:
-                    message = response_payload.get("error", {}).get("message")
-
-                    try:
-                        raise {
-                            "INVALID_REFRESH_TOKEN": AuthenticationError(
-                                context={"message": "Invalid refresh token."}
-                            ),
-                            "TOKEN_EXPIRED": AuthenticationError(
-                                context={"message": "Token expired. Please log in again."}
-                            ),
-                            "USER_DISABLED": AuthenticationError(
-                                context={"message": "User has been disabled."}
-                            ),
-                            "USER_NOT_FOUND": AuthenticationError(
-                                context={"message": "User has been deleted."}
-                            ),
-                        }.get(message, KeyError)
-                    except KeyError:
-                        # Handle random error from GCP Identity Platform.
-                        logger.error("Error when user tried to refresh token: %s", response_payload)
-                        # pylint: disable=raise-missing-from
-                        raise RemoteServiceError(context={"message": "Unable to refresh token."})
+            with protected_call("identitytoolkit.refresh_token") as timeout:
+                async with session.post(
+                    f"/v1/token?key={self.api_key}",
+                    data={"grant_type": "refresh_token", "refresh_token": refresh_token},
+                    timeout=ClientTimeout(total=timeout),
+                ) as response:
+                    response_payload = await response.json()
+                    if response.status != status.HTTP_200_OK:
+                        message = response_payload.get("error", {}).get("message")
+
+                        try:
+                            raise {
+                                "INVALID_REFRESH_TOKEN": AuthenticationError(
+                                    context={"message": "Invalid refresh token."}
+                                ),
+                                "TOKEN_EXPIRED": AuthenticationError(
+                                    context={"message": "Token expired. Please log in again."}
+                                ),
+                                "USER_DISABLED": AuthenticationError(
+                                    context={"message": "User has been disabled."}
+                                ),
+                                "USER_NOT_FOUND": AuthenticationError(
+                                    context={"message": "User has been deleted."}
+                                ),
+                            }.get(message, KeyError)
+                        except KeyError:
+                            # Handle random error from GCP Identity Platform.
+                            logger.error(
+                                "Error when user tried to refresh token: %s", response_payload
+                            )
+                            # pylint: disable=raise-missing-from
+                            raise RemoteServiceError(
+                                context={"message": "Unable to refresh token."}
+                            )
 
         return response_payload
@@ -5,20 +5,17 @@ from pydantic import UUID4
 
 from user_management.core.dependencies import DBSession, User
 from user_management.core.exceptions import ResourceNotFoundError
+from user_management.core.tracing import traced
 from user_management.repositories import GCPUserRepository
 from user_management.repositories import SecurityTokenRepository
-from user_management.schemas import (
-    CreateSecurityTokenSchema,
-    GCPUserSchema,
-    NewGCPUserSchema,
-    UpdateGCPUserSchema,
-)
+from user_management.schemas import GCPUserSchema, NewGCPUserSchema, UpdateGCPUserSchema
 from user_management.services.auth import AuthService
 from user_management.services.gcp_identity import GCPIdentityPlatformService
 
 logger = logging.getLogger(__name__)
 
 
+@traced
 class GCPUserService:
     def __init__(self, db: DBSession):
         self.auth_service = AuthService(db)
@@ -38,16 +35,14 @@ class GCPUserService:
                 request_user=user, client_uid=gcp_user.role.client_uid
             )
 
-        created_user: GCPUserSchema = self.gcp_user_repository.create(schema=gcp_user)
-
-        # Synchronize GCP Identity Platform.
-        self.gcp_identity_service.sync_gcp_user(gcp_user=created_user)
-
-        # Create a one-time Security Token to be used to let the user set the password for the first
-        # time.
-        self.security_token_repository.create(
-            schema=CreateSecurityTokenSchema(gcp_user_uid=created_user.uid)
+        # The user, their role and a one-time Security Token (to let the user set the password for
+        # the first time) are inserted together, and only committed once the user is synchronized
+        # with GCP Identity Platform, so failures leave nothing behind.
+        created_user: GCPUserSchema = self.gcp_user_repository.create(
+            schema=gcp_user, security_token=True, commit=False
         )
+        self.gcp_identity_service.sync_gcp_user(gcp_user=created_user)
+        self.gcp_user_repository.commit()
 
         return created_user
 
@@ -72,10 +67,14 @@ class GCPUserService:
     ) -> GCPUserSchema:
         """Updates `GCPUser` data in database and synchronizes it with GCP Identity Platform."""
         self.auth_service.check_gcp_user_edit_allowance(request_user=user, uid=uid, schema=gcp_user)
-        updated_user: GCPUserSchema = self.gcp_user_repository.update(pk=uid, schema=gcp_user)
+        updated_user, claims_changed = self.gcp_user_repository.update_with_claims(
+            pk=uid, schema=gcp_user
+        )
 
-        # Synchronize GCP Identity Platform.
-        self.gcp_identity_service.sync_gcp_user(gcp_user=updated_user, update=True)
+        # Synchronize GCP Identity Platform. User claims are left as they are when unchanged.
+        self.gcp_identity_service.sync_gcp_user(
+            gcp_user=updated_user, update=True, claims=claims_changed
+        )
 
         return updated_user
 
@@ -98,8 +97,8 @@ class GCPUserService:
 
     def set_user_password(self, uid: UUID4, token: UUID4, password: str) -> None:
         """Sets up the `GCPUser` password in GCP-IP backend."""
-        self.security_token_repository.get(pk={"gcp_user_uid": uid, "uid": token})
+        # Delete the security token, so it can't be used again, once the password is set (it's
+        # kept when setting it fails). Expired tokens are rejected as not found.
+        self.security_token_repository.use_token(gcp_user_uid=uid, uid=token, commit=False)
         self.gcp_identity_service.set_password(gcp_user_uid=uid, password=password)
-
-        # Delete the security token, since it has been used already.
-        self.security_token_repository.delete(pk={"gcp_user_uid": uid, "uid": token})
+        self.security_token_repository.commit()
@@ -1,21 +1,61 @@
+import functools
 import json
 import logging
-from typing import Any, Dict
+import os
+from typing import Any, Dict, TYPE_CHECKING
 
-from google.cloud.pubsub_v1 import PublisherClient
-from google.cloud.pubsub_v1.types import LimitExceededBehavior, PublisherOptions, PublishFlowControl
 from pydantic import EmailStr, UUID4
 
 from user_management.core.config.settings import get_settings
 from user_management.core.dependencies import DBSession
+from user_management.core.metrics import remote_call
+from user_management.core.tracing import trace_context_carrier, traced
 from user_management.repositories import GCPUserRepository
 from user_management.repositories import SecurityTokenRepository
 from user_management.services.gcp_identity import GCPIdentityPlatformService
 
 
+if TYPE_CHECKING:
+    from google.cloud.pubsub_v1 import PublisherClient
+
+
 logger = logging.getLogger(__name__)
 
 
+@functools.cache
+def get_publisher_client() -> "PublisherClient":
+    """
+    GCP Pub/Sub publisher client, shared by all the requests (it batches the messages published
+    from any thread). The Pub/Sub SDK takes long to import, so it's only imported, and the client
+    created, when the first message is published.
+    """
+    # pylint: disable=import-outside-toplevel
+    from google.cloud.pubsub_v1 import PublisherClient
+    from google.cloud.pubsub_v1.types import (
+        LimitExceededBehavior,
+        PublisherOptions,
+        PublishFlowControl,
+    )
+
+    settings = get_settings()
+    return PublisherClient(
+        publisher_options=PublisherOptions(
+            flow_control=PublishFlowControl(
+                message_limit=settings.message_limit,
+                byte_limit=settings.byte_limit,
+                # Fail hard if so many messages are stacking in the Pub/Sub queue.
+                limit_exceeded_behavior=LimitExceededBehavior.ERROR,
+            )
+        )
+    )
+
+
+# gRPC channels (and the publisher batching threads) can't be shared with forked processes (e.g.
+# preloaded Gunicorn workers), so these create a client of their own when first publishing.
+os.register_at_fork(after_in_child=get_publisher_client.cache_clear)
+
+
+@traced
 class MailerService:
     """Service to send email notifications to users."""
 
@@ -25,25 +65,24 @@ class MailerService:
         self.gcp_user_repository = GCPUserRepository(db)
         self.security_token_repository = SecurityTokenRepository(db)
         self.gcp_identity_service = GCPIdentityPlatformService()
-        self.client = PublisherClient(
-            publisher_options=PublisherOptions(
-                flow_control=PublishFlowControl(
-                    message_limit=settings.message_limit,
-                    byte_limit=settings.byte_limit,
-                    # Fail hard if so many messages are stacking in the Pub/Sub queue.
-                    limit_exceeded_behavior=LimitExceededBehavior.ERROR,
-                )
-            )
-        )
-        self.topic_path = self.client.topic_path(  # pylint: disable=no-member
-            project=settings.google_project_id, topic=settings.topic_name
-        )
+        self.topic_path = f"projects/{settings.google_project_id}/topics/{settings.topic_name}"
+
+    @property
+    def client(self) -> "PublisherClient":
+        return get_publisher_client()
 
     @staticmethod
     def encode_message(message: Dict[str, Any]) -> bytes:
         """Helper function to encode the message to be published in GCP Pub/Sub as needed."""
         return json.dumps(message).encode("utf-8")
 
+    def publish(self, message: Dict[str, Any]) -> str:
+        """Publishes the given message in the mailing GCP Pub/Sub topic, returning its ID."""
+        with remote_call("pubsub.publish"):
+            return self.client.publish(
+                self.topic_path, self.encode_message(message), **trace_context_carrier()
+            ).result()
+
     def welcome_message(self, gcp_user_uid: UUID4) -> None:
         """
         Sends a message to a GCP Pub/Sub queue when a new user joins the platform. The message will
@@ -70,8 +109,7 @@ class MailerService:
                 "link": f"{get_settings().accounts_base_url}/new-user/set-password/{gcp_user.uid}/{token.uid}",
             },
         }
-        published = self.client.publish(self.topic_path, self.encode_message(message))
-        response = published.result()
+        response = self.publish(message)
 
         logger.info(
             "Welcome email with set password instructions sent to user %s (%s). Message ID: %s.",
@@ -94,8 +132,7 @@ class MailerService:
                 "reset_password_link": self.gcp_identity_service.get_password_reset_link(gcp_user),
             },
         }
-        published = self.client.publish(self.topic_path, self.encode_message(message))
-        response = published.result()
+        response = self.publish(message)
 
         logger.info(
             "Reset password email sent to user %s (%s). Message ID: %s.",
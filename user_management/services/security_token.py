@@ -0,0 +1,76 @@
+import logging
+import random
+import threading
+from time import perf_counter
+from typing import Optional
+
+from user_management.core.config.settings import get_settings
+from user_management.core.database import db_session_factory
+from user_management.core.dependencies import DBSession
+from user_management.core.metrics import SECURITY_TOKEN_PURGE_BATCH, SECURITY_TOKENS_PURGED
+from user_management.core.tracing import traced
+from user_management.repositories import SecurityTokenRepository
+
+logger = logging.getLogger(__name__)
+
+
+@traced
+class SecurityTokenService:
+    def __init__(self, db: DBSession):
+        self.security_token_repository = SecurityTokenRepository(db)
+
+    def purge_expired(self, batch_size: Optional[int] = None, ttl: Optional[int] = None) -> int:
+        """
+        Deletes the security tokens expired (older than `ttl` hours, `security_token_ttl` by
+        default), in batches of `batch_size` tokens (`security_token_purge_batch_size` by default),
+        each one in its own transaction, so locks are held briefly. Returns how many were deleted.
+        """
+        batch_size = batch_size or get_settings().security_token_purge_batch_size
+        purged = 0
+        while True:
+            start = perf_counter()
+            deleted = self.security_token_repository.purge_expired(batch_size=batch_size, ttl=ttl)
+            SECURITY_TOKEN_PURGE_BATCH.observe(perf_counter() - start)
+            SECURITY_TOKENS_PURGED.inc(deleted)
+            purged += deleted
+            if deleted < batch_size:
+                return purged
+
+
+class SecurityTokenPurger:
+    """
+    Background thread purging the expired security tokens every `security_token_purge_interval`
+    seconds, started and stopped with the application. Every worker process runs one, starting at
+    a random point of the interval so they don't all purge at once (concurrent purges skip each
+    other's tokens anyway).
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="security-token-purger", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def purge(self) -> int:
+        with db_session_factory()() as session:
+            return SecurityTokenService(session).purge_expired()
+
+    def _run(self) -> None:
+        delay = random.uniform(0, self.interval)
+        while not self._stopped.wait(delay):
+            try:
+                if purged := self.purge():
+                    logger.info("%s expired security tokens purged.", purged)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Unable to purge the expired security tokens.")
+            delay = self.interval